@@ -17,6 +17,7 @@ import anki.buildinfo
 from anki import _rsbridge, backend_pb2, i18n_pb2
 from anki._backend_generated import RustBackendGenerated
 from anki._fluent import GeneratedTranslations
+from anki.backend_stats import BackendStats
 from anki.dbproxy import Row as DBRow
 from anki.dbproxy import ValueForDB
 from anki.utils import from_json_bytes, to_json_bytes
@@ -89,6 +90,8 @@ class RustBackend(RustBackendGenerated):
             server=server,
         )
         self._backend = _rsbridge.open_backend(init_msg.SerializeToString())
+        # only set when call statistics have been enabled
+        self.stats: BackendStats | None = None
 
     @staticmethod
     def syncserver() -> None:
@@ -104,6 +107,36 @@ class RustBackend(RustBackendGenerated):
     def db_execute_many(self, sql: str, args: list[list[ValueForDB]]) -> list[DBRow]:
         return self._db_command(dict(kind="executemany", sql=sql, args=args))
 
+    def db_open_cursor(self, sql: str, args: Sequence[ValueForDB]) -> int:
+        return self._db_command(dict(kind="open", sql=sql, args=args))
+
+    def db_fetch(self, cursor: int, count: int) -> list[DBRow]:
+        return self._db_command(dict(kind="fetch", cursor=cursor, count=count))
+
+    def db_close_cursor(self, cursor: int) -> None:
+        return self._db_command(dict(kind="close", cursor=cursor))
+
+    def db_prepare(self, sql: str) -> int:
+        return self._db_command(dict(kind="prepare", sql=sql))
+
+    def db_query_prepared(
+        self, statement: int, args: Sequence[ValueForDB], first_row_only: bool
+    ) -> list[DBRow]:
+        return self._db_command(
+            dict(
+                kind="queryprepared",
+                statement=statement,
+                args=args,
+                first_row_only=first_row_only,
+            )
+        )
+
+    def db_finalize(self, statement: int) -> None:
+        return self._db_command(dict(kind="finalize", statement=statement))
+
+    def db_batch(self, requests: list[dict[str, Any]]) -> list[Any]:
+        return self._db_command(dict(kind="batch", requests=requests))
+
     def db_begin(self) -> None:
         return self._db_command(dict(kind="begin"))
 
@@ -113,12 +146,39 @@ class RustBackend(RustBackendGenerated):
     def db_rollback(self) -> None:
         return self._db_command(dict(kind="rollback"))
 
+    def db_columns(self, sql: str, args: Sequence[ValueForDB]) -> bytes:
+        bytes_input = to_json_bytes(dict(sql=sql, args=args))
+        start = time.perf_counter()
+        try:
+            output = self._backend.db_columns(bytes_input)
+        except Exception as error:
+            err_bytes = bytes(error.args[0])
+        else:
+            if self.stats is not None:
+                self.stats.record_query(
+                    sql, len(bytes_input), len(output), time.perf_counter() - start
+                )
+            return output
+        err = backend_pb2.BackendError()
+        err.ParseFromString(err_bytes)
+        raise backend_exception_to_pylib(err)
+
     def _db_command(self, input: dict[str, Any]) -> Any:
         bytes_input = to_json_bytes(input)
+        start = time.perf_counter()
         try:
-            return from_json_bytes(self._backend.db_command(bytes_input))
+            output = self._backend.db_command(bytes_input)
         except Exception as error:
             err_bytes = bytes(error.args[0])
+        else:
+            if self.stats is not None:
+                self.stats.record_query(
+                    input.get("sql") or input["kind"],
+                    len(bytes_input),
+                    len(output),
+                    time.perf_counter() - start,
+                )
+            return from_json_bytes(output)
         err = backend_pb2.BackendError()
         err.ParseFromString(err_bytes)
         raise backend_exception_to_pylib(err)
@@ -156,20 +216,34 @@ class RustBackend(RustBackendGenerated):
     def benchmark(self, train_set: Iterable[FsrsItem]) -> Sequence[float]:
         return self.fsrs_benchmark(train_set=train_set)
 
-    def _run_command(self, service: int, method: int, input: bytes) -> bytes:
-        start = time.time()
+    def _run_command(self, service: int, method: int, input: bytes, name: str) -> bytes:
+        "Run a backend method. name is the method's name, for stats."
+        output: bytes | None = None
+        start = time.perf_counter()
         try:
-            return self._backend.command(service, method, input)
+            output = self._backend.command(service, method, input)
         except Exception as error:
             error_bytes = bytes(error.args[0])
         finally:
-            elapsed = time.time() - start
-            if current_thread() is main_thread() and elapsed > 0.2:
+            elapsed = time.perf_counter() - start
+            if elapsed > 0.2 and current_thread() is main_thread():
                 logger.debug(
                     f"blocked main thread for {int(elapsed * 1000)}ms",
                     stack_info=True,
                 )
 
+        if self.stats is not None:
+            self.stats.record_command(
+                service,
+                method,
+                name,
+                len(input),
+                len(output or b""),
+                elapsed,
+            )
+        if output is not None:
+            return output
+
         err = backend_pb2.BackendError()
         err.ParseFromString(error_bytes)
         raise backend_exception_to_pylib(err)
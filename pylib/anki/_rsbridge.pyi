@@ -4,6 +4,7 @@ class Backend:
     @classmethod
     def command(cls, service: int, method: int, data: bytes) -> bytes: ...
     def db_command(self, data: bytes) -> bytes: ...
+    def db_columns(self, data: bytes) -> bytes: ...
 
 def buildhash() -> str: ...
 def open_backend(data: bytes) -> Backend: ...
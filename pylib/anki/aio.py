@@ -0,0 +1,189 @@
+# Copyright: Ankitects Pty Ltd and contributors
+# License: GNU AGPL, version 3 or later; http://www.gnu.org/licenses/agpl.html
+
+"""
+An asyncio wrapper around Collection, for services that need to keep handling
+other requests while a slow search, import or stats computation runs.
+
+    col = await AsyncCollection.open(path)
+    cids = await col.find_cards("deck:current")
+    count = await col.db.scalar("select count() from cards")
+    await col.close()
+
+Calls are run on a single worker thread, in the order they were made, so the
+same single-writer ordering applies as when the collection is used
+synchronously. The backend releases the GIL while it works, so the event loop
+keeps running in the meantime. Awaiting callers are held back once
+max_pending calls are outstanding.
+
+Collection and the objects it returns are not thread safe; once a
+collection is wrapped, only access it through the wrapper (or inside a
+function passed to run()).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+from collections.abc import Callable, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from typing import ParamSpec, TypeVar
+
+from anki.cards import Card, CardId
+from anki.collection import (
+    BrowserColumns,
+    Collection,
+    ImportAnkiPackageRequest,
+    ImportLogWithChanges,
+    OpChanges,
+    OpChangesWithCount,
+)
+from anki.dbproxy import DBProxy, Row, ValueForDB, ValueFromDB
+from anki.decks import DeckId
+from anki.notes import Note, NoteId
+
+P = ParamSpec("P")
+T = TypeVar("T")
+
+
+class AsyncCollection:
+    def __init__(self, col: Collection, max_pending: int = 32) -> None:
+        self.col = col
+        self.db = AsyncDBProxy(self)
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="AsyncCollection"
+        )
+        self._pending = asyncio.Semaphore(max_pending)
+
+    @classmethod
+    async def open(cls, path: str, max_pending: int = 32) -> AsyncCollection:
+        "Open the collection at path without blocking the event loop."
+        executor = ThreadPoolExecutor(max_workers=1)
+        try:
+            col = await asyncio.get_running_loop().run_in_executor(
+                executor, Collection, path
+            )
+        finally:
+            executor.shutdown(wait=False)
+        return cls(col, max_pending=max_pending)
+
+    async def run(self, fn: Callable[P, T], /, *args: P.args, **kwargs: P.kwargs) -> T:
+        """Run fn(*args, **kwargs) on the collection's worker thread.
+
+        Calls are run one at a time, in the order run() was called. If the
+        caller is cancelled after the call has started, it still completes."""
+        async with self._pending:
+            return await asyncio.get_running_loop().run_in_executor(
+                self._executor, functools.partial(fn, *args, **kwargs)
+            )
+
+    async def close(self, downgrade: bool = False) -> None:
+        "Close the collection once all outstanding calls have completed."
+        try:
+            await self.run(self.col.close, downgrade=downgrade)
+        finally:
+            self._executor.shutdown(wait=False)
+
+    def set_wants_abort(self) -> None:
+        """Ask the currently-running backend operation to stop early.
+
+        This is not queued, so it takes effect immediately."""
+        self.col.set_wants_abort()
+
+    # Searching
+    ##########################################################################
+
+    async def find_cards(
+        self,
+        query: str,
+        order: bool | str | BrowserColumns.Column = False,
+        reverse: bool = False,
+    ) -> Sequence[CardId]:
+        return await self.run(self.col.find_cards, query, order, reverse)
+
+    async def find_notes(
+        self,
+        query: str,
+        order: bool | str | BrowserColumns.Column = False,
+        reverse: bool = False,
+    ) -> Sequence[NoteId]:
+        return await self.run(self.col.find_notes, query, order, reverse)
+
+    # Cards and notes
+    ##########################################################################
+
+    async def get_card(self, id: CardId) -> Card:
+        return await self.run(self.col.get_card, id)
+
+    async def get_cards(self, ids: Sequence[CardId]) -> list[Card]:
+        return await self.run(self.col.get_cards, ids)
+
+    async def get_note(self, id: NoteId) -> Note:
+        return await self.run(self.col.get_note, id)
+
+    async def get_notes(self, ids: Sequence[NoteId]) -> list[Note]:
+        return await self.run(self.col.get_notes, ids)
+
+    async def add_note(self, note: Note, deck_id: DeckId) -> OpChangesWithCount:
+        return await self.run(self.col.add_note, note, deck_id)
+
+    async def update_note(self, note: Note) -> OpChanges:
+        return await self.run(self.col.update_note, note)
+
+    async def remove_notes(self, note_ids: Sequence[NoteId]) -> OpChangesWithCount:
+        return await self.run(self.col.remove_notes, note_ids)
+
+    # Import/export and maintenance
+    ##########################################################################
+
+    async def import_anki_package(
+        self, request: ImportAnkiPackageRequest
+    ) -> ImportLogWithChanges:
+        return await self.run(self.col.import_anki_package, request)
+
+    async def export_collection_package(
+        self, out_path: str, include_media: bool, legacy: bool
+    ) -> None:
+        return await self.run(
+            self.col.export_collection_package, out_path, include_media, legacy
+        )
+
+    async def fix_integrity(self) -> tuple[str, bool]:
+        return await self.run(self.col.fix_integrity)
+
+    async def studied_today(self) -> str:
+        return await self.run(self.col.studied_today)
+
+
+class AsyncDBProxy:
+    "Awaitable versions of the DBProxy query methods."
+
+    def __init__(self, col: AsyncCollection) -> None:
+        self._col = col
+
+    def _db(self) -> DBProxy:
+        assert self._col.col.db
+        return self._col.col.db
+
+    async def all(self, sql: str, *args: ValueForDB, **kwargs: ValueForDB) -> list[Row]:
+        return await self._col.run(lambda: self._db().all(sql, *args, **kwargs))
+
+    async def execute(
+        self, sql: str, *args: ValueForDB, **kwargs: ValueForDB
+    ) -> list[Row]:
+        return await self._col.run(lambda: self._db().execute(sql, *args, **kwargs))
+
+    async def list(
+        self, sql: str, *args: ValueForDB, **kwargs: ValueForDB
+    ) -> list[ValueFromDB]:
+        return await self._col.run(lambda: self._db().list(sql, *args, **kwargs))
+
+    async def first(
+        self, sql: str, *args: ValueForDB, **kwargs: ValueForDB
+    ) -> Row | None:
+        return await self._col.run(lambda: self._db().first(sql, *args, **kwargs))
+
+    async def scalar(
+        self, sql: str, *args: ValueForDB, **kwargs: ValueForDB
+    ) -> ValueFromDB:
+        return await self._col.run(lambda: self._db().scalar(sql, *args, **kwargs))
@@ -0,0 +1,145 @@
+# Copyright: Ankitects Pty Ltd and contributors
+# License: GNU AGPL, version 3 or later; http://www.gnu.org/licenses/agpl.html
+
+"""
+Opt-in statistics on backend calls, for tracking down slow operations.
+
+Recording is enabled with col.set_backend_stats_enabled(True), and the
+results can be retrieved with col.backend_stats().
+"""
+
+from __future__ import annotations
+
+import functools
+import json
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Any
+
+# upper bounds of the latency histogram buckets, in milliseconds; the final
+# bucket counts anything slower
+LATENCY_BUCKETS_MS = (0.1, 0.5, 1, 5, 10, 50, 100, 500, 1000)
+
+
+@dataclass
+class CallStats:
+    calls: int = 0
+    bytes_in: int = 0
+    bytes_out: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    histogram: list[int] = field(
+        default_factory=lambda: [0] * (len(LATENCY_BUCKETS_MS) + 1)
+    )
+
+    def record(self, bytes_in: int, bytes_out: int, elapsed: float) -> None:
+        ms = elapsed * 1000
+        self.calls += 1
+        self.bytes_in += bytes_in
+        self.bytes_out += bytes_out
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+        for idx, bound in enumerate(LATENCY_BUCKETS_MS):
+            if ms <= bound:
+                break
+        else:
+            idx = len(LATENCY_BUCKETS_MS)
+        self.histogram[idx] += 1
+
+    def to_dict(self) -> dict[str, Any]:
+        return dict(
+            calls=self.calls,
+            bytes_in=self.bytes_in,
+            bytes_out=self.bytes_out,
+            total_ms=round(self.total_ms, 3),
+            mean_ms=round(self.total_ms / self.calls, 3) if self.calls else 0,
+            max_ms=round(self.max_ms, 3),
+            histogram=self.histogram,
+        )
+
+
+class BackendStats:
+    """Call counts, payload sizes and latencies of backend calls.
+
+    Service calls are keyed by (service, method) index; DB calls are keyed by
+    the shape of their SQL, with literals and id lists replaced by '?'."""
+
+    def __init__(self) -> None:
+        self.methods: dict[tuple[int, int], CallStats] = {}
+        self.method_names: dict[tuple[int, int], str] = {}
+        self.queries: dict[str, CallStats] = {}
+        self._lock = threading.Lock()
+
+    def record_command(
+        self,
+        service: int,
+        method: int,
+        name: str,
+        bytes_in: int,
+        bytes_out: int,
+        elapsed: float,
+    ) -> None:
+        key = (service, method)
+        with self._lock:
+            if not (stats := self.methods.get(key)):
+                stats = self.methods[key] = CallStats()
+                self.method_names[key] = name
+            stats.record(bytes_in, bytes_out, elapsed)
+
+    def record_query(
+        self, sql: str, bytes_in: int, bytes_out: int, elapsed: float
+    ) -> None:
+        shape = sql_shape(sql)
+        with self._lock:
+            if not (stats := self.queries.get(shape)):
+                stats = self.queries[shape] = CallStats()
+            stats.record(bytes_in, bytes_out, elapsed)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.methods.clear()
+            self.method_names.clear()
+            self.queries.clear()
+
+    def to_dict(self) -> dict[str, Any]:
+        "Slowest entries first, by total time spent."
+        with self._lock:
+            methods = [
+                dict(
+                    service=service,
+                    method=method,
+                    name=self.method_names[(service, method)],
+                    **stats.to_dict(),
+                )
+                for (service, method), stats in self.methods.items()
+            ]
+            queries = [
+                dict(sql=shape, **stats.to_dict())
+                for shape, stats in self.queries.items()
+            ]
+        methods.sort(key=lambda entry: entry["total_ms"], reverse=True)
+        queries.sort(key=lambda entry: entry["total_ms"], reverse=True)
+        return dict(
+            latency_buckets_ms=LATENCY_BUCKETS_MS, methods=methods, queries=queries
+        )
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), indent=1)
+
+    def dump(self, path: str) -> None:
+        with open(path, "w", encoding="utf8") as file:
+            file.write(self.to_json())
+
+
+_literal = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_list = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_space = re.compile(r"\s+")
+
+
+@functools.lru_cache(maxsize=1024)
+def sql_shape(sql: str) -> str:
+    "SQL with literals and lists collapsed, so similar queries group together."
+    sql = _literal.sub("?", sql)
+    sql = _list.sub("(?)", sql)
+    return _space.sub(" ", sql).strip()
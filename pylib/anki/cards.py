@@ -5,6 +5,7 @@ from __future__ import annotations
 
 import pprint
 import time
+from dataclasses import dataclass
 from typing import NewType
 
 import anki
@@ -196,19 +197,19 @@ class Card(DeprecatedNamesMixin):
 
     def time_limit(self) -> int:
         "Time limit for answering in milliseconds."
-        conf = self.col.decks.config_dict_for_deck_id(self.current_deck_id())
+        conf = self.col.decks.config_immutable_for_deck_id(self.current_deck_id())
         return conf["maxTaken"] * 1000
 
     def should_show_timer(self) -> bool:
-        conf = self.col.decks.config_dict_for_deck_id(self.current_deck_id())
+        conf = self.col.decks.config_immutable_for_deck_id(self.current_deck_id())
         return conf["timer"]
 
     def replay_question_audio_on_answer_side(self) -> bool:
-        conf = self.col.decks.config_dict_for_deck_id(self.current_deck_id())
+        conf = self.col.decks.config_immutable_for_deck_id(self.current_deck_id())
         return conf.get("replayq", True)
 
     def autoplay(self) -> bool:
-        return self.col.decks.config_dict_for_deck_id(self.current_deck_id())[
+        return self.col.decks.config_immutable_for_deck_id(self.current_deck_id())[
             "autoplay"
         ]
 
@@ -247,6 +248,119 @@ class Card(DeprecatedNamesMixin):
         return False
 
 
+@dataclass(frozen=True, slots=True)
+class CardSnapshot:
+    """A compact, read-only copy of a card, without a reference to the collection.
+
+    Intended for holding large numbers of cards in memory for analysis; use
+    col.get_card_snapshots() to fetch them, and .to_card() to get a full Card
+    when it needs to be rendered or modified."""
+
+    id: CardId
+    nid: anki.notes.NoteId
+    did: anki.decks.DeckId
+    ord: int
+    mod: int
+    usn: int
+    type: CardType
+    queue: CardQueue
+    due: int
+    ivl: int
+    factor: int
+    reps: int
+    lapses: int
+    left: int
+    odue: int
+    odid: anki.decks.DeckId
+    flags: int
+    original_position: int | None
+    custom_data: str
+    stability: float | None
+    difficulty: float | None
+    desired_retention: float | None
+    decay: float | None
+    last_review_time: int | None
+
+    @staticmethod
+    def _from_backend_card(card: cards_pb2.Card) -> CardSnapshot:
+        has_memory_state = card.HasField("memory_state")
+        return CardSnapshot(
+            id=CardId(card.id),
+            nid=anki.notes.NoteId(card.note_id),
+            did=anki.decks.DeckId(card.deck_id),
+            ord=card.template_idx,
+            mod=card.mtime_secs,
+            usn=card.usn,
+            type=CardType(card.ctype),
+            queue=CardQueue(card.queue),
+            due=card.due,
+            ivl=card.interval,
+            factor=card.ease_factor,
+            reps=card.reps,
+            lapses=card.lapses,
+            left=card.remaining_steps,
+            odue=card.original_due,
+            odid=anki.decks.DeckId(card.original_deck_id),
+            flags=card.flags,
+            original_position=(
+                card.original_position if card.HasField("original_position") else None
+            ),
+            custom_data=card.custom_data,
+            stability=card.memory_state.stability if has_memory_state else None,
+            difficulty=card.memory_state.difficulty if has_memory_state else None,
+            desired_retention=(
+                card.desired_retention if card.HasField("desired_retention") else None
+            ),
+            decay=card.decay if card.HasField("decay") else None,
+            last_review_time=(
+                card.last_review_time_secs
+                if card.HasField("last_review_time_secs")
+                else None
+            ),
+        )
+
+    def _to_backend_card(self) -> cards_pb2.Card:
+        memory_state = None
+        if self.stability is not None and self.difficulty is not None:
+            memory_state = FSRSMemoryState(
+                stability=self.stability, difficulty=self.difficulty
+            )
+        return cards_pb2.Card(
+            id=self.id,
+            note_id=self.nid,
+            deck_id=self.did,
+            template_idx=self.ord,
+            mtime_secs=self.mod,
+            usn=self.usn,
+            ctype=self.type,
+            queue=self.queue,
+            due=self.due,
+            interval=self.ivl,
+            ease_factor=self.factor,
+            reps=self.reps,
+            lapses=self.lapses,
+            remaining_steps=self.left,
+            original_due=self.odue,
+            original_deck_id=self.odid,
+            flags=self.flags,
+            original_position=self.original_position,
+            custom_data=self.custom_data,
+            memory_state=memory_state,
+            desired_retention=self.desired_retention,
+            decay=self.decay,
+            last_review_time_secs=self.last_review_time,
+        )
+
+    def to_card(self, col: anki.collection.Collection) -> Card:
+        return Card(col, backend_card=self._to_backend_card())
+
+    def user_flag(self) -> int:
+        return self.flags & 0b111
+
+    def current_deck_id(self) -> anki.decks.DeckId:
+        return anki.decks.DeckId(self.odid or self.did)
+
+
 Card.register_deprecated_aliases(
     flushSched=Card.flush,
     q=Card.question,
@@ -3,7 +3,7 @@
 
 from __future__ import annotations
 
-from collections.abc import Generator, Sequence
+from collections.abc import Callable, Generator, Iterable, Sequence
 from typing import Any, Literal, Union, cast
 
 from anki import (
@@ -72,27 +72,25 @@ from dataclasses import dataclass
 import anki.latex
 from anki import hooks
 from anki._backend import RustBackend, Translations
+from anki.backend_stats import BackendStats
 from anki.browser import BrowserConfig, BrowserDefaults
-from anki.cards import Card, CardId
+from anki.cards import Card, CardId, CardSnapshot
 from anki.config import Config, ConfigManager
 from anki.consts import *
-from anki.dbproxy import DBProxy
+from anki.dbproxy import BOUND_IDS, DBProxy, bind_ids
 from anki.decks import DeckId, DeckManager
 from anki.errors import AbortSchemaModification, DBError
 from anki.lang import FormatTimeSpan
 from anki.media import MediaManager, media_paths_from_col_path
 from anki.models import ModelManager, NotetypeDict, NotetypeId
-from anki.notes import Note, NoteId
+from anki.notes import Note, NoteId, NoteSnapshot
 from anki.scheduler.dummy import DummyScheduler
 from anki.scheduler.v3 import Scheduler as V3Scheduler
 from anki.sync import SyncAuth, SyncOutput, SyncStatus
 from anki.tags import TagManager
 from anki.utils import (
     from_json_bytes,
-    ids2str,
     int_time,
-    split_fields,
-    strip_html_media,
     to_json_bytes,
 )
 
@@ -161,6 +159,9 @@ class Collection(DeprecatedNamesMixin):
         self.decks = DeckManager(self)
         self.tags = TagManager(self)
         self.conf = ConfigManager(self)
+        self._legacy_stats_cache: anki.stats.LegacyStatsCache | None = None
+        # the last changes passed to _invalidate_caches()
+        self._invalidated_changes: OpChanges | None = None
 
         # Saved when the collection is loaded to prevent changes before restart.
         self._experiments = self._get_experiments_dirty()
@@ -183,6 +184,18 @@ class Collection(DeprecatedNamesMixin):
         )
         return self._backend
 
+    def set_backend_stats_enabled(self, enabled: bool) -> None:
+        """Start or stop recording statistics on backend and DB calls.
+        Stopping discards any statistics gathered so far."""
+        if not enabled:
+            self._backend.stats = None
+        elif self._backend.stats is None:
+            self._backend.stats = BackendStats()
+
+    def backend_stats(self) -> BackendStats | None:
+        "Statistics gathered since recording was enabled, or None if disabled."
+        return self._backend.stats
+
     # I18n/messages
     ##########################################################################
 
@@ -225,12 +238,14 @@ class Collection(DeprecatedNamesMixin):
                 if self.conf.get("creationOffset") is None:
                     prefs = self._backend.get_preferences()
                     prefs.scheduling.new_timezone = True
-                    self._backend.set_preferences(prefs)
+                    self.set_preferences(prefs)
             else:
                 self.sched = DummyScheduler(self)
 
     def upgrade_to_v2_scheduler(self) -> None:
         self._backend.upgrade_scheduler()
+        # the backend changes schedVer and other cached values behind our back
+        self._clear_caches()
         self._load_scheduler()
 
     def v3_scheduler(self) -> bool:
@@ -255,6 +270,7 @@ class Collection(DeprecatedNamesMixin):
     @crt.setter
     def crt(self, crt: int) -> None:
         self.db.execute("update col set crt = ?", crt)
+        self.sched._clear_timing_cache()
 
     @property
     def mod(self) -> int:
@@ -288,6 +304,34 @@ class Collection(DeprecatedNamesMixin):
 
     def _clear_caches(self) -> None:
         self.models._clear_cache()
+        self.decks._clear_cache()
+        self.conf._clear_cache()
+        self.sched._clear_timing_cache()
+        self._legacy_stats_cache = None
+
+    def _invalidate_caches(self, changes: OpChanges) -> None:
+        "Drop cached objects that an operation reported as changed."
+        if changes is self._invalidated_changes:
+            # already handled where the operation was run
+            return
+        self._invalidated_changes = changes
+        if changes.notetype:
+            self.models._clear_cache()
+        if changes.deck:
+            self.decks._clear_deck_cache()
+        if changes.deck_config:
+            self.decks._clear_config_cache()
+        if changes.config:
+            self.conf._clear_cache()
+            self.sched._clear_timing_cache()
+
+    def mark_changes_handled(self, changes: OpChanges) -> None:
+        """Record that the caches have already been updated for `changes`.
+
+        For use by code that runs an operation and drops the affected cache
+        entries itself, so that passing the changes to _invalidate_caches()
+        later doesn't clear more than necessary."""
+        self._invalidated_changes = changes
 
     def reopen(self, after_full_sync: bool = False) -> None:
         if self.db:
@@ -369,7 +413,9 @@ class Collection(DeprecatedNamesMixin):
         self, request: ImportAnkiPackageRequest
     ) -> ImportLogWithChanges:
         log = self._backend.import_anki_package_raw(request.SerializeToString())
-        return ImportLogWithChanges.FromString(log)
+        out = ImportLogWithChanges.FromString(log)
+        self._invalidate_caches(out.changes)
+        return out
 
     def export_anki_package(
         self, *, out_path: str, options: ExportAnkiPackageOptions, limit: ExportLimit
@@ -386,7 +432,9 @@ class Collection(DeprecatedNamesMixin):
 
     def import_csv(self, request: ImportCsvRequest) -> ImportLogWithChanges:
         log = self._backend.import_csv_raw(request.SerializeToString())
-        return ImportLogWithChanges.FromString(log)
+        out = ImportLogWithChanges.FromString(log)
+        self._invalidate_caches(out.changes)
+        return out
 
     def export_note_csv(
         self,
@@ -423,10 +471,14 @@ class Collection(DeprecatedNamesMixin):
         )
 
     def import_json_file(self, path: str) -> ImportLogWithChanges:
-        return self._backend.import_json_file(path)
+        out = self._backend.import_json_file(path)
+        self._invalidate_caches(out.changes)
+        return out
 
     def import_json_string(self, json: str) -> ImportLogWithChanges:
-        return self._backend.import_json_string(json)
+        out = self._backend.import_json_string(json)
+        self._invalidate_caches(out.changes)
+        return out
 
     def export_dataset_for_research(
         self, target_path: str, min_entries: int = 0
@@ -488,6 +540,41 @@ class Collection(DeprecatedNamesMixin):
     def get_card(self, id: CardId | None) -> Card:
         return Card(self, id)
 
+    def get_cards(self, ids: Sequence[CardId]) -> list[Card]:
+        """Fetch multiple cards with a single backend call.
+
+        Cards are returned in the order of the provided ids. Ids that don't
+        exist are skipped."""
+        return [Card(self, backend_card=card) for card in self._backend.get_cards(ids)]
+
+    def iter_cards(
+        self, ids: Sequence[CardId], batch_size: int = 1000
+    ) -> Generator[Card, None, None]:
+        """Like get_cards(), but cards are fetched in batches as the iterator is
+        consumed, so very large lists of ids don't need to be loaded at once."""
+        for start in range(0, len(ids), batch_size):
+            for card in self._backend.get_cards(ids[start : start + batch_size]):
+                yield Card(self, backend_card=card)
+
+    def render_cards(
+        self, ids: Sequence[CardId], browser: bool = False, batch_size: int = 500
+    ) -> Generator[tuple[CardId, anki.template.TemplateRenderOutput], None, None]:
+        """Render the question and answer of multiple cards, yielding
+        (card_id, output) pairs in the order of the provided ids. Cards are
+        rendered in batches as the iterator is consumed. See
+        anki.template.render_existing_cards() for details."""
+        from anki.template import render_existing_cards
+
+        yield from render_existing_cards(self, ids, browser, batch_size)
+
+    def get_card_snapshots(self, ids: Sequence[CardId]) -> list[CardSnapshot]:
+        """Fetch read-only copies of multiple cards with a single backend call.
+        See CardSnapshot for details."""
+        return [
+            CardSnapshot._from_backend_card(card)
+            for card in self._backend.get_cards(ids)
+        ]
+
     def update_cards(
         self, cards: Sequence[Card], skip_undo_entry: bool = False
     ) -> OpChanges:
@@ -503,6 +590,34 @@ class Collection(DeprecatedNamesMixin):
     def get_note(self, id: NoteId) -> Note:
         return Note(self, id=id)
 
+    def get_notes(self, ids: Sequence[NoteId]) -> list[Note]:
+        """Fetch multiple notes with a single backend call.
+
+        Notes are returned in the order of the provided ids. Ids that don't
+        exist are skipped."""
+        return [Note(self, backend_note=note) for note in self._backend.get_notes(ids)]
+
+    def iter_notes(
+        self, ids: Sequence[NoteId], batch_size: int = 1000
+    ) -> Generator[Note, None, None]:
+        """Like get_notes(), but notes are fetched in batches as the iterator is
+        consumed, so very large lists of ids don't need to be loaded at once."""
+        for start in range(0, len(ids), batch_size):
+            for note in self._backend.get_notes(ids[start : start + batch_size]):
+                yield Note(self, backend_note=note)
+
+    def get_note_snapshots(self, ids: Sequence[NoteId]) -> list[NoteSnapshot]:
+        """Fetch read-only copies of multiple notes with a single backend call.
+        See NoteSnapshot for details."""
+        field_maps: dict[int, dict[str, tuple[int, dict[str, Any]]]] = {}
+        snapshots = []
+        for note in self._backend.get_notes(ids):
+            if (fmap := field_maps.get(note.notetype_id)) is None:
+                fmap = self.models.field_map(self.models.get(note.notetype_id))
+                field_maps[note.notetype_id] = fmap
+            snapshots.append(NoteSnapshot._from_backend_note(note, fmap))
+        return snapshots
+
     def update_notes(
         self, notes: Sequence[Note], skip_undo_entry: bool = False
     ) -> OpChanges:
@@ -564,7 +679,7 @@ class Collection(DeprecatedNamesMixin):
     def remove_notes_by_card(self, card_ids: list[CardId]) -> None:
         if hooks.notes_will_be_deleted.count():
             nids = self.db.list(
-                f"select nid from cards where id in {ids2str(card_ids)}"
+                f"select nid from cards where id in {BOUND_IDS}", bind_ids(card_ids)
             )
             hooks.notes_will_be_deleted(self, nids)
         self._backend.remove_notes(note_ids=[], card_ids=card_ids)
@@ -646,6 +761,7 @@ class Collection(DeprecatedNamesMixin):
         query: str,
         order: bool | str | BrowserColumns.Column = False,
         reverse: bool = False,
+        limit: int = 0,
     ) -> Sequence[CardId]:
         """Return card ids matching the provided search.
 
@@ -667,10 +783,13 @@ class Collection(DeprecatedNamesMixin):
 
         The reverse argument only applies when a BrowserColumns.Column is provided;
         otherwise the collection config defines whether reverse is set or not.
+
+        If limit is non-zero, only the first `limit` ids are returned.
         """
         mode = self._build_sort_mode(order, reverse, False)
         return cast(
-            Sequence[CardId], self._backend.search_cards(search=query, order=mode)
+            Sequence[CardId],
+            self._backend.search_cards(search=query, order=mode, limit=limit),
         )
 
     def find_notes(
@@ -678,15 +797,17 @@ class Collection(DeprecatedNamesMixin):
         query: str,
         order: bool | str | BrowserColumns.Column = False,
         reverse: bool = False,
+        limit: int = 0,
     ) -> Sequence[NoteId]:
         """Return note ids matching the provided search.
 
         To programmatically construct a search string, see .build_search_string().
-        The order parameter is documented in .find_cards().
+        The order and limit parameters are documented in .find_cards().
         """
         mode = self._build_sort_mode(order, reverse, True)
         return cast(
-            Sequence[NoteId], self._backend.search_notes(search=query, order=mode)
+            Sequence[NoteId],
+            self._backend.search_notes(search=query, order=mode, limit=limit),
         )
 
     def _build_sort_mode(
@@ -741,41 +862,18 @@ class Collection(DeprecatedNamesMixin):
     def field_names_for_note_ids(self, nids: Sequence[int]) -> Sequence[str]:
         return self._backend.field_names_for_notes(nids)
 
-    # returns array of ("dupestr", [nids])
-    def find_dupes(self, field_name: str, search: str = "") -> list[tuple[str, list]]:
-        nids = self.find_notes(
-            self.build_search_string(search, SearchNode(field_name=field_name))
-        )
-        # go through notes
-        vals: dict[str, list[int]] = {}
-        dupes = []
-        fields: dict[int, int] = {}
-
-        def ord_for_mid(mid: NotetypeId) -> int:
-            if mid not in fields:
-                model = self.models.get(mid)
-                for idx, field in enumerate(model["flds"]):
-                    if field["name"].lower() == field_name.lower():
-                        fields[mid] = idx
-                        break
-            return fields[mid]
-
-        for nid, mid, flds in self.db.all(
-            f"select id, mid, flds from notes where id in {ids2str(nids)}"
-        ):
-            flds = split_fields(flds)
-            ord = ord_for_mid(mid)
-            if ord is None:
-                continue
-            val = flds[ord]
-            val = strip_html_media(val)
-            # empty does not count as duplicate
-            if not val:
-                continue
-            vals.setdefault(val, []).append(nid)
-            if len(vals[val]) == 2:
-                dupes.append((val, vals[val]))
-        return dupes
+    def find_dupes(
+        self,
+        field_name: str,
+        search: str = "",
+        progress_cb: Callable[[int, int], bool] | None = None,
+        index_path: str | None = None,
+    ) -> list[tuple[str, list[NoteId]]]:
+        """Returns (stripped_text, note_ids) for each group of notes with the
+        same field content. See anki.dupes.find_dupes() for details."""
+        from anki.dupes import find_dupes
+
+        return find_dupes(self, field_name, search, progress_cb, index_path)
 
     # Search Strings
     ##########################################################################
@@ -887,6 +985,35 @@ class Collection(DeprecatedNamesMixin):
             row.font_size,
         )
 
+    def browser_rows_for_ids(
+        self, ids: Sequence[int]
+    ) -> list[
+        tuple[
+            Generator[tuple[str, bool, BrowserRow.Cell.TextElideMode.V], None, None],
+            BrowserRow.Color.V,
+            str,
+            int,
+        ]
+        | str
+    ]:
+        """Like browser_row_for_id(), but for multiple rows in a single backend
+        call. Rows that could not be built are returned as an error message."""
+        rows: list[Any] = []
+        for out in self._backend.browser_rows_for_ids(ids):
+            if not out.HasField("row"):
+                rows.append(out.error)
+                continue
+            row = out.row
+            rows.append(
+                (
+                    ((cell.text, cell.is_rtl, cell.elide_mode) for cell in row.cells),
+                    row.color,
+                    row.font_name,
+                    row.font_size,
+                )
+            )
+        return rows
+
     def load_browser_card_columns(self) -> list[str]:
         """Return the stored card column names and ensure the backend columns are set and in sync."""
         columns = self.get_config(
@@ -928,6 +1055,7 @@ class Collection(DeprecatedNamesMixin):
         By default, no undo entry will be created, but the existing undo history
         will be preserved. Set `undoable=True` to allow the change to be undone;
         see undo code for how you can merge multiple undo entries."""
+        self.conf._remove_from_cache(key)
         return self._backend.set_config_json(
             key=key, value_json=to_json_bytes(val), undoable=undoable
         )
@@ -935,6 +1063,17 @@ class Collection(DeprecatedNamesMixin):
     def remove_config(self, key: str) -> OpChanges:
         return self.conf.remove(key)
 
+    def get_configs(self, keys: Iterable[str]) -> dict[str, Any]:
+        """Get multiple config variables at once. Keys that are not set are
+        omitted from the result."""
+        return self.conf.get_many(keys)
+
+    def set_configs(
+        self, values: dict[str, Any], *, undoable: bool = False
+    ) -> OpChanges:
+        "Set multiple config variables in a single operation. See set_config()."
+        return self.conf.set_many(values, undoable=undoable)
+
     def all_config(self) -> dict[str, Any]:
         "This is a debugging aid. Prefer .get_config() when you know the key you need."
         return from_json_bytes(self._backend.get_all_config())
@@ -945,6 +1084,7 @@ class Collection(DeprecatedNamesMixin):
     def set_config_bool(
         self, key: Config.Bool.V, value: bool, *, undoable: bool = False
     ) -> OpChanges:
+        self.conf._clear_cache()
         return self._backend.set_config_bool(key=key, value=value, undoable=undoable)
 
     def get_config_string(self, key: Config.String.V) -> str:
@@ -953,6 +1093,7 @@ class Collection(DeprecatedNamesMixin):
     def set_config_string(
         self, key: Config.String.V, value: str, undoable: bool = False
     ) -> OpChanges:
+        self.conf._clear_cache()
         return self._backend.set_config_string(key=key, value=value, undoable=undoable)
 
     def get_aux_notetype_config(
@@ -993,6 +1134,7 @@ class Collection(DeprecatedNamesMixin):
         return self.get_config_bool(Config.Bool.LOAD_BALANCER_ENABLED)
 
     def _set_load_balancer_enabled(self, value: bool) -> None:
+        self.conf._clear_cache()
         self._backend.set_load_balancer_enabled(value)
 
     load_balancer_enabled = property(
@@ -1077,15 +1219,13 @@ class Collection(DeprecatedNamesMixin):
     def undo(self) -> OpChangesAfterUndo:
         """Returns result of backend undo operation, or throws UndoEmpty."""
         out = self._backend.undo()
-        if out.changes.notetype:
-            self.models._clear_cache()
+        self._invalidate_caches(out.changes)
         return out
 
     def redo(self) -> OpChangesAfterUndo:
         """Returns result of backend redo operation, or throws UndoEmpty."""
         out = self._backend.redo()
-        if out.changes.notetype:
-            self.models._clear_cache()
+        self._invalidate_caches(out.changes)
         return out
 
     def op_made_changes(self, changes: OpChanges) -> bool:
@@ -1184,6 +1324,8 @@ class Collection(DeprecatedNamesMixin):
         return self._backend.get_preferences()
 
     def set_preferences(self, prefs: Preferences) -> OpChanges:
+        self.conf._clear_cache()
+        self.sched._clear_timing_cache()
         return self._backend.set_preferences(prefs)
 
     def render_markdown(self, text: str, sanitize: bool = True) -> str:
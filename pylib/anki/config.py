@@ -9,6 +9,8 @@ Config handling
 the case of lists and dictionaries, any changes you make to the returned
 value will not be saved unless you call set_config().
 - To remove a config value, use col.remove_config(key).
+- To get or set multiple values in a single backend call, use
+col.get_configs(keys) and col.set_configs(values).
 
 For legacy reasons, the config is also exposed as a dict interface
 as col.conf.  To support old code that was mutating inner values,
@@ -19,8 +21,8 @@ The legacy set also does not support the new undo handling.
 
 from __future__ import annotations
 
-import copy
 import weakref
+from collections.abc import Iterable
 from typing import Any
 from weakref import ref
 
@@ -34,17 +36,78 @@ from anki.utils import from_json_bytes, to_json_bytes
 Config = config_pb2.ConfigKey
 
 
+# The backend updates these as a side effect of other operations, so they are
+# not cached. Keys starting with an underscore (per deck/notetype settings)
+# are not cached for the same reason.
+UNCACHED_KEYS = {"activeDecks", "curDeck", "curModel", "lastUnburied", "nextPos"}
+
+# Keys that affect when the scheduler's day starts.
+TIMING_KEYS = {"creationOffset", "localOffset", "rollover", "schedVer"}
+
+
 class ConfigManager:
     def __init__(self, col: anki.collection.Collection):
         self.col = col.weakref()
+        self._clear_cache()
+
+    # Caching
+    #########################
+    # Values are cached as JSON, with None marking a missing key, so each
+    # lookup gets its own copy. Writes made through the collection drop the
+    # affected keys, and Collection._invalidate_caches() clears the cache
+    # when an operation reports config changes.
+
+    _json: dict[str, bytes | None]
+
+    def _clear_cache(self) -> None:
+        self._json = {}
+
+    def _remove_from_cache(self, key: str) -> None:
+        self._json.pop(key, None)
+        if key in TIMING_KEYS and (sched := getattr(self.col, "sched", None)):
+            sched._clear_timing_cache()
+
+    def _maybe_cache(self, key: str, json: bytes | None) -> None:
+        if key not in UNCACHED_KEYS and not key.startswith("_"):
+            self._json[key] = json
+
+    # Getting and setting
+    #########################
 
     def get_immutable(self, key: str) -> Any:
-        try:
-            return from_json_bytes(self.col._backend.get_config_json(key))
-        except NotFoundError as exc:
-            raise KeyError from exc
+        if key in self._json:
+            json = self._json[key]
+        else:
+            try:
+                json = self.col._backend.get_config_json(key)
+            except NotFoundError:
+                json = None
+            self._maybe_cache(key, json)
+        if json is None:
+            raise KeyError(key)
+        return from_json_bytes(json)
+
+    def get_many(self, keys: Iterable[str]) -> dict[str, Any]:
+        "Values of the provided keys that exist, fetching any uncached ones at once."
+        keys = list(keys)
+        if uncached := [key for key in keys if key not in self._json]:
+            fetched = from_json_bytes(self.col._backend.get_configs_json(uncached))
+            for key in uncached:
+                # a stored null is cached as b"null", not as a missing key
+                json = to_json_bytes(fetched[key]) if key in fetched else None
+                self._maybe_cache(key, json)
+        else:
+            fetched = {}
+        out = {}
+        for key in keys:
+            if key in fetched:
+                out[key] = fetched[key]
+            elif (json := self._json.get(key)) is not None:
+                out[key] = from_json_bytes(json)
+        return out
 
     def set(self, key: str, val: Any) -> None:
+        self._remove_from_cache(key)
         self.col._backend.set_config_json_no_undo(
             key=key,
             value_json=to_json_bytes(val),
@@ -52,7 +115,15 @@ class ConfigManager:
             undoable=True,
         )
 
+    def set_many(self, values: dict[str, Any], undoable: bool = False) -> OpChanges:
+        for key in values:
+            self._remove_from_cache(key)
+        return self.col._backend.set_configs_json(
+            values_json=to_json_bytes(values), undoable=undoable
+        )
+
     def remove(self, key: str) -> OpChanges:
+        self._remove_from_cache(key)
         return self.col._backend.remove_config(key)
 
     # Legacy dict interface
@@ -106,17 +177,20 @@ class ConfigManager:
 # is dropped.
 
 
+# The original value is kept as JSON, which is much cheaper than a deep copy.
+
+
 class WrappedList(list):
     def __init__(self, conf: ref[ConfigManager], key: str, val: Any) -> None:
         self.key = key
         self.conf = conf
-        self.orig = copy.deepcopy(val)
+        self.orig = to_json_bytes(val)
         super().__init__(val)
 
     def __del__(self) -> None:
         cur = list(self)
         conf = self.conf()
-        if conf and self.orig != cur:
+        if conf and self.orig != to_json_bytes(cur):
             conf[self.key] = cur
 
 
@@ -124,11 +198,11 @@ class WrappedDict(dict):
     def __init__(self, conf: ref[ConfigManager], key: str, val: Any) -> None:
         self.key = key
         self.conf = conf
-        self.orig = copy.deepcopy(val)
+        self.orig = to_json_bytes(val)
         super().__init__(val)
 
     def __del__(self) -> None:
         cur = dict(self)
         conf = self.conf()
-        if conf and self.orig != cur:
+        if conf and self.orig != to_json_bytes(cur):
             conf[self.key] = cur
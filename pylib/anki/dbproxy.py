@@ -3,8 +3,10 @@
 
 from __future__ import annotations
 
+import functools
 import re
-from collections.abc import Callable, Iterable, Sequence
+import struct
+from collections.abc import Callable, Generator, Iterable, Sequence
 from re import Match
 from typing import TYPE_CHECKING, Any, Union
 
@@ -20,6 +22,10 @@ Row = Sequence[ValueFromDB]
 
 ValueForDB = Union[str, int, float, None]
 
+# A numeric column is a NumPy array if NumPy is available, and a
+# memoryview otherwise; text and blob columns are a TextColumn.
+Column = Sequence[ValueFromDB]
+
 
 class DBProxy:
     # Lifecycle
@@ -65,6 +71,58 @@ class DBProxy:
         # fetch rows
         return self._backend.db_query(sql, args2, first_row_only)
 
+    # Prepared, batched and columnar queries
+    ##########################################
+
+    def prepare(self, sql: str) -> DBStatement:
+        """Prepare a query that will be run multiple times.
+
+        The statement only supports positional arguments. Call .close() on it
+        when it is no longer needed.
+
+        Each call still makes a separate round trip to the backend, so on its
+        own this is no faster than a plain query. The saving comes from passing
+        statements to batch(), which runs many queries in a single call.
+        """
+        return DBStatement(self._backend, sql)
+
+    def batch(self, queries: Iterable[BatchQuery]) -> list[list[Row]]:
+        """Run multiple queries in a single round trip, returning the rows of each.
+
+        Each query can be an SQL string or a prepared statement, optionally
+        paired with a sequence of positional arguments:
+
+            [(cards,)], [(notes,)] = col.db.batch(
+                ["select count() from cards", ("select count() from notes where mid=?", [mid])]
+            )
+        """
+        requests: list[dict[str, Any]] = []
+        for query in queries:
+            args: Sequence[ValueForDB] = []
+            if isinstance(query, tuple):
+                query, args = query
+            if isinstance(query, DBStatement):
+                requests.append(query._request(args, first_row_only=False))
+            else:
+                requests.append(
+                    dict(kind="query", sql=query, args=args, first_row_only=False)
+                )
+        return self._backend.db_batch(requests)
+
+    def columns(
+        self, sql: str, *args: ValueForDB, **kwargs: ValueForDB
+    ) -> list[Column]:
+        """Run a query, and return its result as a list of columns instead of rows.
+
+        Integer and float columns are returned in packed form - as NumPy arrays if
+        NumPy is installed, or memoryviews otherwise - so large numeric queries
+        don't need a Python object per value. Integer columns that contain NULL
+        are returned as floats, with NULL represented as NaN. Text and blob
+        columns are decoded as they are accessed.
+        """
+        sql, args2 = emulate_named_args(sql, args, kwargs)
+        return unpack_columns(self._backend.db_columns(sql, args2))
+
     # Query shortcuts
     ###################
 
@@ -94,6 +152,34 @@ class DBProxy:
     # with .all()
     execute = all
 
+    def iterate(
+        self,
+        sql: str,
+        *args: ValueForDB,
+        batch_size: int = 1000,
+        **kwargs: ValueForDB,
+    ) -> Generator[Row, None, None]:
+        """Yield the rows of a query one by one.
+
+        Unlike .all(), rows are fetched from the backend in batches of
+        `batch_size`, so only a single batch of them exists at any one time.
+        This is useful when walking large tables such as notes or revlog.
+
+        Each batch re-runs the query from the start and skips the rows already
+        returned, so larger batches mean fewer passes. Changes made while
+        iterating are seen by later batches, so rows may be skipped or
+        repeated if the table being walked is modified; collect the changes
+        and apply them afterwards instead. Only a limited number of iterators
+        can be open at once, and opening more invalidates the oldest.
+        """
+        sql, args2 = emulate_named_args(sql, args, kwargs)
+        cursor = self._backend.db_open_cursor(sql, args2)
+        try:
+            while rows := self._backend.db_fetch(cursor, batch_size):
+                yield from rows
+        finally:
+            self._backend.db_close_cursor(cursor)
+
     # Updates
     ################
 
@@ -105,6 +191,154 @@ class DBProxy:
         self._backend.db_execute_many(sql, list_args)
 
 
+class DBStatement:
+    "A query prepared with DBProxy.prepare()."
+
+    def __init__(self, backend: anki._backend.RustBackend, sql: str) -> None:
+        self._backend = backend
+        self.sql = sql
+        self._handle: int | None = backend.db_prepare(sql)
+
+    def _query(self, args: Sequence[ValueForDB], first_row_only: bool) -> list[Row]:
+        assert self._handle is not None, "statement has been closed"
+        return self._backend.db_query_prepared(self._handle, args, first_row_only)
+
+    def _request(self, args: Sequence[ValueForDB], first_row_only: bool) -> dict:
+        assert self._handle is not None, "statement has been closed"
+        return dict(
+            kind="queryprepared",
+            statement=self._handle,
+            args=args,
+            first_row_only=first_row_only,
+        )
+
+    def all(self, *args: ValueForDB) -> list[Row]:
+        return self._query(args, first_row_only=False)
+
+    def list(self, *args: ValueForDB) -> list[ValueFromDB]:
+        return [x[0] for x in self._query(args, first_row_only=False)]
+
+    def first(self, *args: ValueForDB) -> Row | None:
+        rows = self._query(args, first_row_only=True)
+        if rows:
+            return rows[0]
+        else:
+            return None
+
+    def scalar(self, *args: ValueForDB) -> ValueFromDB:
+        rows = self._query(args, first_row_only=True)
+        if rows:
+            return rows[0][0]
+        else:
+            return None
+
+    def close(self) -> None:
+        if self._handle is not None:
+            self._backend.db_finalize(self._handle)
+            self._handle = None
+
+
+BatchQuery = Union[
+    str, DBStatement, tuple[Union[str, DBStatement], Sequence[ValueForDB]]
+]
+
+
+# Bound id lists
+##########################################################################
+
+# A subquery returning the ids passed in a single argument with bind_ids().
+# Unlike ids2str(), the SQL stays the same size no matter how many ids there
+# are, so it can be reused as a prepared statement:
+#
+#     col.db.list(f"select nid from cards where id in {BOUND_IDS}", bind_ids(cids))
+BOUND_IDS = "(select value from json_each(?))"
+
+
+def bind_ids(ids: Iterable[int]) -> str:
+    "Encode ids as a single query argument, for use with BOUND_IDS."
+    return f"[{','.join(str(id) for id in ids)}]"
+
+
+# Columnar results
+##########################################################################
+
+_INT_COLUMN = 0
+_DOUBLE_COLUMN = 1
+_TEXT_COLUMN = 2
+
+
+class TextColumn(Sequence):
+    "A text or blob column from .columns(), which is decoded on access."
+
+    def __init__(
+        self, nulls: memoryview, offsets: memoryview, data: memoryview, is_text: bool
+    ) -> None:
+        self._nulls = nulls
+        self._offsets = offsets
+        self._data = data
+        self._is_text = is_text
+
+    def __len__(self) -> int:
+        return len(self._nulls)
+
+    def __getitem__(self, index: Any) -> Any:
+        if isinstance(index, slice):
+            return [self[idx] for idx in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if self._nulls[index]:
+            return None
+        value = self._data[self._offsets[index] : self._offsets[index + 1]]
+        return str(value, "utf8") if self._is_text else value.tobytes()
+
+
+@functools.cache
+def _numpy() -> Any:
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def _numeric_column(view: memoryview, kind: int) -> Column:
+    if numpy := _numpy():
+        return numpy.frombuffer(view, dtype="<i8" if kind == _INT_COLUMN else "<f8")
+    # the backend writes little-endian, which matches all supported platforms
+    return view.cast("q" if kind == _INT_COLUMN else "d")
+
+
+def _align(pos: int) -> int:
+    return (pos + 7) & ~7
+
+
+def unpack_columns(data: bytes) -> list[Column]:
+    "Decode the packed format produced by the backend's db_columns_bytes()."
+    view = memoryview(data)
+    column_count, row_count = struct.unpack_from("<QQ", view)
+    pos = 16
+    columns: list[Column] = []
+    for _ in range(column_count):
+        (kind,) = struct.unpack_from("<Q", view, pos)
+        pos += 8
+        if kind in (_INT_COLUMN, _DOUBLE_COLUMN):
+            end = pos + row_count * 8
+            columns.append(_numeric_column(view[pos:end], kind))
+            pos = end
+        else:
+            nulls = view[pos : pos + row_count]
+            pos = _align(pos + row_count)
+            end = pos + (row_count + 1) * 8
+            offsets = view[pos:end].cast("q")
+            pos = end
+            end = pos + offsets[-1]
+            columns.append(
+                TextColumn(nulls, offsets, view[pos:end], kind == _TEXT_COLUMN)
+            )
+            pos = _align(end)
+    return columns
+
+
 # convert kwargs to list format
 def emulate_named_args(
     sql: str, args: tuple, kwargs: dict[str, Any]
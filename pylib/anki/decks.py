@@ -4,8 +4,9 @@
 from __future__ import annotations
 
 import copy
-from collections.abc import Iterable, Sequence
-from typing import TYPE_CHECKING, Any, NewType
+from collections.abc import Iterable, Mapping, Sequence
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any, NewType, TypeVar
 
 if TYPE_CHECKING:
     import anki
@@ -16,8 +17,9 @@ from anki import deck_config_pb2, decks_pb2
 from anki._legacy import DeprecatedNamesMixin, deprecated, print_deprecation_warning
 from anki.collection import OpChanges, OpChangesWithCount, OpChangesWithId
 from anki.consts import *
+from anki.dbproxy import BOUND_IDS, bind_ids
 from anki.errors import NotFoundError
-from anki.utils import from_json_bytes, ids2str, int_time, to_json_bytes
+from anki.utils import from_json_bytes, int_time, to_json_bytes
 
 # public exports
 DeckTreeNode = decks_pb2.DeckTreeNode
@@ -39,6 +41,17 @@ DeckConfigId = NewType("DeckConfigId", int)
 DEFAULT_DECK_ID = DeckId(1)
 DEFAULT_DECK_CONF_ID = DeckConfigId(1)
 
+T = TypeVar("T")
+
+
+def _freeze(value: Any) -> Any:
+    "Return a read-only version of a parsed JSON value."
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(val) for key, val in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(val) for val in value)
+    return value
+
 
 class DecksDictProxy:
     def __init__(self, col: anki.collection.Collection):
@@ -85,6 +98,7 @@ class DeckManager(DeprecatedNamesMixin):
     def __init__(self, col: anki.collection.Collection) -> None:
         self.col = col.weakref()
         self.decks = DecksDictProxy(col)
+        self._clear_cache()
 
     def save(self, deck_or_config: DeckDict | DeckConfigDict | None = None) -> None:
         "Can be called with either a deck or a deck configuration."
@@ -99,6 +113,66 @@ class DeckManager(DeprecatedNamesMixin):
         else:
             self.update(deck_or_config, preserve_usn=False)
 
+    # Caching
+    #############################################################
+    # The review screen looks up the current card's deck and its options
+    # several times per card, so the legacy JSON of decks and deck configs is
+    # cached. get() and friends parse a private copy from the immutable JSON,
+    # which callers may modify and must save for the changes to apply. Callers
+    # that only read can use get_immutable() and config_immutable_for_deck_id()
+    # instead, which share one frozen copy per deck. Saving through this class
+    # drops the affected entries, and Collection._invalidate_caches() clears
+    # them when an operation reports deck or deck config changes.
+    #
+    # The names of fetched decks are indexed, so that when a card is answered,
+    # the card's deck and its parents can be dropped without a lookup. Names
+    # don't change when cards are answered, so the index is only cleared along
+    # with the rest of the deck cache.
+
+    _deck_json: dict[DeckId, bytes]
+    _deck_names: dict[DeckId, str]
+    _deck_ids_by_name: dict[str, DeckId]
+    _config_json: dict[DeckConfigId, bytes]
+    _deck_views: dict[DeckId, Mapping[str, Any]]
+    _deck_config_views: dict[DeckId, Mapping[str, Any]]
+
+    def _clear_cache(self) -> None:
+        self._clear_deck_cache()
+        self._clear_config_cache()
+
+    def _clear_deck_cache(self) -> None:
+        self._deck_json = {}
+        self._deck_names = {}
+        self._deck_ids_by_name = {}
+        self._deck_views = {}
+        self._deck_config_views = {}
+
+    def _clear_config_cache(self) -> None:
+        self._config_json = {}
+        self._deck_config_views = {}
+
+    def _remove_from_deck_cache(self, dids: Iterable[DeckId]) -> None:
+        "Drop the cached copies of the given decks and their parents."
+        for did in dids:
+            if not did:
+                continue
+            if (name := self._deck_names.get(did)) is None:
+                # fetching it indexes its name, so this only happens once
+                if (deck := self.get_legacy(did)) is None:
+                    continue
+                name = deck["name"]
+            components = name.split("::")
+            for i in range(len(components)):
+                parent = self._deck_ids_by_name.get("::".join(components[: i + 1]))
+                if parent is not None:
+                    self._deck_json.pop(parent, None)
+                    self._deck_views.pop(parent, None)
+                    self._deck_config_views.pop(parent, None)
+
+    def _after_deck_write(self, changes: T) -> T:
+        self._clear_deck_cache()
+        return changes
+
     # Deck save/load
     #############################################################
 
@@ -115,7 +189,9 @@ class DeckManager(DeprecatedNamesMixin):
         "Add a deck created with new_deck_legacy(). Must have id of 0."
         if not deck["id"] == 0:
             raise Exception("id should be 0")
-        return self.col._backend.add_deck_legacy(to_json_bytes(deck))
+        return self._after_deck_write(
+            self.col._backend.add_deck_legacy(to_json_bytes(deck))
+        )
 
     def id(
         self,
@@ -136,7 +212,7 @@ class DeckManager(DeprecatedNamesMixin):
         return DeckId(out.id)
 
     def remove(self, dids: Sequence[DeckId]) -> OpChangesWithCount:
-        return self.col._backend.remove_decks(dids)
+        return self._after_deck_write(self.col._backend.remove_decks(dids))
 
     def all_names_and_ids(
         self, skip_empty_default: bool = False, include_filtered: bool = True
@@ -153,10 +229,25 @@ class DeckManager(DeprecatedNamesMixin):
             return None
 
     def get_legacy(self, did: DeckId) -> DeckDict | None:
-        try:
-            return from_json_bytes(self.col._backend.get_deck_legacy(did))
-        except NotFoundError:
-            return None
+        if (json := self._deck_json.get(did)) is None:
+            try:
+                json = self.col._backend.get_deck_legacy(did)
+            except NotFoundError:
+                return None
+            self._deck_json[did] = json
+            deck = from_json_bytes(json)
+            self._deck_names[did] = deck["name"]
+            self._deck_ids_by_name[deck["name"]] = did
+            return deck
+        return from_json_bytes(json)
+
+    def get_immutable(self, did: DeckId) -> Mapping[str, Any] | None:
+        "Like get_legacy(), but returns a shared read-only view of the deck."
+        if (view := self._deck_views.get(did)) is None:
+            if (deck := self.get_legacy(did)) is None:
+                return None
+            view = self._deck_views[did] = _freeze(deck)
+        return view
 
     def have(self, id: DeckId) -> bool:
         return bool(self.get_legacy(id))
@@ -170,7 +261,7 @@ class DeckManager(DeprecatedNamesMixin):
 
     def add_deck(self, deck: Deck) -> OpChangesWithId:
         "Deck needs to be fetched from DB after adding."
-        return self.col._backend.add_deck(message=deck)
+        return self._after_deck_write(self.col._backend.add_deck(message=deck))
 
     def new_deck_legacy(self, filtered: bool) -> DeckDict:
         deck = from_json_bytes(self.col._backend.new_deck_legacy(filtered))
@@ -206,8 +297,10 @@ class DeckManager(DeprecatedNamesMixin):
     def set_collapsed(
         self, deck_id: DeckId, collapsed: bool, scope: DeckCollapseScope.V
     ) -> OpChanges:
-        return self.col._backend.set_deck_collapsed(
-            deck_id=deck_id, collapsed=collapsed, scope=scope
+        return self._after_deck_write(
+            self.col._backend.set_deck_collapsed(
+                deck_id=deck_id, collapsed=collapsed, scope=scope
+            )
         )
 
     def collapse(self, did: DeckId) -> None:
@@ -233,9 +326,12 @@ class DeckManager(DeprecatedNamesMixin):
             dids = set(dids)
         if include_subdecks:
             dids.update([child[1] for did in dids for child in self.children(did)])
-        str_ids = ids2str(dids)
+        ids = bind_ids(dids)
         count = self.col.db.scalar(
-            f"select count() from cards where did in {str_ids} or odid in {str_ids}"
+            f"select count() from cards where did in {BOUND_IDS} "
+            f"or odid in {BOUND_IDS}",
+            ids,
+            ids,
         )
         return count
 
@@ -266,9 +362,12 @@ class DeckManager(DeprecatedNamesMixin):
         deck["id"] = self.col._backend.add_or_update_deck_legacy(
             deck=to_json_bytes(deck), preserve_usn_and_mtime=preserve_usn
         )
+        self._clear_deck_cache()
 
     def update_dict(self, deck: DeckDict) -> OpChanges:
-        return self.col._backend.update_deck_legacy(json=to_json_bytes(deck))
+        return self._after_deck_write(
+            self.col._backend.update_deck_legacy(json=to_json_bytes(deck))
+        )
 
     def rename(self, deck: DeckDict | DeckId, new_name: str) -> OpChanges:
         "Rename deck prefix to NAME if not exists. Updates children."
@@ -276,7 +375,9 @@ class DeckManager(DeprecatedNamesMixin):
             deck_id = deck
         else:
             deck_id = deck["id"]
-        return self.col._backend.rename_deck(deck_id=deck_id, new_name=new_name)
+        return self._after_deck_write(
+            self.col._backend.rename_deck(deck_id=deck_id, new_name=new_name)
+        )
 
     # Drag/drop
     #############################################################
@@ -286,8 +387,8 @@ class DeckManager(DeprecatedNamesMixin):
     ) -> OpChangesWithCount:
         """Rename one or more source decks that were dropped on `new_parent`.
         If new_parent is 0, decks will be placed at the top level."""
-        return self.col._backend.reparent_decks(
-            deck_ids=deck_ids, new_parent=new_parent
+        return self._after_deck_write(
+            self.col._backend.reparent_decks(deck_ids=deck_ids, new_parent=new_parent)
         )
 
     # Deck configurations
@@ -298,6 +399,7 @@ class DeckManager(DeprecatedNamesMixin):
 
     def update_deck_configs(self, input: UpdateDeckConfigs) -> OpChanges:
         op_bytes = self.col._backend.update_deck_configs_raw(input.SerializeToString())
+        self._clear_cache()
         return OpChanges.FromString(op_bytes)
 
     def all_config(self) -> list[DeckConfigDict]:
@@ -318,17 +420,28 @@ class DeckManager(DeprecatedNamesMixin):
         # dynamic decks have embedded conf
         return deck
 
+    def config_immutable_for_deck_id(self, did: DeckId) -> Mapping[str, Any]:
+        "Like config_dict_for_deck_id(), but returns a shared read-only view."
+        if (view := self._deck_config_views.get(did)) is None:
+            view = _freeze(self.config_dict_for_deck_id(did))
+            self._deck_config_views[did] = view
+        return view
+
     def get_config(self, conf_id: DeckConfigId) -> DeckConfigDict | None:
-        try:
-            return from_json_bytes(self.col._backend.get_deck_config_legacy(conf_id))
-        except NotFoundError:
-            return None
+        if (json := self._config_json.get(conf_id)) is None:
+            try:
+                json = self.col._backend.get_deck_config_legacy(conf_id)
+            except NotFoundError:
+                return None
+            self._config_json[conf_id] = json
+        return from_json_bytes(json)
 
     def update_config(self, conf: DeckConfigDict, preserve_usn: bool = False) -> None:
         "preserve_usn is ignored"
         conf["id"] = self.col._backend.add_or_update_deck_config_legacy(
             json=to_json_bytes(conf)
         )
+        self._clear_config_cache()
 
     def add_config(
         self, name: str, clone_from: DeckConfigDict | None = None
@@ -358,6 +471,7 @@ class DeckManager(DeprecatedNamesMixin):
                 deck["conf"] = 1
                 self.save(deck)
         self.col._backend.remove_deck_config(id)
+        self._clear_config_cache()
 
     def set_config_id_for_deck_dict(self, deck: DeckDict, id: DeckConfigId) -> None:
         deck["conf"] = id
@@ -401,10 +515,14 @@ class DeckManager(DeprecatedNamesMixin):
         dids = [did]
         for name, id in self.children(did):
             dids.append(id)
-        return self.col.db.list(f"select id from cards where did in {ids2str(dids)}")
+        return self.col.db.list(
+            f"select id from cards where did in {BOUND_IDS}", bind_ids(dids)
+        )
 
     def for_card_ids(self, cids: list[anki.cards.CardId]) -> list[DeckId]:
-        return self.col.db.list(f"select did from cards where id in {ids2str(cids)}")
+        return self.col.db.list(
+            f"select did from cards where id in {BOUND_IDS}", bind_ids(cids)
+        )
 
     # Deck selection
     #############################################################
@@ -557,10 +675,11 @@ class DeckManager(DeprecatedNamesMixin):
     def set_deck(self, cids: list[anki.cards.CardId], did: DeckId) -> None:
         self.col.set_deck(card_ids=cids, deck_id=did)
         self.col.db.execute(
-            f"update cards set did=?,usn=?,mod=? where id in {ids2str(cids)}",
+            f"update cards set did=?,usn=?,mod=? where id in {BOUND_IDS}",
             did,
             self.col.usn(),
             int_time(),
+            bind_ids(cids),
         )
 
     @deprecated(replaced_by=all_names_and_ids)
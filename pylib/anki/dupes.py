@@ -0,0 +1,206 @@
+# Copyright: Ankitects Pty Ltd and contributors
+# License: GNU AGPL, version 3 or later; http://www.gnu.org/licenses/agpl.html
+
+"""
+Finding notes that share the same content in a field.
+
+Notes are read in batches, and the field of each batch is stripped of HTML
+with a single backend call. Only a checksum of each stripped value is kept
+while the notes are scanned, and the text of a group of duplicates is read
+back when it is found.
+
+If an index path is provided, the checksum of each note's field is stored in
+a separate SQLite file, alongside a checksum of the unstripped text, so that
+later searches only need to strip fields that have changed since.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import time
+from collections.abc import Callable, Iterable, Sequence
+
+from anki.collection import Collection, SearchNode, StripHtmlMode
+from anki.dbproxy import BOUND_IDS, bind_ids
+from anki.errors import Interrupted
+from anki.models import NotetypeId
+from anki.notes import NoteId
+from anki.utils import ids2str, split_fields
+
+DupeGroup = tuple[str, list[NoteId]]
+
+BATCH_SIZE = 1000
+
+
+def find_dupes(
+    col: Collection,
+    field_name: str,
+    search: str = "",
+    progress_cb: Callable[[int, int], bool] | None = None,
+    index_path: str | None = None,
+    batch_size: int = BATCH_SIZE,
+) -> list[DupeGroup]:
+    """Return (stripped_text, note_ids) for each group of notes matching
+    search whose field_name field has the same content once HTML is removed.
+    Empty fields are ignored. Groups are ordered by when their second note is
+    encountered.
+
+    If a progress callback is provided, it is called with the number of notes
+    checked so far and the total. If it returns false, Interrupted is raised."""
+    nids = col.find_notes(
+        col.build_search_string(search, SearchNode(field_name=field_name))
+    )
+    index = ChecksumIndex(index_path, field_name) if index_path else None
+    field_ords: dict[NotetypeId, int | None] = {}
+    # the first note seen with each checksum, until a second one turns up
+    first_seen: dict[bytes, NoteId] = {}
+    groups: dict[bytes, list[NoteId]] = {}
+    texts: dict[bytes, str] = {}
+    last_progress = 0.0
+
+    def field_ord(mid: NotetypeId) -> int | None:
+        if mid not in field_ords:
+            field_ords[mid] = None
+            for idx, field in enumerate(col.models.get(mid)["flds"]):
+                if field["name"].lower() == field_name.lower():
+                    field_ords[mid] = idx
+                    break
+        return field_ords[mid]
+
+    try:
+        for start in range(0, len(nids), batch_size):
+            values = _field_values(col, nids[start : start + batch_size], field_ord)
+            raw_csums = [_checksum(text) for _, text in values]
+            known = index.lookup(values, raw_csums) if index else {}
+            missing = [idx for idx, (nid, _) in enumerate(values) if nid not in known]
+            stripped = _strip_html(col, [values[idx][1] for idx in missing])
+            new = {
+                values[idx][0]: (text, _checksum(text) if text else b"")
+                for idx, text in zip(missing, stripped)
+            }
+            if index:
+                index.update(
+                    (values[idx][0], raw_csums[idx], new[values[idx][0]][1])
+                    for idx in missing
+                )
+
+            for nid, _ in values:
+                text, csum = new.get(nid) or ("", known[nid])
+                # empty does not count as duplicate
+                if not csum:
+                    continue
+                if group := groups.get(csum):
+                    group.append(nid)
+                elif other := first_seen.pop(csum, None):
+                    groups[csum] = [other, nid]
+                else:
+                    first_seen[csum] = nid
+                    continue
+                if text and csum not in texts:
+                    texts[csum] = text
+
+            if progress_cb and time.time() - last_progress >= 0.1:
+                last_progress = time.time()
+                if not progress_cb(min(start + batch_size, len(nids)), len(nids)):
+                    raise Interrupted("", None, None, None)
+    finally:
+        if index:
+            index.close()
+
+    _fill_missing_texts(col, groups, texts, field_ord)
+    return [(texts[csum], group) for csum, group in groups.items()]
+
+
+def _field_values(
+    col: Collection,
+    nids: Sequence[NoteId],
+    field_ord: Callable[[NotetypeId], int | None],
+) -> list[tuple[NoteId, str]]:
+    "(nid, field text) for each note with the field, in the order of nids."
+    values: dict[NoteId, str] = {}
+    for nid, mid, flds in col.db.execute(
+        f"select id, mid, flds from notes where id in {BOUND_IDS}", bind_ids(nids)
+    ):
+        if (ord := field_ord(mid)) is not None:
+            values[nid] = split_fields(flds)[ord]
+    return [(nid, values[nid]) for nid in nids if nid in values]
+
+
+def _fill_missing_texts(
+    col: Collection,
+    groups: dict[bytes, list[NoteId]],
+    texts: dict[bytes, str],
+    field_ord: Callable[[NotetypeId], int | None],
+) -> None:
+    "Strip the text of groups whose notes were all found in the index."
+    missing = {groups[csum][0]: csum for csum in groups if csum not in texts}
+    nids = list(missing)
+    for start in range(0, len(nids), BATCH_SIZE):
+        values = _field_values(col, nids[start : start + BATCH_SIZE], field_ord)
+        stripped = _strip_html(col, [text for _, text in values])
+        for (nid, _), text in zip(values, stripped):
+            texts[missing[nid]] = text
+
+
+def _strip_html(col: Collection, texts: list[str]) -> Sequence[str]:
+    if not texts:
+        return []
+    return col._backend.strip_html_texts(
+        texts=texts, mode=StripHtmlMode.PRESERVE_MEDIA_FILENAMES
+    )
+
+
+def _checksum(text: str) -> bytes:
+    return hashlib.sha1(text.encode("utf8")).digest()
+
+
+class ChecksumIndex:
+    """Checksums of a field's stripped text, keyed by note id and field name.
+
+    Each entry is only used while the checksum of the note's unstripped
+    field text still matches, so entries never need to be invalidated.
+    Entries of notes that have since been deleted are left behind."""
+
+    def __init__(self, path: str, field_name: str) -> None:
+        self.field_name = field_name.lower()
+        self.db = sqlite3.connect(path)
+        self.db.execute(
+            """
+create table if not exists checksums (
+  nid integer not null,
+  field text not null,
+  raw blob not null,
+  csum blob not null,
+  primary key (nid, field)
+) without rowid"""
+        )
+
+    def lookup(
+        self, values: list[tuple[NoteId, str]], raw_csums: list[bytes]
+    ) -> dict[NoteId, bytes]:
+        "Checksums of the values whose text has not changed since they were added."
+        stored = {
+            nid: (raw, csum)
+            for nid, raw, csum in self.db.execute(
+                "select nid, raw, csum from checksums where field = ? and nid in "
+                + ids2str(nid for nid, _ in values),
+                (self.field_name,),
+            )
+        }
+        known = {}
+        for (nid, _), raw in zip(values, raw_csums):
+            if (entry := stored.get(nid)) and entry[0] == raw:
+                known[nid] = entry[1]
+        return known
+
+    def update(self, entries: Iterable[tuple[NoteId, bytes, bytes]]) -> None:
+        "Store (nid, raw_csum, csum) entries."
+        self.db.executemany(
+            "insert or replace into checksums values (?, ?, ?, ?)",
+            ((nid, self.field_name, raw, csum) for nid, raw, csum in entries),
+        )
+
+    def close(self) -> None:
+        self.db.commit()
+        self.db.close()
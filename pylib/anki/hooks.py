@@ -25,6 +25,13 @@ from anki.hooks_gen import *
 ##############################################################################
 
 _hooks: dict[str, list[Callable[..., Any]]] = {}
+# bumped whenever a function is added to or removed from a legacy hook
+_generation = 0
+
+
+def _hooks_changed() -> None:
+    global _generation
+    _generation += 1
 
 
 def runHook(hook: str, *args: Any) -> None:
@@ -36,6 +43,7 @@ def runHook(hook: str, *args: Any) -> None:
                 func(*args)
             except Exception:
                 hookFuncs.remove(func)
+                _hooks_changed()
                 raise
 
 
@@ -47,6 +55,7 @@ def runFilter(hook: str, arg: Any, *args: Any) -> Any:
                 arg = func(arg, *args)
             except Exception:
                 hookFuncs.remove(func)
+                _hooks_changed()
                 raise
     return arg
 
@@ -57,6 +66,7 @@ def addHook(hook: str, func: Callable) -> None:
         _hooks[hook] = []
     if func not in _hooks[hook]:
         _hooks[hook].append(func)
+        _hooks_changed()
 
 
 def remHook(hook: Any, func: Any) -> None:
@@ -64,6 +74,18 @@ def remHook(hook: Any, func: Any) -> None:
     hook = _hooks.get(hook, [])
     if func in hook:
         hook.remove(func)
+        _hooks_changed()
+
+
+def has_legacy_hook(hook: str) -> bool:
+    "True if any function has been added to the legacy hook."
+    return bool(_hooks.get(hook))
+
+
+def legacy_hooks_generation() -> int:
+    """A number that changes whenever a function is added to or removed from
+    a legacy hook, so that results depending on them can be cached."""
+    return _generation
 
 
 # Monkey patching
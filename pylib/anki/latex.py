@@ -5,6 +5,11 @@ from __future__ import annotations
 
 import html
 import os
+import shutil
+import tempfile
+import threading
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
 
 import anki
@@ -13,7 +18,7 @@ from anki import card_rendering_pb2, hooks
 from anki.config import Config
 from anki.models import NotetypeDict
 from anki.template import TemplateRenderContext, TemplateRenderOutput
-from anki.utils import call, is_mac, namedtmp, tmpdir
+from anki.utils import call, checksum, is_mac, tmpdir
 
 pngCommands = [
     ["latex", "-interaction=nonstopmode", "tmp.tex"],
@@ -93,6 +98,10 @@ def render_latex_returning_errors(
     """Returns (text, errors).
 
     errors will be non-empty if LaTeX failed to render."""
+    if "[" not in html:
+        # no LaTeX tags, so the backend doesn't need to be asked
+        return html, []
+
     svg = model.get("latexsvg", False)
     header = model["latexPre"]
     footer = model["latexPost"]
@@ -125,10 +134,57 @@ def _save_latex_image(
     footer: str,
     svg: bool,
 ) -> str | None:
-    # add header/footer
-    latex = f"{header}\n{extracted.latex_body}\n{footer}"
+    result = _run_latex(header, extracted.latex_body, footer, svg)
+    if result.failed_command:
+        return _err_msg(col, result.failed_command, result.texpath, result.log)
+    # add to media
+    assert result.data is not None
+    col.media.write_data(extracted.filename, result.data)
+    return None
+
+
+@dataclass
+class LatexResult:
+    texpath: str
+    data: bytes | None = None
+    # set if rendering failed
+    failed_command: str | None = None
+    log: str = ""
+
+
+# Failed renders are remembered for the rest of the session, so a broken
+# formula doesn't run the toolchain again each time a card using it is shown.
+# The commands are part of the key, so changing them causes a retry.
+
+_failed_renders: dict[str, LatexResult] = {}
+_FAILED_RENDERS_MAX = 1000
+
 
-    # commands to use
+def clear_failed_renders() -> None:
+    "Allow LaTeX that previously failed to render to be tried again."
+    with _lock:
+        _failed_renders.clear()
+
+
+# The part of the header before \begin{document} is compiled into a format
+# file the first time it is used, so the document class and packages don't
+# need to be loaded again for every image. If the preamble can't be dumped,
+# or an image fails to render with the format, the full document is compiled
+# instead.
+
+use_precompiled_preambles = True
+_PRECOMPILABLE_ENGINES = ("latex", "pdflatex")
+# preamble checksum -> format path, or None if it could not be precompiled
+_formats: dict[str, str | None] = {}
+# held while a preamble's format is built, so other threads wait for it
+# instead of building it again, while renders with other preambles continue
+_format_locks: dict[str, threading.Lock] = {}
+_lock = threading.Lock()
+
+
+def _run_latex(header: str, body: str, footer: str, svg: bool) -> LatexResult:
+    """Render a LaTeX image, in a new temporary folder. Does not touch the
+    collection, so can be called from any thread."""
     if svg:
         latex_cmds = svgCommands
         ext = "svg"
@@ -136,37 +192,148 @@ def _save_latex_image(
         latex_cmds = pngCommands
         ext = "png"
 
-    # write into a temp file
-    log = open(namedtmp("latex_log.txt"), "w", encoding="utf8")
-    texpath = namedtmp("tmp.tex")
-    texfile = open(texpath, "w", encoding="utf8")
-    texfile.write(latex)
-    texfile.close()
-    oldcwd = os.getcwd()
-    png_or_svg = namedtmp(f"tmp.{ext}")
-    try:
-        # generate png/svg
-        os.chdir(tmpdir())
+    document = f"{header}\n{body}\n{footer}"
+    key = checksum(f"{latex_cmds}{document}")
+    with _lock:
+        if failed := _failed_renders.get(key):
+            return failed
+
+    result = None
+    preamble, begin, rest = header.partition("\\begin{document}")
+    if fmt := begin and _format_for_preamble(latex_cmds[0][0], preamble):
+        result = _compile(
+            f"{begin}{rest}\n{body}\n{footer}",
+            [[latex_cmds[0][0], f"-fmt={fmt}", *latex_cmds[0][1:]], *latex_cmds[1:]],
+            ext,
+        )
+        if result.failed_command:
+            # may not be the formula's fault; check without the format
+            result = None
+    if not result:
+        result = _compile(document, latex_cmds, ext)
+        if fmt and not result.failed_command:
+            # the preamble doesn't work when precompiled
+            with _lock:
+                _formats[checksum(f"{latex_cmds[0][0]}{preamble}")] = None
+
+    if result.failed_command:
+        with _lock:
+            if len(_failed_renders) >= _FAILED_RENDERS_MAX:
+                del _failed_renders[next(iter(_failed_renders))]
+            _failed_renders[key] = result
+    return result
+
+
+def _compile(latex: str, latex_cmds: list[list[str]], ext: str) -> LatexResult:
+    folder = tempfile.mkdtemp(prefix="latex", dir=tmpdir())
+    texpath = os.path.join(folder, "tmp.tex")
+    with open(texpath, "w", encoding="utf8") as texfile:
+        texfile.write(latex)
+    logpath = os.path.join(folder, "latex_log.txt")
+    with open(logpath, "w", encoding="utf8") as log:
         for latex_cmd in latex_cmds:
-            if call(latex_cmd, stdout=log, stderr=log):
-                return _err_msg(col, latex_cmd[0], texpath)
-        # add to media
-        with open(png_or_svg, "rb") as file:
-            data = file.read()
-        col.media.write_data(extracted.filename, data)
-        os.unlink(png_or_svg)
+            if call(latex_cmd, stdout=log, stderr=log, cwd=folder):
+                failed_command = latex_cmd[0]
+                break
+        else:
+            failed_command = None
+    if failed_command:
+        # the folder is kept so the user can inspect the files
+        with open(logpath, encoding="utf8", errors="replace") as file:
+            log_text = file.read()
+        return LatexResult(texpath, failed_command=failed_command, log=log_text)
+    with open(os.path.join(folder, f"tmp.{ext}"), "rb") as file:
+        data = file.read()
+    shutil.rmtree(folder, ignore_errors=True)
+    return LatexResult(texpath, data=data)
+
+
+def _format_for_preamble(engine: str, preamble: str) -> str | None:
+    "Path of a format file with the preamble preloaded, building it if required."
+    if not use_precompiled_preambles or engine not in _PRECOMPILABLE_ENGINES:
         return None
-    finally:
-        os.chdir(oldcwd)
-        log.close()
+    key = checksum(f"{engine}{preamble}")
+    with _lock:
+        if key in _formats:
+            return _formats[key]
+        format_lock = _format_locks.setdefault(key, threading.Lock())
+    with format_lock:
+        with _lock:
+            if key in _formats:
+                # built while we were waiting
+                return _formats[key]
+        folder = os.path.join(tmpdir(), "latex_formats")
+        os.makedirs(folder, exist_ok=True)
+        name = f"preamble-{key}"
+        with open(os.path.join(folder, f"{name}.tex"), "w", encoding="utf8") as file:
+            file.write(f"{preamble}\n\\dump\n")
+        cmd = [
+            engine,
+            "-ini",
+            "-interaction=nonstopmode",
+            f"-jobname={name}",
+            f"&{engine}",
+            f"{name}.tex",
+        ]
+        with open(os.path.join(folder, f"{name}.txt"), "w", encoding="utf8") as log:
+            failed = call(cmd, stdout=log, stderr=log, cwd=folder)
+        path = os.path.join(folder, f"{name}.fmt")
+        fmt = path if not failed and os.path.exists(path) else None
+        with _lock:
+            _formats[key] = fmt
+            del _format_locks[key]
+        return fmt
+
+
+class LatexRenderPool:
+    """Renders LaTeX images in parallel, for bulk operations.
 
+    Each job runs in its own temporary folder. Jobs for a filename that has
+    already been submitted are not run again, and share the first job's
+    result."""
 
-def _err_msg(col: anki.collection.Collection, type: str, texpath: str) -> str:
+    def __init__(self, max_workers: int | None = None) -> None:
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or os.cpu_count(), thread_name_prefix="latex"
+        )
+        self._jobs: dict[str, Future[LatexResult]] = {}
+
+    def submit(
+        self,
+        extracted: ExtractedLatex,
+        header: str,
+        footer: str,
+        svg: bool,
+        on_done: Callable[[Future[LatexResult]], None] | None = None,
+    ) -> tuple[Future[LatexResult], bool]:
+        """Returns the job's future, and whether a new job was started.
+        If provided, on_done is called from a pool thread when a new job
+        completes."""
+        if job := self._jobs.get(extracted.filename):
+            return job, False
+        job = self._executor.submit(
+            _run_latex, header, extracted.latex_body, footer, svg
+        )
+        if on_done:
+            job.add_done_callback(on_done)
+        self._jobs[extracted.filename] = job
+        return job, True
+
+    def shutdown(self) -> None:
+        "Wait for running jobs to finish, and discard any that have not started."
+        self._executor.shutdown(cancel_futures=True)
+
+
+def _err_msg(
+    col: anki.collection.Collection, type: str, texpath: str, log: str | None = None
+) -> str:
     msg = f"{col.tr.media_error_executing(val=type)}<br>"
     msg += f"{col.tr.media_generated_file(val=texpath)}<br>"
     try:
-        with open(namedtmp("latex_log.txt", remove=False), encoding="utf8") as file:
-            log = file.read()
+        if log is None:
+            logpath = os.path.join(os.path.dirname(texpath), "latex_log.txt")
+            with open(logpath, encoding="utf8") as file:
+                log = file.read()
         if not log:
             raise Exception()
         msg += f"<small><pre>{html.escape(log)}</pre></small>"
@@ -5,19 +5,28 @@ from __future__ import annotations
 
 import os
 import pprint
+import queue
 import re
 import sys
 import time
 from collections.abc import Callable, Sequence
+from concurrent.futures import Future
 
 from anki import media_pb2
 from anki._legacy import DeprecatedNamesMixin, deprecated_keywords
+from anki.config import Config
 from anki.consts import *
-from anki.latex import render_latex, render_latex_returning_errors
+from anki.latex import (
+    ExtractedLatexOutput,
+    LatexRenderPool,
+    LatexResult,
+    _err_msg,
+    clear_failed_renders,
+    render_latex,
+)
 from anki.models import NotetypeId
 from anki.sound import SoundOrVideoTag
 from anki.template import av_tags_to_native
-from anki.utils import int_time
 
 
 def media_paths_from_col_path(col_path: str) -> tuple[str, str]:
@@ -182,35 +191,108 @@ class MediaManager(DeprecatedNamesMixin):
         return output
 
     def render_all_latex(
-        self, progress_cb: Callable[[int], bool] | None = None
+        self,
+        progress_cb: Callable[[int], bool] | None = None,
+        max_workers: int | None = None,
     ) -> tuple[int, str] | None:
         """Render any LaTeX that is missing.
 
-        If a progress callback is provided and it returns false, the operation
-        will be aborted.
+        Images are rendered in parallel by up to max_workers processes, which
+        defaults to the number of CPUs. Identical LaTeX is only rendered once.
+
+        If a progress callback is provided, it is called with the number of
+        notes checked so far. If it returns false, the operation will be
+        aborted.
 
         If an error is encountered, returns (note_id, error_message)
         """
+        render_enabled = self.col.get_config_bool(Config.Bool.RENDER_LATEX)
+        # the user may have fixed their LaTeX installation
+        clear_failed_renders()
+        pool = LatexRenderPool(max_workers)
+        completed: queue.SimpleQueue[Future[LatexResult]] = queue.SimpleQueue()
+        # the filename of each running job, and the notes waiting on it
+        waiting: dict[Future[LatexResult], tuple[str, list[int]]] = {}
+        # the number of jobs each note is waiting on
+        outstanding: dict[int, int] = {}
         last_progress = time.time()
         checked = 0
-        for nid, mid, flds in self.col.db.execute(
-            "select id, mid, flds from notes where flds like '%[%'"
-        ):
-            model = self.col.models.get(mid)
-            _html, errors = render_latex_returning_errors(
-                flds, model, self.col, expand_clozes=True
-            )
-            if errors:
-                return (nid, "\n".join(errors))
-
-            checked += 1
-            elap = time.time() - last_progress
-            if elap >= 0.3 and progress_cb is not None:
-                last_progress = int_time()
-                if not progress_cb(checked):
+
+        def on_job_done(job: Future[LatexResult]) -> tuple[int, str] | None:
+            nonlocal checked
+            filename, nids = waiting.pop(job)
+            result = job.result()
+            if result.failed_command:
+                msg = _err_msg(
+                    self.col, result.failed_command, result.texpath, result.log
+                )
+                return (nids[0], msg)
+            assert result.data is not None
+            self.write_data(filename, result.data)
+            for nid in nids:
+                outstanding[nid] -= 1
+                if not outstanding[nid]:
+                    del outstanding[nid]
+                    checked += 1
+            return None
+
+        def should_continue() -> bool:
+            nonlocal last_progress
+            if progress_cb is None or time.time() - last_progress < 0.3:
+                return True
+            last_progress = time.time()
+            return progress_cb(checked)
+
+        try:
+            for nid, mid, flds in self.col.db.execute(
+                "select id, mid, flds from notes where flds like '%[%'"
+            ):
+                model = self.col.models.get(mid)
+                svg = model.get("latexsvg", False)
+                out = ExtractedLatexOutput.from_proto(
+                    self.col._backend.extract_latex(
+                        text=flds, svg=svg, expand_clozes=True
+                    )
+                )
+                for latex in out.latex:
+                    # already rendered, including by an earlier job?
+                    if self.have(latex.filename):
+                        continue
+                    if not render_enabled:
+                        msg = self.col.tr.preferences_latex_generation_disabled()
+                        return (nid, msg)
+                    job, _ = pool.submit(
+                        latex,
+                        model["latexPre"],
+                        model["latexPost"],
+                        svg,
+                        on_done=completed.put,
+                    )
+                    waiting.setdefault(job, (latex.filename, []))[1].append(nid)
+                    outstanding[nid] = outstanding.get(nid, 0) + 1
+                if nid not in outstanding:
+                    checked += 1
+
+                while not completed.empty():
+                    if error := on_job_done(completed.get()):
+                        return error
+                if not should_continue():
+                    return None
+
+            while waiting:
+                try:
+                    job = completed.get(timeout=0.3)
+                except queue.Empty:
+                    pass
+                else:
+                    if error := on_job_done(job):
+                        return error
+                if not should_continue():
                     return None
 
-        return None
+            return None
+        finally:
+            pool.shutdown()
 
     # Legacy
     ##########################################################################
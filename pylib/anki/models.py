@@ -85,7 +85,7 @@ class ModelManager(DeprecatedNamesMixin):
         self.col = col.weakref()
         self.models = ModelsDictProxy(col)
         # do not access this directly!
-        self._cache = {}
+        self._clear_cache()
 
     def __repr__(self) -> str:
         attrs = dict(self.__dict__)
@@ -98,8 +98,17 @@ class ModelManager(DeprecatedNamesMixin):
     # frequently obtain access to an entire notetype, so we currently
     # need to cache responses from the backend. Please do not
     # access the cache directly!
+    #
+    # Entries are dropped when notetypes are changed via this class, and
+    # the whole cache is cleared when an operation reports notetype changes
+    # (see Collection._invalidate_caches()).
 
     _cache: dict[NotetypeId, NotetypeDict] = {}
+    _field_maps: dict[NotetypeId, dict[str, tuple[int, FieldDict]]]
+    # name/id listing, and ids by exact name
+    _names_and_ids: Sequence[NotetypeNameId] | None
+    _ids_by_name: dict[str, NotetypeId]
+    _ids: set[int]
 
     def _update_cache(self, notetype: NotetypeDict) -> None:
         self._cache[notetype["id"]] = notetype
@@ -107,18 +116,32 @@ class ModelManager(DeprecatedNamesMixin):
     def _remove_from_cache(self, ntid: NotetypeId) -> None:
         if ntid in self._cache:
             del self._cache[ntid]
+        self._field_maps.pop(ntid, None)
+        # the notetype may have been added, renamed or removed
+        self._names_and_ids = None
 
     def _get_cached(self, ntid: NotetypeId) -> NotetypeDict | None:
         return self._cache.get(ntid)
 
     def _clear_cache(self) -> None:
         self._cache = {}
+        self._field_maps = {}
+        self._names_and_ids = None
+
+    def _cached_names_and_ids(self) -> Sequence[NotetypeNameId]:
+        if self._names_and_ids is None:
+            self._names_and_ids = self.col._backend.get_notetype_names()
+            self._ids_by_name = {
+                entry.name: NotetypeId(entry.id) for entry in self._names_and_ids
+            }
+            self._ids = {entry.id for entry in self._names_and_ids}
+        return self._names_and_ids
 
     # Listing note types
     #############################################################
 
     def all_names_and_ids(self) -> Sequence[NotetypeNameId]:
-        return self.col._backend.get_notetype_names()
+        return self._cached_names_and_ids()
 
     def all_use_counts(self) -> Sequence[NotetypeNameIdUseCount]:
         return self.col._backend.get_notetype_names_and_counts()
@@ -127,7 +150,10 @@ class ModelManager(DeprecatedNamesMixin):
     def have(self, id: NotetypeId) -> bool:
         if isinstance(id, str):
             id = int(id)
-        return any(True for e in self.all_names_and_ids() if e.id == id)
+        if id in self._cache:
+            return True
+        self._cached_names_and_ids()
+        return id in self._ids
 
     # Current note type
     #############################################################
@@ -145,6 +171,11 @@ class ModelManager(DeprecatedNamesMixin):
     #############################################################
 
     def id_for_name(self, name: str) -> NotetypeId | None:
+        self._cached_names_and_ids()
+        if ntid := self._ids_by_name.get(name):
+            return ntid
+        # names in a different case are matched by the backend, which uses the
+        # same case folding as the DB
         try:
             return NotetypeId(self.col._backend.get_notetype_id_by_name(name))
         except NotFoundError:
@@ -208,13 +239,16 @@ class ModelManager(DeprecatedNamesMixin):
         self.ensure_name_unique(notetype)
         out = self.col._backend.add_notetype_legacy(to_json_bytes(notetype))
         notetype["id"] = out.id
+        self._remove_from_cache(NotetypeId(out.id))
         self._mutate_after_write(notetype)
         return out
 
     def add_dict(self, notetype: NotetypeDict) -> OpChangesWithId:
         "Notetype needs to be fetched from DB after adding."
         self.ensure_name_unique(notetype)
-        return self.col._backend.add_notetype_legacy(to_json_bytes(notetype))
+        out = self.col._backend.add_notetype_legacy(to_json_bytes(notetype))
+        self._remove_from_cache(NotetypeId(out.id))
+        return out
 
     def ensure_name_unique(self, notetype: NotetypeDict) -> None:
         existing_id = self.id_for_name(notetype["name"])
@@ -272,8 +306,32 @@ class ModelManager(DeprecatedNamesMixin):
     ##################################################
 
     def field_map(self, notetype: NotetypeDict) -> dict[str, tuple[int, FieldDict]]:
-        "Mapping of field name -> (ord, field)."
-        return {f["name"]: (f["ord"], f) for f in notetype["flds"]}
+        """Mapping of field name -> (ord, field).
+
+        The map of a cached notetype is shared, so it must not be modified."""
+        ntid = notetype["id"]
+        flds = notetype["flds"]
+        if self._cache.get(ntid) is not notetype:
+            # a copy that may have been modified
+            return {f["name"]: (f["ord"], f) for f in flds}
+        fmap = self._field_maps.get(ntid)
+        # the fields of the cached notetype may have been changed in place
+        if fmap is None or not self._field_map_matches(fmap, flds):
+            fmap = {f["name"]: (f["ord"], f) for f in flds}
+            self._field_maps[ntid] = fmap
+        return fmap
+
+    @staticmethod
+    def _field_map_matches(
+        fmap: dict[str, tuple[int, FieldDict]], flds: list[FieldDict]
+    ) -> bool:
+        if len(fmap) != len(flds):
+            return False
+        for fld in flds:
+            entry = fmap.get(fld["name"])
+            if entry is None or entry[1] is not fld or entry[0] != fld["ord"]:
+                return False
+        return True
 
     def field_names(self, notetype: NotetypeDict) -> list[str]:
         return [f["name"] for f in notetype["flds"]]
@@ -301,10 +359,12 @@ class ModelManager(DeprecatedNamesMixin):
     def add_field(self, notetype: NotetypeDict, field: FieldDict) -> None:
         "Modifies schema."
         notetype["flds"].append(field)
+        self._field_maps.pop(notetype["id"], None)
 
     def remove_field(self, notetype: NotetypeDict, field: FieldDict) -> None:
         "Modifies schema."
         notetype["flds"].remove(field)
+        self._field_maps.pop(notetype["id"], None)
 
     def reposition_field(
         self, notetype: NotetypeDict, field: FieldDict, idx: int
@@ -316,6 +376,7 @@ class ModelManager(DeprecatedNamesMixin):
 
         notetype["flds"].remove(field)
         notetype["flds"].insert(idx, field)
+        self._field_maps.pop(notetype["id"], None)
 
     def rename_field(
         self, notetype: NotetypeDict, field: FieldDict, new_name: str
@@ -323,6 +384,7 @@ class ModelManager(DeprecatedNamesMixin):
         if field not in notetype["flds"]:
             raise Exception("invalid field")
         field["name"] = new_name
+        self._field_maps.pop(notetype["id"], None)
 
     def set_sort_index(self, notetype: NotetypeDict, idx: int) -> None:
         "Modifies schema."
@@ -415,6 +477,7 @@ and notes.mid = ? and cards.ord = ?""",
         )
         if force_kind is not None:
             msg.force_kind = force_kind
+        self._remove_from_cache(notetype_id)
         return self.col._backend.restore_notetype_to_stock(msg)
 
     # legacy API - used by unit tests and add-ons
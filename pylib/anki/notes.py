@@ -5,6 +5,7 @@ from __future__ import annotations
 
 import copy
 from collections.abc import Sequence
+from dataclasses import dataclass, field
 from typing import NewType
 
 import anki
@@ -15,7 +16,7 @@ import anki.template
 from anki import hooks, notes_pb2
 from anki._legacy import DeprecatedNamesMixin, deprecated
 from anki.consts import MODEL_STD
-from anki.models import NotetypeDict, NotetypeId, TemplateDict
+from anki.models import FieldDict, NotetypeDict, NotetypeId, TemplateDict
 from anki.utils import join_fields
 
 DuplicateOrEmptyResult = notes_pb2.NoteFieldsCheckResponse.State
@@ -38,6 +39,7 @@ class Note(DeprecatedNamesMixin):
         col: anki.collection.Collection,
         model: NotetypeDict | NotetypeId | None = None,
         id: NoteId | None = None,
+        backend_note: notes_pb2.Note | None = None,
     ) -> None:
         if model and id:
             raise Exception("only model or id should be provided")
@@ -48,6 +50,8 @@ class Note(DeprecatedNamesMixin):
             # existing note
             self.id = id
             self.load()
+        elif backend_note:
+            self._load_from_backend_note(backend_note)
         else:
             # new note for provided notetype
             self._load_from_backend_note(self.col._backend.new_note(notetype_id))
@@ -132,7 +136,7 @@ class Note(DeprecatedNamesMixin):
         return card
 
     def cards(self) -> list[anki.cards.Card]:
-        return [self.col.get_card(id) for id in self.card_ids()]
+        return self.col.get_cards(self.card_ids())
 
     def card_ids(self) -> Sequence[anki.cards.CardId]:
         return self.col.card_ids_of_note(self.id)
@@ -202,6 +206,74 @@ class Note(DeprecatedNamesMixin):
     dupeOrEmpty = duplicate_or_empty = fields_check
 
 
+@dataclass(frozen=True, slots=True)
+class NoteSnapshot:
+    """A compact, read-only copy of a note, without a reference to the collection.
+
+    Notes of the same notetype share a single field map. Use
+    col.get_note_snapshots() to fetch them, and .to_note() to get a full Note
+    when it needs to be modified."""
+
+    id: NoteId
+    guid: str
+    mid: NotetypeId
+    mod: int
+    usn: int
+    tags: tuple[str, ...]
+    fields: tuple[str, ...]
+    _fmap: dict[str, tuple[int, FieldDict]] = field(repr=False, compare=False)
+
+    @staticmethod
+    def _from_backend_note(
+        note: notes_pb2.Note, fmap: dict[str, tuple[int, FieldDict]]
+    ) -> NoteSnapshot:
+        return NoteSnapshot(
+            id=NoteId(note.id),
+            guid=note.guid,
+            mid=NotetypeId(note.notetype_id),
+            mod=note.mtime_secs,
+            usn=note.usn,
+            tags=tuple(note.tags),
+            fields=tuple(note.fields),
+            _fmap=fmap,
+        )
+
+    def to_note(self, col: anki.collection.Collection) -> Note:
+        return Note(
+            col,
+            backend_note=notes_pb2.Note(
+                id=self.id,
+                guid=self.guid,
+                notetype_id=self.mid,
+                mtime_secs=self.mod,
+                usn=self.usn,
+                tags=self.tags,
+                fields=self.fields,
+            ),
+        )
+
+    def joined_fields(self) -> str:
+        return join_fields(list(self.fields))
+
+    def keys(self) -> list[str]:
+        return list(self._fmap.keys())
+
+    def values(self) -> tuple[str, ...]:
+        return self.fields
+
+    def items(self) -> list[tuple[str, str]]:
+        return [(f["name"], self.fields[ord]) for ord, f in sorted(self._fmap.values())]
+
+    def __getitem__(self, key: str) -> str:
+        try:
+            return self.fields[self._fmap[key][0]]
+        except Exception as exc:
+            raise KeyError(key) from exc
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._fmap
+
+
 Note.register_deprecated_aliases(
     delTag=Note.remove_tag, _fieldOrd=Note._field_index, model=Note.note_type
 )
@@ -0,0 +1,308 @@
+# Copyright: Ankitects Pty Ltd and contributors
+# License: GNU AGPL, version 3 or later; http://www.gnu.org/licenses/agpl.html
+
+"""
+A process pool for running the same operation over many collections.
+
+    def check(col: Collection) -> tuple[str, bool]:
+        return col.fix_integrity()
+
+    with CollectionPool(processes=4) as pool:
+        for result in pool.map(check, paths, timeout=600):
+            if result.error:
+                print(result.path, "failed:", result.error)
+
+Each worker process keeps its own backend for its lifetime, and opens the
+collection at the task's path on demand, closing it again when the task
+completes. The function must be picklable (eg defined at module level), as
+must its return value.
+
+When a task exceeds its timeout or is cancelled while running, its worker is
+asked to abort the current backend operation with set_wants_abort(). Not all
+operations can be aborted, so if the worker has not finished after a grace
+period, it is terminated and replaced.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import pickle
+import threading
+import time
+import traceback
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass
+from multiprocessing.connection import Connection, wait
+from typing import Any, Generic, TypeVar
+
+from anki.collection import Collection
+
+T = TypeVar("T")
+
+# how long a worker gets to respond to an abort request before it is killed
+ABORT_GRACE_SECS = 10.0
+
+
+class TaskCancelled(Exception):
+    pass
+
+
+class TaskTimeout(Exception):
+    pass
+
+
+@dataclass
+class TaskResult(Generic[T]):
+    task_id: int
+    path: str
+    result: T | None = None
+    error: Exception | None = None
+
+
+@dataclass
+class _Task:
+    task_id: int
+    path: str
+    fn: Callable[[Collection], Any]
+    timeout: float | None
+
+
+class _Worker:
+    def __init__(self, ctx: Any) -> None:
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(
+            target=_worker_main, args=(child_conn,), daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        self.task: _Task | None = None
+        self.deadline: float | None = None
+        self.abort_error: Exception | None = None
+
+    def start(self, task: _Task) -> None:
+        self.task = task
+        self.deadline = time.monotonic() + task.timeout if task.timeout else None
+        self.abort_error = None
+        self.conn.send(("run", task.task_id, task.path, task.fn))
+
+    def abort(self, error: Exception) -> None:
+        "Ask the running task to stop, and give it a grace period to do so."
+        if self.abort_error is None:
+            self.abort_error = error
+            self.deadline = time.monotonic() + ABORT_GRACE_SECS
+            try:
+                self.conn.send(("abort",))
+            except OSError:
+                pass
+
+    def kill(self) -> None:
+        self.process.terminate()
+        self.process.join()
+        self.conn.close()
+
+
+class CollectionPool:
+    def __init__(self, processes: int | None = None) -> None:
+        # forking a process that has backend threads running is not safe
+        self._ctx = multiprocessing.get_context("spawn")
+        self._size = processes or multiprocessing.cpu_count()
+        self._workers: list[_Worker] = []
+        self._queue: deque[_Task] = deque()
+        self._cancelled: deque[_Task] = deque()
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> CollectionPool:
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def submit(
+        self,
+        fn: Callable[[Collection], T],
+        path: str,
+        timeout: float | None = None,
+    ) -> int:
+        "Queue fn(col) to run against the collection at path. Returns a task id."
+        with self._lock:
+            self._next_id += 1
+            self._queue.append(_Task(self._next_id, path, fn, timeout))
+            return self._next_id
+
+    def cancel(self, task_id: int) -> None:
+        """Cancel a task. If it has not started, it is dropped; if it is
+        running, its backend operation is aborted. Its result will have a
+        TaskCancelled error, unless it completed first. May be called from
+        another thread while results() is being iterated."""
+        with self._lock:
+            for task in self._queue:
+                if task.task_id == task_id:
+                    self._queue.remove(task)
+                    self._cancelled.append(task)
+                    return
+            for worker in self._workers:
+                if worker.task and worker.task.task_id == task_id:
+                    worker.abort(TaskCancelled())
+                    return
+
+    def results(self) -> Iterator[TaskResult]:
+        "Yield results as tasks complete, until all submitted tasks are done."
+        while True:
+            with self._lock:
+                done = [
+                    TaskResult(task.task_id, task.path, error=TaskCancelled())
+                    for task in self._cancelled
+                ]
+                self._cancelled.clear()
+                self._start_queued()
+                busy = [worker for worker in self._workers if worker.task]
+                timeout = self._next_deadline(busy)
+            yield from done
+            if not busy:
+                if self._queue or self._cancelled:
+                    continue
+                return
+            ready = wait([worker.conn for worker in busy], timeout=timeout)
+            done = []
+            with self._lock:
+                for worker in busy:
+                    if worker.conn in ready:
+                        result = self._receive(worker)
+                    else:
+                        result = self._check_deadline(worker)
+                    if result:
+                        done.append(result)
+            yield from done
+
+    def map(
+        self,
+        fn: Callable[[Collection], T],
+        paths: Iterable[str],
+        timeout: float | None = None,
+    ) -> Iterator[TaskResult[T]]:
+        "Run fn against each path, yielding results in completion order."
+        for path in paths:
+            self.submit(fn, path, timeout)
+        return self.results()
+
+    def close(self) -> None:
+        "Stop all workers. Queued tasks are discarded."
+        with self._lock:
+            self._queue.clear()
+            for worker in self._workers:
+                try:
+                    worker.conn.send(("quit",))
+                except OSError:
+                    pass
+            for worker in self._workers:
+                worker.process.join(timeout=1)
+                if worker.process.is_alive():
+                    worker.process.terminate()
+                worker.conn.close()
+            self._workers.clear()
+
+    def _start_queued(self) -> None:
+        for worker in self._workers:
+            if not self._queue:
+                return
+            if not worker.task:
+                worker.start(self._queue.popleft())
+        while self._queue and len(self._workers) < self._size:
+            worker = _Worker(self._ctx)
+            self._workers.append(worker)
+            worker.start(self._queue.popleft())
+
+    def _next_deadline(self, busy: list[_Worker]) -> float | None:
+        deadlines = [worker.deadline for worker in busy if worker.deadline]
+        if not deadlines:
+            # wake up periodically so cancel() calls are noticed
+            return 1.0
+        return max(0.0, min(min(deadlines) - time.monotonic(), 1.0))
+
+    def _receive(self, worker: _Worker) -> TaskResult | None:
+        task = worker.task
+        assert task
+        try:
+            task_id, result, error = worker.conn.recv()
+        except EOFError:
+            return self._replace(worker, Exception("worker process died"))
+        if task_id != task.task_id:
+            # stale reply from a task we've already given up on
+            return None
+        worker.task = None
+        if error and worker.abort_error:
+            error = worker.abort_error
+        return TaskResult(task.task_id, task.path, result=result, error=error)
+
+    def _check_deadline(self, worker: _Worker) -> TaskResult | None:
+        if not worker.deadline or time.monotonic() < worker.deadline:
+            return None
+        if worker.abort_error is None:
+            worker.abort(TaskTimeout())
+            return None
+        # the worker didn't respond to the abort request
+        return self._replace(worker, worker.abort_error)
+
+    def _replace(self, worker: _Worker, error: Exception) -> TaskResult:
+        task = worker.task
+        assert task
+        worker.kill()
+        self._workers.remove(worker)
+        return TaskResult(task.task_id, task.path, error=error)
+
+
+def _worker_main(conn: Connection) -> None:
+    from anki._backend import RustBackend
+
+    backend = RustBackend()
+    tasks: deque[tuple[int, str, Callable[[Collection], Any]] | None] = deque()
+    ready = threading.Condition()
+
+    def read_messages() -> None:
+        while True:
+            try:
+                msg = conn.recv()
+            except EOFError:
+                msg = ("quit",)
+            if msg[0] == "abort":
+                backend.set_wants_abort()
+                continue
+            with ready:
+                tasks.append(msg[1:] if msg[0] == "run" else None)
+                ready.notify()
+            if msg[0] == "quit":
+                return
+
+    threading.Thread(target=read_messages, daemon=True).start()
+
+    while True:
+        with ready:
+            ready.wait_for(lambda: tasks)
+            task = tasks.popleft()
+        if task is None:
+            return
+        task_id, path, fn = task
+        result: Any = None
+        error: Exception | None = None
+        try:
+            col = Collection(path, backend=backend)
+            try:
+                result = fn(col)
+            finally:
+                col.close()
+        except Exception as err:
+            error = _picklable(err)
+        try:
+            conn.send((task_id, result, error))
+        except Exception as err:
+            conn.send((task_id, None, _picklable(err)))
+
+
+def _picklable(err: Exception) -> Exception:
+    try:
+        pickle.dumps(err)
+        return err
+    except Exception:
+        return Exception("".join(traceback.format_exception(err)))
@@ -35,6 +35,7 @@ from anki.consts import (
     QUEUE_TYPE_NEW,
     QUEUE_TYPE_PREVIEW,
 )
+from anki.dbproxy import BOUND_IDS, bind_ids
 from anki.decks import DeckConfigDict, DeckId, DeckTreeNode
 from anki.notes import NoteId
 from anki.utils import ids2str, int_time
@@ -47,9 +48,23 @@ class SchedulerBase(DeprecatedNamesMixin):
 
     def __init__(self, col: anki.collection.Collection) -> None:
         self.col = col.weakref()
+        self._timing: SchedTimingToday | None = None
+        self.timing_cache_hits = 0
+        self.timing_cache_misses = 0
 
     def _timing_today(self) -> SchedTimingToday:
-        return self.col._backend.sched_timing_today()
+        """Cached until the next day starts, so the 'now' field is the time it
+        was fetched, not the current time."""
+        if self._timing and int_time() < self._timing.next_day_at:
+            self.timing_cache_hits += 1
+            return self._timing
+        self.timing_cache_misses += 1
+        self._timing = self.col._backend.sched_timing_today()
+        return self._timing
+
+    def _clear_timing_cache(self) -> None:
+        "Called when the settings the day boundaries are derived from change."
+        self._timing = None
 
     @property
     def today(self) -> int:
@@ -98,7 +113,9 @@ class SchedulerBase(DeprecatedNamesMixin):
         return info.have_sched_buried or info.have_user_buried
 
     def custom_study(self, request: CustomStudyRequest) -> OpChanges:
-        return self.col._backend.custom_study(request)
+        changes = self.col._backend.custom_study(request)
+        self.col._invalidate_caches(changes)
+        return changes
 
     def custom_study_defaults(self, deck_id: DeckId) -> CustomStudyDefaults:
         return self.col._backend.custom_study_defaults(deck_id=deck_id)
@@ -106,6 +123,7 @@ class SchedulerBase(DeprecatedNamesMixin):
     def extend_limits(self, new: int, rev: int) -> None:
         did = self.col.decks.current()["id"]
         self.col._backend.extend_limits(deck_id=did, new_delta=new, review_delta=rev)
+        self.col.decks._clear_deck_cache()
 
     # fixme: only used by total_rev_for_current_deck and old deck stats;
     # schedv2 defines separate version
@@ -118,10 +136,14 @@ class SchedulerBase(DeprecatedNamesMixin):
     ##########################################################################
 
     def rebuild_filtered_deck(self, deck_id: DeckId) -> OpChangesWithCount:
-        return self.col._backend.rebuild_filtered_deck(deck_id)
+        out = self.col._backend.rebuild_filtered_deck(deck_id)
+        self.col._invalidate_caches(out.changes)
+        return out
 
     def empty_filtered_deck(self, deck_id: DeckId) -> OpChanges:
-        return self.col._backend.empty_filtered_deck(deck_id)
+        changes = self.col._backend.empty_filtered_deck(deck_id)
+        self.col._invalidate_caches(changes)
+        return changes
 
     def get_or_create_filtered_deck(self, deck_id: DeckId) -> FilteredDeckForUpdate:
         return self.col._backend.get_or_create_filtered_deck(deck_id)
@@ -129,7 +151,9 @@ class SchedulerBase(DeprecatedNamesMixin):
     def add_or_update_filtered_deck(
         self, deck: FilteredDeckForUpdate
     ) -> OpChangesWithId:
-        return self.col._backend.add_or_update_filtered_deck(deck)
+        out = self.col._backend.add_or_update_filtered_deck(deck)
+        self.col._invalidate_caches(out.changes)
+        return out
 
     def filtered_deck_order_labels(self) -> Sequence[str]:
         return self.col._backend.filtered_deck_order_labels()
@@ -216,26 +240,29 @@ class SchedulerBase(DeprecatedNamesMixin):
             key = config_pb2.OptionalStringConfigKey(key=config_key)
         else:
             key = None
-        return self.col._backend.set_due_date(
+        changes = self.col._backend.set_due_date(
             card_ids=card_ids,
             days=days,
             # this value is optional; the auto-generated typing is wrong
             config_key=key,  # type: ignore
         )
+        self.col._invalidate_caches(changes)
+        return changes
 
     def reset_cards(self, ids: list[CardId]) -> None:
         "Completely reset cards for export."
-        sids = ids2str(ids)
+        sids = bind_ids(ids)
         assert self.col.db
         # we want to avoid resetting due number of existing new cards on export
         non_new = self.col.db.list(
-            f"select id from cards where id in %s and (queue != {QUEUE_TYPE_NEW} or type != {CARD_TYPE_NEW})"
-            % sids
+            f"select id from cards where id in {BOUND_IDS} and (queue != {QUEUE_TYPE_NEW} or type != {CARD_TYPE_NEW})",
+            sids,
         )
         # reset all cards
         self.col.db.execute(
             f"update cards set reps=0,lapses=0,odid=0,odue=0,queue={QUEUE_TYPE_NEW}"
-            " where id in %s" % sids
+            f" where id in {BOUND_IDS}",
+            sids,
         )
         # and forget any non-new cards, changing their due numbers
         request = ScheduleCardsAsNew(card_ids=non_new, log=False, restore_position=True)
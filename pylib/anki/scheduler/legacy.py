@@ -11,10 +11,11 @@ from anki.consts import (
     QUEUE_TYPE_DAY_LEARN_RELEARN,
     QUEUE_TYPE_REV,
 )
+from anki.dbproxy import BOUND_IDS, ValueForDB, bind_ids
 from anki.decks import DeckConfigDict, DeckId
 from anki.notes import NoteId
 from anki.scheduler.base import SchedulerBase, UnburyDeck
-from anki.utils import from_json_bytes, ids2str
+from anki.utils import from_json_bytes
 
 
 class SchedulerBaseWithLegacy(SchedulerBase):
@@ -60,7 +61,10 @@ class SchedulerBaseWithLegacy(SchedulerBase):
         self.col.decks.select(did)
         return count
 
-    def emptyDyn(self, did: DeckId | None, lim: str | None = None) -> None:
+    def emptyDyn(
+        self, did: DeckId | None, lim: str | None = None, *args: ValueForDB
+    ) -> None:
+        "If lim is provided, args are bound to any placeholders it contains."
         if lim is None:
             self.empty_filtered_deck(did)
             return
@@ -79,10 +83,11 @@ end)
 update cards set did = odid, {queue},
 due = (case when odue>0 then odue else due end), odue = 0, odid = 0, usn = ? where {lim}""",
             self.col.usn(),
+            *args,
         )
 
     def remFromDyn(self, cids: list[CardId]) -> None:
-        self.emptyDyn(None, f"id in {ids2str(cids)} and odid")
+        self.emptyDyn(None, f"id in {BOUND_IDS} and odid", bind_ids(cids))
 
     # used by v2 scheduler and some add-ons
     def update_stats(
@@ -98,6 +103,7 @@ due = (case when odue>0 then odue else due end), odue = 0, odid = 0, usn = ? whe
             review_delta=review_delta,
             millisecond_delta=milliseconds_delta,
         )
+        self.col.decks._clear_deck_cache()
 
     def _updateStats(self, card: Card, type: str, cnt: int = 1) -> None:
         did = card.did
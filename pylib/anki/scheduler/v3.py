@@ -18,7 +18,7 @@ from typing import Any, Literal
 
 from anki import frontend_pb2, scheduler_pb2
 from anki._legacy import deprecated
-from anki.cards import Card
+from anki.cards import Card, CardId
 from anki.collection import OpChanges
 from anki.consts import *
 from anki.decks import DeckId
@@ -42,6 +42,9 @@ class Scheduler(SchedulerBaseWithLegacy):
     # don't rely on this, it will likely be removed in the future
     reps = 0
 
+    # the card, deck and original deck of the last answer from build_answer()
+    _built_answer: tuple[CardId, DeckId, DeckId] | None = None
+
     # Fetching the next card
     ##########################################################################
 
@@ -82,6 +85,7 @@ class Scheduler(SchedulerBaseWithLegacy):
         else:
             raise Exception("invalid rating")
 
+        self._built_answer = (card.id, card.did, card.odid)
         return CardAnswer(
             card_id=card.id,
             current_state=states.current,
@@ -95,7 +99,18 @@ class Scheduler(SchedulerBaseWithLegacy):
         "Update card to provided state, and remove it from queue."
         self.reps += 1
         op_bytes = self.col._backend.answer_card_raw(input.SerializeToString())
-        return OpChanges.FromString(op_bytes)
+        changes = OpChanges.FromString(op_bytes)
+        if self._built_answer and self._built_answer[0] == input.card_id:
+            # Only the daily counts of the card's deck and its parents have
+            # changed, so the other cached decks are kept. Marking the changes as
+            # handled stops the GUI from clearing the whole deck cache.
+            _, did, odid = self._built_answer
+            self._built_answer = None
+            self.col.decks._remove_from_deck_cache((did, odid))
+            self.col.mark_changes_handled(changes)
+        else:
+            self.col._invalidate_caches(changes)
+        return changes
 
     def state_is_leech(self, new_state: SchedulingState) -> bool:
         "True if new state marks the card as a leech."
@@ -126,7 +141,8 @@ class Scheduler(SchedulerBaseWithLegacy):
         return not self.get_queued_cards().cards
 
     def counts(self, card: Card | None = None) -> tuple[int, int, int]:
-        info = self.get_queued_cards()
+        # the counts don't depend on the fetched cards, so skip loading them
+        info = self.get_queued_cards(fetch_limit=0)
         return (info.new_count, info.learning_count, info.review_count)
 
     @property
@@ -7,12 +7,14 @@ from __future__ import annotations
 import json
 import random
 import time
-from collections.abc import Sequence
+from collections.abc import Iterator, Sequence
+from dataclasses import dataclass, field
 from typing import Any
 
 import anki.cards
 import anki.collection
 from anki.consts import *
+from anki.dbproxy import BOUND_IDS, bind_ids
 from anki.lang import FormatTimeSpan
 from anki.utils import base62, ids2str
 
@@ -92,6 +94,74 @@ colTime = "#770"
 colUnseen = "#000"
 colSusp = "#ff0"
 
+# (day, hour, type, mature, ease, count, time)
+RevlogGroup = tuple[int, int, int, bool, int, int, int]
+
+
+@dataclass
+class RevlogSummary:
+    """The review log, grouped by day, hour, type, maturity and answer button,
+    and stored column-wise. It is built with a single scan of the revlog table,
+    and the review graphs for every period are computed from it."""
+
+    # relative to the day cutoff; 0 is the last 24 hours
+    day: Sequence[int] = ()
+    # 0 is the hour before the day rolls over
+    hour: Sequence[int] = ()
+    type: Sequence[int] = ()
+    mature: Sequence[bool] = ()
+    ease: Sequence[int] = ()
+    count: Sequence[int] = ()
+    # total answer time, in milliseconds
+    time: Sequence[int] = ()
+    # the id of the earliest entry in each group
+    first_id: Sequence[int] = ()
+
+    @classmethod
+    def build(cls, col: anki.collection.Collection, lim: str) -> RevlogSummary:
+        "Summarize the revlog entries matching lim, which may be empty."
+        rows = col.db.all(
+            """
+select
+cast((id/1000.0 - ?) / 86400.0 as int) as day,
+23 - ((cast((? - id/1000) / 3600.0 as int)) %% 24) as hour,
+type, lastIvl >= 21, ease, count(), sum(time), min(id)
+from revlog %s
+group by day, hour, type, lastIvl >= 21, ease"""
+            % (f"where {lim}" if lim else ""),
+            col.sched.day_cutoff,
+            col.sched.day_cutoff - col.conf.get("rollover", 4) * 3600,
+        )
+        return cls(*zip(*rows))
+
+    def groups(self, days: int | None = None) -> Iterator[RevlogGroup]:
+        "Groups from the last number of days, or all groups if days is None."
+        groups = zip(
+            self.day,
+            self.hour,
+            self.type,
+            self.mature,
+            self.ease,
+            self.count,
+            self.time,
+        )
+        if days is None:
+            return groups
+        return (group for group in groups if group[0] > -days)
+
+    def first_review(self) -> int | None:
+        return min(self.first_id, default=None)
+
+
+@dataclass
+class LegacyStatsCache:
+    """Revlog summaries and reports, kept until the collection is modified or
+    the day rolls over."""
+
+    stamp: tuple[int, int]
+    summaries: dict[str, RevlogSummary] = field(default_factory=dict)
+    reports: dict[tuple[bool, int, int, int, int], str] = field(default_factory=dict)
+
 
 class CollectionStats:
     def __init__(self, col: anki.collection.Collection) -> None:
@@ -108,18 +178,42 @@ class CollectionStats:
         self.type = type
         from .statsbg import bg
 
-        txt = self.css % bg
-        txt += self._section(self.todayStats())
-        txt += self._section(self.dueGraph())
-        txt += self.repsGraphs()
-        txt += self._section(self.introductionGraph())
-        txt += self._section(self.ivlGraph())
-        txt += self._section(self.hourGraph())
-        txt += self._section(self.easeGraph())
-        txt += self._section(self.cardGraph())
+        key = (
+            self.wholeCollection,
+            self.col.decks.get_current_id(),
+            type,
+            self.width,
+            self.height,
+        )
+        cache = self._cache()
+        if (txt := cache.reports.get(key)) is None:
+            txt = self.css % bg
+            txt += self._section(self.todayStats())
+            txt += self._section(self.dueGraph())
+            txt += self.repsGraphs()
+            txt += self._section(self.introductionGraph())
+            txt += self._section(self.ivlGraph())
+            txt += self._section(self.hourGraph())
+            txt += self._section(self.easeGraph())
+            txt += self._section(self.cardGraph())
+            cache.reports[key] = txt
         txt += self._section(self.footer())
         return "<center>%s</center>" % txt
 
+    def _cache(self) -> LegacyStatsCache:
+        stamp = (self.col.mod, self.col.sched.day_cutoff)
+        cache = self.col._legacy_stats_cache
+        if cache is None or cache.stamp != stamp:
+            cache = self.col._legacy_stats_cache = LegacyStatsCache(stamp)
+        return cache
+
+    def _revlog_summary(self) -> RevlogSummary:
+        cache = self._cache()
+        lim = self._revlogLimit()
+        if (summary := cache.summaries.get(lim)) is None:
+            summary = cache.summaries[lim] = RevlogSummary.build(self.col, lim)
+        return summary
+
     def _section(self, txt: str) -> str:
         return "<div class=section>%s</div>" % txt
 
@@ -141,28 +235,26 @@ body { direction: ltr !important; }
     def todayStats(self) -> str:
         b = self._title("Today")
         # studied today
-        lim = self._revlogLimit()
-        if lim:
-            lim = " and " + lim
-        cards, thetime, failed, lrn, rev, relrn, filt = self.col.db.first(
-            f"""
-select count(), sum(time)/1000,
-sum(case when ease = 1 then 1 else 0 end), /* failed */
-sum(case when type = {REVLOG_LRN} then 1 else 0 end), /* learning */
-sum(case when type = {REVLOG_REV} then 1 else 0 end), /* review */
-sum(case when type = {REVLOG_RELRN} then 1 else 0 end), /* relearn */
-sum(case when type = {REVLOG_CRAM} then 1 else 0 end) /* filter */
-from revlog where type != {REVLOG_RESCHED} and id > ? """
-            + lim,
-            (self.col.sched.day_cutoff - 86400) * 1000,
-        )
-        cards = cards or 0
-        thetime = thetime or 0
-        failed = failed or 0
-        lrn = lrn or 0
-        rev = rev or 0
-        relrn = relrn or 0
-        filt = filt or 0
+        cards = thetime = failed = mcnt = msum = 0
+        types = {REVLOG_LRN: 0, REVLOG_REV: 0, REVLOG_RELRN: 0, REVLOG_CRAM: 0}
+        for _, _, type, mature, ease, count, ms in self._revlog_summary().groups(1):
+            if mature:
+                mcnt += count
+                if ease != 1:
+                    msum += count
+            if type == REVLOG_RESCHED:
+                continue
+            cards += count
+            thetime += ms
+            if ease == 1:
+                failed += count
+            if type in types:
+                types[type] += count
+        thetime //= 1000
+        lrn = types[REVLOG_LRN]
+        rev = types[REVLOG_REV]
+        relrn = types[REVLOG_RELRN]
+        filt = types[REVLOG_CRAM]
 
         # studied
         def bold(s: str) -> str:
@@ -187,13 +279,6 @@ from revlog where type != {REVLOG_RESCHED} and id > ? """
                 d=bold(str(filt)),
             )
             # mature today
-            mcnt, msum = self.col.db.first(
-                """
-    select count(), sum(case when ease = 1 then 0 else 1 end) from revlog
-    where lastIvl >= 21 and id > ?"""
-                + lim,
-                (self.col.sched.day_cutoff - 86400) * 1000,
-            )
             b += "<br>"
             if mcnt:
                 b += "Correct answers on mature cards: %(a)d/%(b)d (%(c).1f%%)" % dict(
@@ -522,74 +607,37 @@ group by day order by day"""
         )
 
     def _done(self, num: int | None = 7, chunk: int = 1) -> Any:
-        lims = []
-        if num is not None:
-            lims.append(
-                "id > %d" % ((self.col.sched.day_cutoff - (num * chunk * 86400)) * 1000)
-            )
-        lim = self._revlogLimit()
-        if lim:
-            lims.append(lim)
-        if lims:
-            lim = "where " + " and ".join(lims)
-        else:
-            lim = ""
         if self.type == PERIOD_MONTH:
             tf = 60.0  # minutes
         else:
             tf = 3600.0  # hours
-        return self.col.db.all(
-            f"""
-select
-(cast((id/1000.0 - ?) / 86400.0 as int))/? as day,
-sum(case when type = {REVLOG_LRN} then 1 else 0 end), -- lrn count
-sum(case when type = {REVLOG_REV} and lastIvl < 21 then 1 else 0 end), -- yng count
-sum(case when type = {REVLOG_REV} and lastIvl >= 21 then 1 else 0 end), -- mtr count
-sum(case when type = {REVLOG_RELRN} then 1 else 0 end), -- lapse count
-sum(case when type = {REVLOG_CRAM} then 1 else 0 end), -- cram count
-sum(case when type = {REVLOG_LRN} then time/1000.0 else 0 end)/?, -- lrn time
--- yng + mtr time
-sum(case when type = {REVLOG_REV} and lastIvl < 21 then time/1000.0 else 0 end)/?,
-sum(case when type = {REVLOG_REV} and lastIvl >= 21 then time/1000.0 else 0 end)/?,
-sum(case when type = {REVLOG_RELRN} then time/1000.0 else 0 end)/?, -- lapse time
-sum(case when type = {REVLOG_CRAM} then time/1000.0 else 0 end)/? -- cram time
-from revlog %s
-group by day order by day"""
-            % lim,
-            self.col.sched.day_cutoff,
-            chunk,
-            tf,
-            tf,
-            tf,
-            tf,
-            tf,
-        )
+        # per chunk: lrn, yng, mtr, lapse and cram counts, followed by times
+        done: dict[int, list[Any]] = {}
+        days = num * chunk if num is not None else None
+        for day, _, type, mature, _, count, ms in self._revlog_summary().groups(
+            days
+        ):
+            row = done.setdefault(int(day / chunk), [0] * 10)
+            if type == REVLOG_LRN:
+                idx = 0
+            elif type == REVLOG_REV:
+                idx = 2 if mature else 1
+            elif type == REVLOG_RELRN:
+                idx = 3
+            elif type == REVLOG_CRAM:
+                idx = 4
+            else:
+                continue
+            row[idx] += count
+            row[idx + 5] += ms / 1000.0 / tf
+        return [(day, *row) for day, row in sorted(done.items())]
 
     def _daysStudied(self) -> Any:
-        lims = []
-        num = self._periodDays()
-        if num:
-            lims.append(
-                "id > %d" % ((self.col.sched.day_cutoff - (num * 86400)) * 1000)
-            )
-        rlim = self._revlogLimit()
-        if rlim:
-            lims.append(rlim)
-        if lims:
-            lim = "where " + " and ".join(lims)
-        else:
-            lim = ""
-        ret = self.col.db.first(
-            """
-select count(), abs(min(day)) from (select
-(cast((id/1000 - ?) / 86400.0 as int)+1) as day
-from revlog %s
-group by day order by day)"""
-            % lim,
-            self.col.sched.day_cutoff,
-        )
-        assert ret
-        return ret
+        days = {
+            group[0] + 1
+            for group in self._revlog_summary().groups(self._periodDays() or None)
+        }
+        return len(days), abs(min(days)) if days else None
 
     # Intervals
     ######################################################################
@@ -737,31 +785,20 @@ select count(), avg(ivl), max(ivl) from cards where did in %s and queue = {QUEUE
         )
 
     def _eases(self) -> Any:
-        lims = []
-        lim = self._revlogLimit()
-        if lim:
-            lims.append(lim)
-        days = self._periodDays()
-        if days is not None:
-            lims.append(
-                "id > %d" % ((self.col.sched.day_cutoff - (days * 86400)) * 1000)
-            )
-        if lims:
-            lim = "and " + " and ".join(lims)
-        else:
-            lim = ""
-        ease4repl = "ease"
-        return self.col.db.all(
-            f"""
-select (case
-when type in ({REVLOG_LRN},{REVLOG_RELRN}) then 0
-when lastIvl < 21 then 1
-else 2 end) as thetype,
-(case when type in ({REVLOG_LRN},{REVLOG_RELRN}) and ease = 4 then %s else ease end), count() from revlog where type != {REVLOG_RESCHED} %s
-group by thetype, ease
-order by thetype, ease"""
-            % (ease4repl, lim)
-        )
+        eases: dict[tuple[int, int], int] = {}
+        for _, _, type, mature, ease, count, _ in self._revlog_summary().groups(
+            self._periodDays()
+        ):
+            if type == REVLOG_RESCHED:
+                continue
+            if type in (REVLOG_LRN, REVLOG_RELRN):
+                thetype = 0
+            elif not mature:
+                thetype = 1
+            else:
+                thetype = 2
+            eases[(thetype, ease)] = eases.get((thetype, ease), 0) + count
+        return [(*key, count) for key, count in sorted(eases.items())]
 
     # Hourly retention
     ######################################################################
@@ -834,25 +871,22 @@ order by thetype, ease"""
         return txt
 
     def _hourRet(self) -> Any:
-        lim = self._revlogLimit()
-        if lim:
-            lim = " and " + lim
-        rolloverHour = self.col.conf.get("rollover", 4)
-        pd = self._periodDays()
-        if pd:
-            lim += " and id > %d" % ((self.col.sched.day_cutoff - (86400 * pd)) * 1000)
-        return self.col.db.all(
-            f"""
-select
-23 - ((cast((? - id/1000) / 3600.0 as int)) %% 24) as hour,
-sum(case when ease = 1 then 0 else 1 end) /
-cast(count() as float) * 100,
-count()
-from revlog where type in ({REVLOG_LRN},{REVLOG_REV},{REVLOG_RELRN}) %s
-group by hour having count() > 30 order by hour"""
-            % lim,
-            self.col.sched.day_cutoff - (rolloverHour * 3600),
-        )
+        # per hour: total and correct answers
+        hours: dict[int, list[int]] = {}
+        for _, hour, type, _, ease, count, _ in self._revlog_summary().groups(
+            self._periodDays() or None
+        ):
+            if type not in (REVLOG_LRN, REVLOG_REV, REVLOG_RELRN):
+                continue
+            row = hours.setdefault(hour, [0, 0])
+            row[0] += count
+            if ease != 1:
+                row[1] += count
+        return [
+            (hour, correct / float(total) * 100, total)
+            for hour, (total, correct) in sorted(hours.items())
+            if total > 30
+        ]
 
     # Cards
     ######################################################################
@@ -1087,18 +1121,19 @@ $(function () {
         return f"<h1>{title}</h1>{subtitle}"
 
     def _deckAge(self, by: str) -> int:
-        lim = self._revlogLimit()
-        if lim:
-            lim = " where " + lim
-        t = 0
+        t: int | None = 0
         if by == "review":
-            t = self.col.db.scalar("select id from revlog %s order by id limit 1" % lim)
+            t = self._revlog_summary().first_review()
         elif by == "add":
+            args = []
             if self.wholeCollection:
                 lim = ""
             else:
-                lim = "where did in %s" % ids2str(self.col.decks.active())
-            t = self.col.db.scalar("select id from cards %s order by id limit 1" % lim)
+                lim = f"where did in {BOUND_IDS}"
+                args.append(bind_ids(self.col.decks.active()))
+            t = self.col.db.scalar(
+                "select id from cards %s order by id limit 1" % lim, *args
+            )
         if not t:
             period = 1
         else:
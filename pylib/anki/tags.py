@@ -21,9 +21,9 @@ import anki.collection
 from anki import tags_pb2
 from anki._legacy import DeprecatedNamesMixin, deprecated
 from anki.collection import OpChanges, OpChangesWithCount
+from anki.dbproxy import BOUND_IDS, bind_ids
 from anki.decks import DeckId
 from anki.notes import NoteId
-from anki.utils import ids2str
 
 # public exports
 TagTreeNode = tags_pb2.TagTreeNode
@@ -179,8 +179,8 @@ class TagManager(DeprecatedNamesMixin):
         dids = [did]
         for name, id in self.col.decks.children(did):
             dids.append(id)
-        query = f"{basequery} AND c.did IN {ids2str(dids)}"
-        res = self.col.db.list(query)
+        query = f"{basequery} AND c.did IN {BOUND_IDS}"
+        res = self.col.db.list(query, bind_ids(dids))
         return list(set(self.split(" ".join(res))))
 
 
@@ -29,7 +29,7 @@ template_legacy.py file, using the legacy addHook() system.
 from __future__ import annotations
 
 import os.path
-from collections.abc import Sequence
+from collections.abc import Iterator, Sequence
 from dataclasses import dataclass
 from typing import Any, Union
 
@@ -40,7 +40,7 @@ import anki.notes
 from anki import card_rendering_pb2, hooks
 from anki.decks import DeckManager
 from anki.errors import TemplateError
-from anki.models import NotetypeDict
+from anki.models import NotetypeDict, NotetypeId
 from anki.sound import AVTag, SoundOrVideoTag, TTSTag
 from anki.utils import to_json_bytes
 
@@ -141,18 +141,33 @@ class TemplateRenderContext:
             fill_empty=fill_empty,
         )
 
+    @classmethod
+    def _for_batch(
+        cls,
+        col: anki.collection.Collection,
+        card_id: anki.cards.CardId,
+        notetype: NotetypeDict | None,
+        browser: bool,
+    ) -> TemplateRenderContext:
+        "The card and note are only loaded if a hook asks for them."
+        return TemplateRenderContext(
+            col, None, None, browser, notetype=notetype, card_id=card_id
+        )
+
     def __init__(
         self,
         col: anki.collection.Collection,
-        card: anki.cards.Card,
-        note: anki.notes.Note,
+        card: anki.cards.Card | None,
+        note: anki.notes.Note | None,
         browser: bool = False,
         notetype: NotetypeDict | None = None,
         template: dict | None = None,
         fill_empty: bool = False,
+        card_id: anki.cards.CardId | None = None,
     ) -> None:
         self._col = col.weakref()
         self._card = card
+        self._card_id = card.id if card else card_id
         self._note = note
         self._browser = browser
         self._template = template
@@ -161,7 +176,7 @@ class TemplateRenderContext:
         self._latex_svg = False
         self._question_side: bool = True
         if not notetype:
-            self._note_type = note.note_type()
+            self._note_type = self.note().note_type()
         else:
             self._note_type = notetype
 
@@ -180,18 +195,18 @@ class TemplateRenderContext:
         print(".fields() is obsolete, use .note() or .card()")
         if not self._fields:
             # fields from note
-            fields = dict(self._note.items())
+            fields = dict(self.note().items())
 
             # add (most) special fields
-            fields["Tags"] = self._note.string_tags().strip()
+            fields["Tags"] = self.note().string_tags().strip()
             fields["Type"] = self._note_type["name"]
-            fields["Deck"] = self._col.decks.name(self._card.current_deck_id())
+            fields["Deck"] = self._col.decks.name(self.card().current_deck_id())
             fields["Subdeck"] = DeckManager.basename(fields["Deck"])
             if self._template:
                 fields["Card"] = self._template["name"]
             else:
                 fields["Card"] = ""
-            flag = self._card.user_flag()
+            flag = self.card().user_flag()
             fields["CardFlag"] = flag and f"flag{flag}" or ""
             self._fields = fields
 
@@ -202,9 +217,14 @@ class TemplateRenderContext:
 
         Be careful not to call .question() or .answer() on the card, or you'll create an
         infinite loop."""
+        if self._card is None:
+            assert self._card_id is not None
+            self._card = self._col.get_card(self._card_id)
         return self._card
 
     def note(self) -> anki.notes.Note:
+        if self._note is None:
+            self._note = self.card().note()
         return self._note
 
     def note_type(self) -> NotetypeDict:
@@ -259,8 +279,8 @@ class TemplateRenderContext:
         if self._template:
             # card layout screen
             out = self._col._backend.render_uncommitted_card_legacy(
-                note=self._note._to_backend_note(),
-                card_ord=self._card.ord,
+                note=self.note()._to_backend_note(),
+                card_ord=self.card().ord,
                 template=to_json_bytes(self._template),
                 fill_empty=self._fill_empty,
                 partial_render=True,
@@ -271,11 +291,94 @@ class TemplateRenderContext:
         else:
             # existing card (eg study mode)
             out = self._col._backend.render_existing_card(
-                card_id=self._card.id, browser=self._browser, partial_render=True
+                card_id=self._card_id, browser=self._browser, partial_render=True
             )
         return PartiallyRenderedCard.from_proto(out)
 
 
+def render_existing_cards(
+    col: anki.collection.Collection,
+    card_ids: Sequence[anki.cards.CardId],
+    browser: bool = False,
+    batch_size: int = 500,
+) -> Iterator[tuple[anki.cards.CardId, TemplateRenderOutput]]:
+    """Render multiple cards, yielding (card_id, output) in the provided order.
+    Ids of cards that don't exist are skipped.
+
+    The output is the same as TemplateRenderContext.render() would produce,
+    but each batch of cards takes three backend calls instead of three per
+    card. A card's render context is only created if its templates use custom
+    filters or card_did_render has subscribers, and its card and note are only
+    loaded if a hook requests them."""
+    for start in range(0, len(card_ids), batch_size):
+        rendered = col._backend.render_existing_cards(
+            card_ids=card_ids[start : start + batch_size], browser=browser
+        )
+        yield from _complete_render_batch(col, rendered, browser)
+
+
+def _complete_render_batch(
+    col: anki.collection.Collection,
+    rendered: Sequence[card_rendering_pb2.RenderExistingCardsResponse.Card],
+    browser: bool,
+) -> Iterator[tuple[anki.cards.CardId, TemplateRenderOutput]]:
+    cards = [card for card in rendered if not card.error]
+    partials = [PartiallyRenderedCard.from_proto(card.rendered) for card in cards]
+    contexts: list[TemplateRenderContext | None] = [None] * len(cards)
+
+    def context(idx: int, question_side: bool) -> TemplateRenderContext:
+        if (ctx := contexts[idx]) is None:
+            ctx = contexts[idx] = TemplateRenderContext._for_batch(
+                col,
+                anki.cards.CardId(cards[idx].card_id),
+                col.models.get(NotetypeId(cards[idx].notetype_id)),
+                browser,
+            )
+            ctx._latex_svg = partials[idx].latex_svg
+        ctx._question_side = question_side
+        return ctx
+
+    def complete(
+        idx: int, nodes: TemplateReplacementList, front_side: str | None = None
+    ) -> str:
+        if len(nodes) == 1 and isinstance(nodes[0], str):
+            # no custom filters to apply
+            return nodes[0]
+        ctx = context(idx, question_side=front_side is None)
+        return apply_custom_filters(nodes, ctx, front_side)
+
+    qtexts = [complete(idx, partial.qnodes) for idx, partial in enumerate(partials)]
+    qouts = col._backend.extract_av_tags_from_texts(texts=qtexts, question_side=True)
+    atexts = [
+        complete(idx, partial.anodes, front_side=qout.text)
+        for idx, (partial, qout) in enumerate(zip(partials, qouts))
+    ]
+    aouts = col._backend.extract_av_tags_from_texts(texts=atexts, question_side=False)
+
+    run_hook = not browser and hooks.card_did_render.count() > 0
+    outputs = iter(enumerate(zip(partials, qouts, aouts)))
+    for card in rendered:
+        if card.error:
+            output = TemplateRenderOutput(
+                question_text=card.error,
+                answer_text=card.error,
+                question_av_tags=[],
+                answer_av_tags=[],
+            )
+        else:
+            idx, (partial, qout, aout) = next(outputs)
+            output = TemplateRenderOutput(
+                question_text=qout.text,
+                answer_text=aout.text,
+                question_av_tags=av_tags_to_native(qout.av_tags),
+                answer_av_tags=av_tags_to_native(aout.av_tags),
+                css=partial.css,
+            )
+            if run_hook:
+                hooks.card_did_render(output, context(idx, False))
+        yield anki.cards.CardId(card.card_id), output
+
+
 @dataclass
 class TemplateRenderOutput:
     "Stores the rendered templates and extracted AV tags."
@@ -315,29 +418,66 @@ def apply_custom_filters(
     if len(rendered) == 1 and isinstance(rendered[0], str):
         return rendered[0]
 
-    res = ""
+    # filters without any subscribers are dropped, and each distinct chain
+    # is only resolved once while the subscribers stay the same
+    chains = _current_filter_chains()
+    note_items: list[tuple[str, str]] | None = None
+    buf: list[str] = []
     for node in rendered:
         if isinstance(node, str):
-            res += node
-        else:
-            # do we need to inject in FrontSide?
-            if node.field_name == "FrontSide" and front_side is not None:
-                node.current_text = front_side
-
-            field_text = node.current_text
-            for filter_name in node.filters:
-                field_text = hooks.field_filter(
-                    field_text, node.field_name, filter_name, ctx
-                )
+            buf.append(node)
+            continue
+
+        # do we need to inject in FrontSide?
+        if node.field_name == "FrontSide" and front_side is not None:
+            node.current_text = front_side
+
+        field_text = node.current_text
+        key = tuple(node.filters)
+        if (chain := chains.get(key)) is None:
+            chain = chains[key] = _resolve_filter_chain(key)
+        for filter_name, has_legacy_hook in chain:
+            field_text = hooks.field_filter(
+                field_text, node.field_name, filter_name, ctx
+            )
+            if has_legacy_hook:
+                if note_items is None:
+                    note_items = ctx.note().items()
                 # legacy hook - the second and fifth argument are no longer used.
                 field_text = hooks.runFilter(
                     f"fmod_{filter_name}",
                     field_text,
                     "",
-                    ctx.note().items(),
+                    note_items,
                     node.field_name,
                     "",
                 )
 
-            res += field_text
-    return res
+        buf.append(field_text)
+    return "".join(buf)
+
+
+FilterChains = dict[tuple[str, ...], list[tuple[str, bool]]]
+_filter_chains: FilterChains = {}
+_filter_chains_key: tuple[bool, int] | None = None
+
+
+def _current_filter_chains() -> FilterChains:
+    "Resolved chains by filter names, cleared when the filter subscribers change."
+    global _filter_chains, _filter_chains_key
+    key = (hooks.field_filter.count() > 0, hooks.legacy_hooks_generation())
+    if key != _filter_chains_key:
+        _filter_chains = {}
+        _filter_chains_key = key
+    return _filter_chains
+
+
+def _resolve_filter_chain(filters: tuple[str, ...]) -> list[tuple[str, bool]]:
+    "(filter_name, has_legacy_hook) for each filter that has a subscriber."
+    have_field_filters = hooks.field_filter.count() > 0
+    chain = []
+    for filter_name in filters:
+        has_legacy_hook = hooks.has_legacy_hook(f"fmod_{filter_name}")
+        if have_field_filters or has_legacy_hook:
+            chain.append((filter_name, has_legacy_hook))
+    return chain
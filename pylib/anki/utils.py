@@ -12,6 +12,7 @@ import string
 import subprocess
 import sys
 import tempfile
+import threading
 import time
 from collections.abc import Callable, Iterable, Iterator
 from contextlib import contextmanager
@@ -80,7 +81,10 @@ def html_to_text_line(txt: str) -> str:
 
 
 def ids2str(ids: Iterable[int | str]) -> str:
-    """Given a list of integers, return a string '(int1,int2,...)'."""
+    """Given a list of integers, return a string '(int1,int2,...)'.
+
+    For lists that may be large, prefer binding them with
+    anki.dbproxy.bind_ids() instead."""
     return f"({','.join(str(i) for i in ids)})"
 
 
@@ -199,6 +203,11 @@ def namedtmp(name: str, remove: bool = True) -> str:
 ##############################################################################
 
 
+# no_bundled_libs() modifies the environment, so callers on different threads
+# must not overlap
+_spawn_lock = threading.Lock()
+
+
 @contextmanager
 def no_bundled_libs() -> Iterator[None]:
     oldlpath = os.environ.pop("LD_LIBRARY_PATH", None)
@@ -220,7 +229,7 @@ def call(argv: list[str], wait: bool = True, **kwargs: Any) -> int:
         info = None
     # run
     try:
-        with no_bundled_libs():
+        with _spawn_lock, no_bundled_libs():
             process = subprocess.Popen(argv, startupinfo=info, **kwargs)
     except OSError:
         # command not found
@@ -79,6 +79,23 @@ impl Backend {
         let out_obj = PyBytes::new(py, &out_bytes);
         Ok(out_obj)
     }
+
+    /// Takes a JSON query, and returns the result as packed columns.
+    fn db_columns<'a>(
+        &self,
+        py: Python<'a>,
+        input: &Bound<'a, PyBytes>,
+    ) -> PyResult<Bound<'a, PyBytes>> {
+        let in_bytes = input.as_bytes();
+        let out_res = py.detach(|| {
+            self.backend
+                .run_db_columns_bytes(in_bytes)
+                .map_err(BackendError::new_err)
+        });
+        let out_bytes = out_res?;
+        let out_obj = PyBytes::new(py, &out_bytes);
+        Ok(out_obj)
+    }
 }
 
 // Module definition
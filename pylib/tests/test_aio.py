@@ -0,0 +1,26 @@
+# Copyright: Ankitects Pty Ltd and contributors
+# License: GNU AGPL, version 3 or later; http://www.gnu.org/licenses/agpl.html
+
+import asyncio
+
+from anki.aio import AsyncCollection
+from tests.shared import getEmptyCol
+
+
+def test_async_collection():
+    async def run():
+        col = AsyncCollection(getEmptyCol())
+        note = col.col.newNote()
+        note["Front"] = "one"
+        # calls made concurrently are still run in order
+        _, cids, count = await asyncio.gather(
+            col.add_note(note, col.col.decks.id_for_name("Default")),
+            col.find_cards(""),
+            col.db.scalar("select count() from notes"),
+        )
+        assert len(cids) == 1
+        assert count == 1
+        assert (await col.get_note(note.id))["Front"] == "one"
+        await col.close()
+
+    asyncio.run(run())
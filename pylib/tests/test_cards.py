@@ -3,7 +3,8 @@
 
 # coding: utf-8
 
-from tests.shared import getEmptyCol
+from anki.cards import CardId
+from tests.shared import assertException, getEmptyCol
 
 
 def test_delete():
@@ -109,3 +110,60 @@ def test_gendeck():
     note["Text"] += "{{c4::four}}"
     note.flush()
     assert note.cards()[3].did == newId
+
+
+def test_bulk_loading():
+    col = getEmptyCol()
+    nids = []
+    for i in range(3):
+        note = col.newNote()
+        note["Front"] = str(i)
+        col.addNote(note)
+        nids.append(note.id)
+    cids = list(col.find_cards("", order="c.id desc"))
+    cards = col.get_cards(cids + [123])
+    assert [c.id for c in cards] == cids
+    assert [c.id for c in col.iter_cards(cids, batch_size=2)] == cids
+    assert cards[0].note()["Front"] == "2"
+    notes = col.get_notes(list(reversed(nids)))
+    assert [n["Front"] for n in notes] == ["2", "1", "0"]
+    assert [n.id for n in col.iter_notes(nids, batch_size=1)] == nids
+    assert [c.id for c in notes[0].cards()] == [cids[0]]
+
+
+def test_snapshots():
+    col = getEmptyCol()
+    for i in range(2):
+        note = col.newNote()
+        note["Front"] = str(i)
+        col.addNote(note)
+    cids = list(col.find_cards(""))
+    snapshots = col.get_card_snapshots(cids)
+    assert [s.id for s in snapshots] == cids
+    assertException(Exception, lambda: setattr(snapshots[0], "due", 5))
+    card = snapshots[0].to_card(col)
+    assert card.id == snapshots[0].id and card.nid == snapshots[0].nid
+    notes = col.get_note_snapshots([s.nid for s in snapshots])
+    assert notes[0]["Front"] == card.note()["Front"]
+    assert notes[0]._fmap is notes[1]._fmap
+    assert notes[1].to_note(col).fields == list(notes[1].fields)
+
+
+def test_render_cards():
+    col = getEmptyCol()
+    for front in ("one", "two [sound:a.mp3]", "three"):
+        note = col.newNote()
+        note["Front"] = front
+        note["Back"] = "back"
+        col.addNote(note)
+    cids = list(col.find_cards("", order="c.id desc"))
+    rendered = list(col.render_cards(cids, batch_size=2))
+    assert [cid for cid, _ in rendered] == cids
+    for cid, output in rendered:
+        card = col.get_card(cid)
+        assert output.question_and_style() == card.question()
+        assert output.answer_and_style() == card.answer()
+        assert output.question_av_tags == card.question_av_tags()
+    # missing cards are skipped
+    missing = CardId(1)
+    assert [cid for cid, _ in col.render_cards([missing, cids[0]])] == [cids[0]]
@@ -8,7 +8,8 @@ import tempfile
 from typing import Any
 
 from anki.collection import Collection as aopen
-from anki.dbproxy import emulate_named_args
+from anki.collection import Config
+from anki.dbproxy import BOUND_IDS, bind_ids, emulate_named_args
 from anki.lang import TR, without_unicode_isolation
 from anki.stdmodels import _legacy_add_basic_model, get_stock_notetypes
 from anki.utils import is_win
@@ -173,3 +174,131 @@ def test_db_named_args(capsys):
 
     # swallow the warning
     _ = capsys.readouterr()
+
+
+def test_db_iterate():
+    col = getEmptyCol()
+    for i in range(5):
+        note = col.newNote()
+        note["Front"] = str(i)
+        col.addNote(note)
+    expected = col.db.all("select id, sfld from notes order by id")
+    rows = list(col.db.iterate("select id, sfld from notes order by id", batch_size=2))
+    assert rows == expected
+    # args are supported, and an abandoned iterator releases its cursor
+    it = col.db.iterate("select id from notes where id > ?", 0, batch_size=1)
+    assert next(it)
+    it.close()
+    assert list(col.db.iterate("select 1 where 0")) == []
+
+
+def test_db_columns():
+    col = getEmptyCol()
+    for i in range(3):
+        note = col.newNote()
+        note["Front"] = f"note{i}"
+        col.addNote(note)
+    ids, sflds = col.db.columns("select id, sfld from notes order by id")
+    assert list(ids) == col.db.list("select id from notes order by id")
+    assert list(sflds) == ["note0", "note1", "note2"]
+    # nulls widen integer columns to floats
+    (ivls, texts) = col.db.columns("select 1, 'a' union all select null, null")
+    assert ivls[0] == 1.0 and ivls[1] != ivls[1]
+    assert list(texts) == ["a", None]
+
+
+def test_db_prepare_and_batch():
+    col = getEmptyCol()
+    note = col.newNote()
+    note["Front"] = "one"
+    col.addNote(note)
+    stmt = col.db.prepare("select sfld from notes where id = ?")
+    assert stmt.scalar(note.id) == "one"
+    assert stmt.first(0) is None
+    assert stmt.list(note.id) == ["one"]
+    [(cards,)], [(sfld,)], [(sfld2,)] = col.db.batch(
+        [
+            "select count() from cards",
+            ("select sfld from notes where id = ?", [note.id]),
+            (stmt, [note.id]),
+        ]
+    )
+    assert (cards, sfld, sfld2) == (1, "one", "one")
+    stmt.close()
+    assertException(AssertionError, lambda: stmt.scalar(note.id))
+
+
+def test_db_bound_ids():
+    col = getEmptyCol()
+    nids = []
+    for i in range(3):
+        note = col.newNote()
+        note["Front"] = str(i)
+        col.addNote(note)
+        nids.append(note.id)
+    sql = f"select sfld from notes where id in {BOUND_IDS} order by id"
+    assert col.db.list(sql, bind_ids(nids[1:])) == ["1", "2"]
+    assert col.db.list(sql, bind_ids([])) == []
+    cids = col.db.list("select id from cards order by id")
+    assert col.decks.for_card_ids(cids) == [1, 1, 1]
+    assert sorted(col.decks.cids(1, children=True)) == cids
+
+
+def test_backend_stats():
+    col = getEmptyCol()
+    assert col.backend_stats() is None
+    col.set_backend_stats_enabled(True)
+    col.find_cards("")
+    col.db.scalar("select count() from cards where id in (1, 2, 3)")
+    col.db.scalar("select count() from cards where id in (4, 5)")
+    stats = col.backend_stats().to_dict()
+    assert "search_cards" in [entry["name"] for entry in stats["methods"]]
+    [query] = [q for q in stats["queries"] if "where id in" in q["sql"]]
+    assert query["sql"] == "select count() from cards where id in (?)"
+    assert query["calls"] == 2
+    assert sum(query["histogram"]) == 2
+    col.set_backend_stats_enabled(False)
+    assert col.backend_stats() is None
+
+
+def test_config_cache():
+    col = getEmptyCol()
+    col.set_config("test", {"a": [1]})
+    val = col.get_config("test")
+    val["a"].append(2)
+    # cached values are copied on each lookup
+    assert col.get_config("test") == {"a": [1]}
+    assert col.get_config("missing", default=3) == 3
+    # bulk access
+    col.set_configs({"test": 2, "other": "x"})
+    assert col.get_configs(["test", "other", "missing"]) == {"test": 2, "other": "x"}
+    col.remove_config("other")
+    assert col.get_configs(["other"]) == {}
+    # null values are not mistaken for missing keys
+    col.set_config("null", None)
+    col.conf._clear_cache()
+    assert col.get_configs(["null"]) == {"null": None}
+    assert col.get_config("null", default=3) is None
+    # undoable changes invalidate the cache when undone
+    col.set_configs({"test": 3}, undoable=True)
+    assert col.get_config("test") == 3
+    col.undo()
+    assert col.get_config("test") == 2
+    # legacy wrapped values are saved when changed
+    col.conf["list"] = [1]
+    lst = col.conf["list"]
+    lst.append(2)
+    del lst
+    assert col.get_config("list") == [1, 2]
+
+
+def test_upgrade_from_v1_scheduler():
+    col = getEmptyCol()
+    col.set_config("schedVer", 1)
+    col.set_config_bool(Config.Bool.SCHED_2021, False)
+    col._load_scheduler()
+    assert col.sched_ver() == 1
+    col.upgrade_to_v2_scheduler()
+    assert col.sched_ver() == 2
+    col.set_v3_scheduler(True)
+    assert col.v3_scheduler()
@@ -3,7 +3,10 @@
 
 # coding: utf-8
 
+import pytest
+
 from anki.errors import DeckRenameError
+from anki.scheduler.base import CustomStudyRequest
 from tests.shared import assertException, getEmptyCol
 
 
@@ -91,3 +94,72 @@ def test_rename():
     child = col.decks.get(childId)
     assertException(DeckRenameError, lambda: col.decks.rename(child, "filtered::child"))
     assertException(DeckRenameError, lambda: col.decks.rename(child, "FILTERED::child"))
+
+
+def test_deck_cache():
+    col = getEmptyCol()
+    did = col.decks.id("deck")
+    deck = col.decks.get(did)
+    # each lookup returns its own copy
+    deck["desc"] = "unsaved"
+    assert col.decks.get(did)["desc"] == ""
+    col.decks.save(deck)
+    assert col.decks.get(did)["desc"] == "unsaved"
+    conf = col.decks.config_dict_for_deck_id(did)
+    conf["maxTaken"] = 123
+    col.decks.save(conf)
+    assert col.decks.config_dict_for_deck_id(did)["maxTaken"] == 123
+    # changes reported by operations are picked up
+    note = col.newNote()
+    note["Front"] = "one"
+    col.add_note(note, did)
+    col.decks.select(did)
+    col.sched.answerCard(col.sched.getCard(), 3)
+    assert col.decks.get(did)["newToday"][1] == 1
+    # as are changes made by scheduler operations
+    col.sched.custom_study(CustomStudyRequest(deck_id=did, new_limit_delta=5))
+    assert col.decks.get(did)["extendNew"] == 5
+
+
+def test_deck_cache_after_answer():
+    col = getEmptyCol()
+    parent = col.decks.id("parent")
+    child = col.decks.id("parent::child")
+    other = col.decks.id("other")
+    note = col.newNote()
+    note["Front"] = "one"
+    col.add_note(note, child)
+    for did in (parent, child, other):
+        col.decks.get(did)
+    col.decks.select(child)
+    col.sched.answerCard(col.sched.getCard(), 3)
+    # only the card's deck and its parents are refetched
+    assert other in col.decks._deck_json
+    assert child not in col.decks._deck_json
+    assert col.decks.get(parent)["newToday"][1] == 1
+    assert col.decks.get(child)["newToday"][1] == 1
+    # parents are found even when the card's deck isn't cached
+    note = col.newNote()
+    note["Front"] = "two"
+    col.add_note(note, child)
+    col.decks._clear_deck_cache()
+    col.decks.get(parent)
+    col.sched.answerCard(col.sched.getCard(), 3)
+    assert col.decks.get(parent)["newToday"][1] == 2
+
+
+def test_immutable_deck_lookups():
+    col = getEmptyCol()
+    did = col.decks.id("deck")
+    deck = col.decks.get_immutable(did)
+    assert deck is col.decks.get_immutable(did)
+    with pytest.raises(TypeError):
+        deck["desc"] = "changed"  # type: ignore
+    conf = col.decks.config_immutable_for_deck_id(did)
+    with pytest.raises(TypeError):
+        conf["new"]["delays"][0] = 5  # type: ignore
+    # saving a modified copy replaces the shared view
+    copy = col.decks.config_dict_for_deck_id(did)
+    copy["maxTaken"] = 123
+    col.decks.save(copy)
+    assert col.decks.config_immutable_for_deck_id(did)["maxTaken"] == 123
@@ -2,10 +2,14 @@
 # License: GNU AGPL, version 3 or later; http://www.gnu.org/licenses/agpl.html
 
 # coding: utf-8
+import os
+import tempfile
+
 import pytest
 
 from anki.browser import BrowserConfig
 from anki.consts import *
+from anki.errors import Interrupted
 from tests.shared import getEmptyCol, isNearCutoff
 
 
@@ -227,6 +231,10 @@ def test_find_cards():
     assert len(col.find_cards("-(tag:monkey OR tag:sheep)")) == 6
     assert len(col.find_cards("tag:monkey or (tag:sheep sheep)")) == 2
     assert len(col.find_cards("tag:monkey or (tag:sheep octopus)")) == 1
+    # limits
+    ordered = list(col.find_cards("", order="c.id asc"))
+    assert list(col.find_cards("", order="c.id asc", limit=2)) == ordered[:2]
+    assert len(col.find_notes("", limit=1)) == 1
     # flag
     with pytest.raises(Exception):
         col.find_cards("flag:12")
@@ -312,3 +320,35 @@ def test_findDupes():
     assert not r
     # front isn't dupe
     assert col.find_dupes("Front") == []
+
+
+def test_findDupes_index():
+    col = getEmptyCol()
+    nids = []
+    for front, back in (("foo", "<b>bar</b>"), ("baz", "bar"), ("quux", "nope")):
+        note = col.newNote()
+        note["Front"] = front
+        note["Back"] = back
+        col.addNote(note)
+        nids.append(note.id)
+    progress = []
+
+    def on_progress(checked, total):
+        progress.append((checked, total))
+        return True
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index = os.path.join(tmp, "dupes.db")
+        r = col.find_dupes("Back", progress_cb=on_progress, index_path=index)
+        assert r == [("bar", nids[:2])]
+        assert progress == [(3, 3)]
+        # unchanged notes are served from the index
+        assert col.find_dupes("Back", index_path=index) == r
+        # and changed ones are checked again
+        note = col.get_note(nids[2])
+        note["Back"] = "bar"
+        col.update_note(note)
+        assert col.find_dupes("Back", index_path=index) == [("bar", nids)]
+        # returning false from the progress callback aborts
+        with pytest.raises(Interrupted):
+            col.find_dupes("Back", progress_cb=lambda *_: False, index_path=index)
@@ -59,3 +59,63 @@ def test_latex():
     col.addNote(note)
     assert len(os.listdir(col.media.dir())) == 2
     assert ".png" in oldcard.question()
+
+
+def test_render_all_latex():
+    col = getEmptyCol()
+    col.set_config_bool(Config.Bool.RENDER_LATEX, True)
+    import anki.latex
+
+    notes = []
+    for text in ("[latex]one[/latex]", "[latex]two[/latex]", "[latex]one[/latex]"):
+        note = col.newNote()
+        note["Front"] = text
+        col.addNote(note)
+        notes.append(note)
+    # a failed render is reported against a note that uses it
+    anki.latex.pngCommands[0][0] = "nolatex"
+    try:
+        nid, msg = col.media.render_all_latex(max_workers=2)
+    finally:
+        anki.latex.pngCommands[0][0] = "latex"
+    assert nid in [note.id for note in notes]
+    assert "executing nolatex" in without_unicode_isolation(msg)
+    if not shutil.which("latex") or not shutil.which("dvipng"):
+        print("aborting test; latex or dvipng is not installed")
+        return
+    # identical latex is only rendered once
+    assert col.media.render_all_latex(max_workers=2) is None
+    assert len(os.listdir(col.media.dir())) == 2
+
+
+def test_latex_failure_cache():
+    col = getEmptyCol()
+    col.set_config_bool(Config.Bool.RENDER_LATEX, True)
+    import anki.latex
+
+    compiles = []
+    orig_compile = anki.latex._compile
+
+    def compile(*args):
+        compiles.append(args)
+        return orig_compile(*args)
+
+    anki.latex._compile = compile
+    anki.latex.pngCommands[0][0] = "nolatex"
+    try:
+        note = col.newNote()
+        note["Front"] = "[latex]broken[/latex]"
+        col.addNote(note)
+        card = note.cards()[0]
+        assert "executing nolatex" in without_unicode_isolation(card.question())
+        # the failure is remembered, and reported without running latex again
+        assert "executing nolatex" in without_unicode_isolation(
+            card.question(reload=True)
+        )
+        assert len(compiles) == 1
+        anki.latex.clear_failed_renders()
+        card.question(reload=True)
+        assert len(compiles) == 2
+    finally:
+        anki.latex._compile = orig_compile
+        anki.latex.pngCommands[0][0] = "latex"
@@ -43,6 +43,29 @@ def test_modelCopy():
     assert col.models.scmhash(m) == col.models.scmhash(m2)
 
 
+def test_notetype_cache():
+    col = getEmptyCol()
+    m = col.models.current()
+    assert col.models.have(m["id"])
+    assert col.models.by_name(m["name"].upper()) is m
+    fmap = col.models.field_map(m)
+    assert col.models.field_map(m) is fmap
+    # changes made in place before saving are picked up
+    back = m["flds"][1]
+    back["name"] = "Unsaved"
+    assert "Unsaved" in col.models.field_map(m)
+    m["flds"][1] = dict(back, name="Back")
+    assert col.models.field_map(m)["Back"][1] is m["flds"][1]
+    # as are changes made through the manager
+    col.models.rename_field(m, m["flds"][0], "Renamed")
+    assert "Renamed" in col.models.field_map(m)
+    m2 = col.models.copy(m)
+    assert col.models.id_for_name(m2["name"]) == m2["id"]
+    col.models.remove(m2["id"])
+    assert not col.models.have(m2["id"])
+    assert col.models.by_name(m2["name"]) is None
+
+
 def test_fields():
     col = getEmptyCol()
     note = col.newNote()
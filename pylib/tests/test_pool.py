@@ -0,0 +1,33 @@
+# Copyright: Ankitects Pty Ltd and contributors
+# License: GNU AGPL, version 3 or later; http://www.gnu.org/licenses/agpl.html
+
+from anki.collection import Collection
+from anki.pool import CollectionPool, TaskCancelled
+from tests.shared import getEmptyCol
+
+
+def note_count(col: Collection) -> int:
+    return col.note_count()
+
+
+def test_collection_pool():
+    paths = []
+    for count in range(3):
+        col = getEmptyCol()
+        for _ in range(count):
+            note = col.newNote()
+            note["Front"] = "x"
+            col.addNote(note)
+        paths.append(col.path)
+        col.close()
+
+    with CollectionPool(processes=2) as pool:
+        results = {result.path: result for result in pool.map(note_count, paths)}
+        assert [results[path].result for path in paths] == [0, 1, 2]
+        assert not any(result.error for result in results.values())
+
+        task_id = pool.submit(note_count, paths[0])
+        pool.cancel(task_id)
+        [result] = pool.results()
+        assert result.task_id == task_id
+        assert isinstance(result.error, TaskCancelled)
@@ -28,6 +28,23 @@ def test_clock():
         raise Exception("Unit tests will fail around the day rollover.")
 
 
+def test_timing_cache():
+    col = getEmptyCol()
+    cutoff = col.sched.day_cutoff
+    misses = col.sched.timing_cache_misses
+    hits = col.sched.timing_cache_hits
+    assert col.sched.today == col.sched.today
+    assert col.sched.day_cutoff == cutoff
+    assert col.sched.timing_cache_misses == misses
+    assert col.sched.timing_cache_hits == hits + 3
+    # changing the rollover hour invalidates the cache
+    prefs = col.get_preferences()
+    prefs.scheduling.rollover = (prefs.scheduling.rollover + 12) % 24
+    col.set_preferences(prefs)
+    assert col.sched.day_cutoff != cutoff
+    assert col.sched.timing_cache_misses == misses + 1
+
+
 def test_basics():
     col = getEmptyCol()
     assert not col.sched.getCard()
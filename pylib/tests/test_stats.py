@@ -37,3 +37,18 @@ def test_graphs():
     with open(os.path.join(dir, "test.html"), "w", encoding="UTF-8") as note:
         note.write(rep)
     return
+
+
+def test_graphs_cache():
+    col = getEmptyCol()
+    assert "No cards have been studied today." in col.stats().report()
+    assert len(col._legacy_stats_cache.reports) == 1
+    col.stats().report(type=1)
+    assert len(col._legacy_stats_cache.reports) == 2
+    # reviewing modifies the collection, which discards the cached reports
+    note = col.newNote()
+    note["Front"] = "foo"
+    col.addNote(note)
+    col.sched.answerCard(col.sched.getCard(), 3)
+    assert "No cards have been studied today." not in col.stats().report()
+    assert len(col._legacy_stats_cache.reports) == 1
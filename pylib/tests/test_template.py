@@ -1,6 +1,7 @@
 # Copyright: Ankitects Pty Ltd and contributors
 # License: GNU AGPL, version 3 or later; http://www.gnu.org/licenses/agpl.html
 
+from anki import hooks
 from tests.shared import getEmptyCol
 
 
@@ -16,3 +17,40 @@ def test_deferred_frontside():
     col.addNote(note)
 
     assert "xxtest" in note.cards()[0].answer()
+
+
+def test_custom_filters():
+    col = getEmptyCol()
+    m = col.models.current()
+    m["tmpls"][0]["qfmt"] = "{{upper:Front}} {{unused:Back}} {{upper:Back}}"
+    col.models.save(m)
+
+    note = col.newNote()
+    note["Front"] = "foo"
+    note["Back"] = "bar"
+    col.addNote(note)
+    card = note.cards()[0]
+
+    # filters without subscribers leave the text alone
+    assert "foo bar bar" in card.question(reload=True)
+
+    def upper(txt, extra, items, field_name, _):
+        assert dict(items)["Front"] == "foo"
+        return txt.upper()
+
+    hooks.addHook("fmod_upper", upper)
+    try:
+        assert "FOO bar BAR" in card.question(reload=True)
+    finally:
+        hooks.remHook("fmod_upper", upper)
+    # cached filter chains follow the subscribers
+    assert "foo bar bar" in card.question(reload=True)
+
+    def unused(txt, field_name, filter_name, ctx):
+        return "x" if filter_name == "unused" else txt
+
+    hooks.field_filter.append(unused)
+    try:
+        assert "foo x bar" in card.question(reload=True)
+    finally:
+        hooks.field_filter.remove(unused)
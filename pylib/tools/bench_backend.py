@@ -0,0 +1,110 @@
+# Copyright: Ankitects Pty Ltd and contributors
+# License: GNU AGPL, version 3 or later; http://www.gnu.org/licenses/agpl.html
+
+"""
+Micro-benchmark for frequently-called backend methods.
+
+Usage: bench_backend.py <collection.anki2> [iterations]
+
+The collection is copied to a temporary folder before it is opened. For each
+method, the time spent in the raw bytes call is reported separately from the
+time spent encoding the request and decoding the response in Python.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+
+from anki import card_rendering_pb2, generic_pb2, scheduler_pb2, search_pb2
+from anki.collection import Collection
+
+
+def timed(fn: Callable[[], object], iterations: int) -> float:
+    "Mean time per call, in microseconds."
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1_000_000
+
+
+def report(name: str, raw: float, typed: float) -> None:
+    print(
+        f"{name:<24} raw {raw:9.1f}us  typed {typed:9.1f}us  "
+        f"python overhead {typed - raw:8.1f}us"
+    )
+
+
+def run(col: Collection, iterations: int) -> None:
+    backend = col._backend
+    card_id = col.db.scalar("select id from cards limit 1")
+    if not card_id:
+        print("collection has no cards")
+        return
+    col.load_browser_card_columns()
+    text = col.get_card(card_id).question()
+
+    queued = scheduler_pb2.GetQueuedCardsRequest(fetch_limit=1).SerializeToString()
+    report(
+        "get_queued_cards",
+        timed(lambda: backend.get_queued_cards_raw(queued), iterations),
+        timed(lambda: backend.get_queued_cards(fetch_limit=1), iterations),
+    )
+
+    cid = generic_pb2.Int64(val=card_id).SerializeToString()
+    report(
+        "browser_row_for_id",
+        timed(lambda: backend.browser_row_for_id_raw(cid), iterations),
+        timed(lambda: backend.browser_row_for_id(card_id), iterations),
+    )
+
+    render = card_rendering_pb2.RenderExistingCardRequest(
+        card_id=card_id, partial_render=True
+    ).SerializeToString()
+    report(
+        "render_existing_card",
+        timed(lambda: backend.render_existing_card_raw(render), iterations),
+        timed(
+            lambda: backend.render_existing_card(card_id=card_id, partial_render=True),
+            iterations,
+        ),
+    )
+
+    av = card_rendering_pb2.ExtractAvTagsRequest(
+        text=text, question_side=True
+    ).SerializeToString()
+    report(
+        "extract_av_tags",
+        timed(lambda: backend.extract_av_tags_raw(av), iterations),
+        timed(
+            lambda: backend.extract_av_tags(text=text, question_side=True),
+            iterations,
+        ),
+    )
+
+    # not a hot call, but a useful baseline for the fixed per-call cost
+    empty = search_pb2.SearchNode(parsable_text="").SerializeToString()
+    report(
+        "build_search_string",
+        timed(lambda: backend.build_search_string_raw(empty), iterations),
+        timed(lambda: backend.build_search_string(parsable_text=""), iterations),
+    )
+
+
+def main() -> None:
+    path = sys.argv[1]
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    with tempfile.TemporaryDirectory() as tmp:
+        copy = os.path.join(tmp, "collection.anki2")
+        shutil.copy(path, copy)
+        col = Collection(copy)
+        try:
+            run(col, iterations)
+        finally:
+            col.close(downgrade=False)
+
+
+if __name__ == "__main__":
+    main()
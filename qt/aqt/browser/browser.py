@@ -469,7 +469,9 @@ class Browser(QMainWindow):
                 # implicitly assume 'card' is in the current deck
                 self._default_search(card)
                 self.form.searchEdit.setFocus()
-            self.table.select_single_card(card.id)
+            self.table.after_search(
+                functools.partial(self.table.select_single_card, card.id)
+            )
 
     # Searching
     ######################################################################
@@ -495,7 +497,9 @@ class Browser(QMainWindow):
             self._default_search(card)
         self.form.searchEdit.setFocus()
         if card:
-            self.table.select_single_card(card.id)
+            self.table.after_search(
+                functools.partial(self.table.select_single_card, card.id)
+            )
 
     # search triggered by user
     @ensure_editor_saved
@@ -529,10 +533,7 @@ class Browser(QMainWindow):
     def search(self) -> None:
         """Search triggered programmatically. Caller must have saved note first."""
 
-        try:
-            self.table.search(self._lastSearchTxt)
-        except Exception as err:
-            showWarning(str(err))
+        self.table.search(self._lastSearchTxt)
 
     def update_history(self) -> None:
         assert self.mw.pm.profile is not None
@@ -1180,7 +1181,7 @@ class Browser(QMainWindow):
             SearchNode(nids=SearchNode.IdList(ids=nids))
         )
         self.search_for(search)
-        self.table.select_all()
+        self.table.after_search(self.table.select_all)
 
     # Hooks
     ######################################################################
@@ -4,13 +4,14 @@
 from __future__ import annotations
 
 import html
+import os
 from typing import Any
 
 import anki
 import anki.find
 import aqt
 import aqt.forms
-from anki.collection import SearchNode
+from anki.collection import Collection, SearchNode
 from anki.notes import NoteId
 from aqt.qt import *
 from aqt.qt import sip
@@ -68,9 +69,9 @@ class FindDuplicatesDialog(QDialog):
             field = fields[form.fields.currentIndex()]
             QueryOp(
                 parent=self.browser,
-                op=lambda col: col.find_dupes(field, search_text),
+                op=lambda col: self._find_dupes(col, field, search_text),
                 success=self.show_duplicates_report,
-            ).run_in_background()
+            ).with_progress().run_in_background()
 
         search = form.buttonBox.addButton(
             tr.actions_search(), QDialogButtonBox.ButtonRole.ActionRole
@@ -81,6 +82,22 @@ class FindDuplicatesDialog(QDialog):
         qconnect(search.clicked, on_click)
         self.show()
 
+    def _find_dupes(
+        self, col: Collection, field: str, search_text: str
+    ) -> list[tuple[str, list[NoteId]]]:
+        def on_progress(checked: int, total: int) -> bool:
+            self.mw.taskman.run_on_main(
+                lambda: self.mw.progress.update(value=checked, max=total)
+            )
+            return not self.mw.progress.want_cancel()
+
+        return col.find_dupes(
+            field,
+            search_text,
+            progress_cb=on_progress,
+            index_path=os.path.join(self.mw.pm.profileFolder(), "dupes.db"),
+        )
+
     def show_duplicates_report(self, dupes: list[tuple[str, list[NoteId]]]) -> None:
         if sip.isdeleted(self):
             return
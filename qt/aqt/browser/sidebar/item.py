@@ -86,11 +86,43 @@ class SidebarItem:
         self._row_in_parent: int | None = None
         self._search_matches_self = False
         self._search_matches_child = False
+        self._build_children: Callable[[SidebarItem], None] | None = None
 
     def add_child(self, cb: SidebarItem) -> None:
         self.children.append(cb)
         cb._parent_item = self
 
+    def add_children_lazily(self, build: Callable[[SidebarItem], None]) -> None:
+        """Defer building (more) children until they are needed. build() will
+        be called with the item the children should be added to."""
+        self._build_children = build
+
+    def has_children(self) -> bool:
+        return bool(self.children) or self._build_children is not None
+
+    def children_loaded(self) -> bool:
+        return self._build_children is None
+
+    def all_children_loaded(self) -> bool:
+        return self.children_loaded() and all(
+            child.all_children_loaded() for child in self.children
+        )
+
+    def build_lazy_children(self) -> list[SidebarItem]:
+        "Build the deferred children, without adding them to this item."
+        build, self._build_children = self._build_children, None
+        holder = SidebarItem("", "")
+        if build:
+            build(holder)
+        return holder.children
+
+    def load_all_children(self) -> None:
+        "Add all deferred children, recursively."
+        for child in self.build_lazy_children():
+            self.add_child(child)
+        for child in self.children:
+            child.load_all_children()
+
     def add_simple(
         self,
         name: str,
@@ -24,6 +24,55 @@ class SidebarModel(QAbstractItemModel):
             item._row_in_parent = row
             self._cache_rows(item)
 
+    def _cache_top_level_rows(self) -> None:
+        for row, item in enumerate(self.root.children):
+            item._row_in_parent = row
+
+    def replace_top_level_items(
+        self, row: int, count: int, items: list[SidebarItem]
+    ) -> None:
+        "Replace count top-level items starting at row with items."
+        if count:
+            self.beginRemoveRows(QModelIndex(), row, row + count - 1)
+            del self.root.children[row : row + count]
+            self._cache_top_level_rows()
+            self.endRemoveRows()
+        if items:
+            self.beginInsertRows(QModelIndex(), row, row + len(items) - 1)
+            self.root.children[row:row] = items
+            for item in items:
+                item._parent_item = self.root
+                self._cache_rows(item)
+            self._cache_top_level_rows()
+            self.endInsertRows()
+
+    def load_children(self, item: SidebarItem) -> bool:
+        """Add the item's deferred children to the model. Returns False if
+        they had already been loaded."""
+        if item.children_loaded():
+            return False
+        children = item.build_lazy_children()
+        if children:
+            first = len(item.children)
+            self.beginInsertRows(
+                self.index_for_item(item), first, first + len(children) - 1
+            )
+            for row, child in enumerate(children, start=first):
+                item.add_child(child)
+                child._row_in_parent = row
+                self._cache_rows(child)
+            self.endInsertRows()
+        return True
+
+    def load_all_children(self) -> None:
+        "Add all deferred children. This resets the model if any were missing."
+        if self.root.all_children_loaded():
+            return
+        self.beginResetModel()
+        self.root.load_all_children()
+        self._cache_rows(self.root)
+        self.endResetModel()
+
     def item_for_index(self, idx: QModelIndex) -> SidebarItem:
         return idx.internalPointer()
 
@@ -32,6 +81,7 @@ class SidebarModel(QAbstractItemModel):
         return self.createIndex(item._row_in_parent, 0, item)
 
     def search(self, text: str) -> bool:
+        self.load_all_children()
         return self.root.search(text.lower())
 
     # Qt API
@@ -47,6 +97,22 @@ class SidebarModel(QAbstractItemModel):
     def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
         return 1
 
+    def hasChildren(self, parent: QModelIndex = QModelIndex()) -> bool:
+        if not parent.isValid():
+            return self.root.has_children()
+        item: SidebarItem = parent.internalPointer()
+        return item.has_children()
+
+    def canFetchMore(self, parent: QModelIndex) -> bool:
+        if not parent.isValid():
+            return False
+        item: SidebarItem = parent.internalPointer()
+        return not item.children_loaded()
+
+    def fetchMore(self, parent: QModelIndex) -> None:
+        if parent.isValid():
+            self.load_children(parent.internalPointer())
+
     def index(
         self, row: int, column: int, parent: QModelIndex = QModelIndex()
     ) -> QModelIndex:
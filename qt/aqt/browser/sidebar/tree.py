@@ -2,6 +2,7 @@
 # License: GNU AGPL, version 3 or later; http://www.gnu.org/licenses/agpl.html
 from __future__ import annotations
 
+import functools
 from collections.abc import Callable, Iterable
 from enum import Enum, auto
 from typing import cast
@@ -10,6 +11,7 @@ import aqt
 import aqt.browser
 import aqt.operations
 from anki.collection import (
+    Collection,
     Config,
     OpChanges,
     OpChangesWithCount,
@@ -17,7 +19,7 @@ from anki.collection import (
     SearchNode,
 )
 from anki.decks import DeckCollapseScope, DeckId, DeckTreeNode
-from anki.models import NotetypeId
+from anki.models import NotetypeDict, NotetypeId
 from anki.notes import Note
 from anki.tags import TagTreeNode
 from anki.types import assert_exhaustive
@@ -82,6 +84,10 @@ class SidebarTreeView(QTreeView):
         self.current_search: str | None = None
         self.valid_drop_types: tuple[SidebarItemType, ...] = ()
         self._refresh_needed = False
+        # sections to rebuild on the next refresh_if_needed()
+        self._stale_stages: set[SidebarStage] = set()
+        # the top-level items built by each stage, in tree order
+        self._stage_items: dict[SidebarStage, list[SidebarItem]] = {}
 
         self.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
         self.customContextMenuRequested.connect(self.onContextMenu)  # type: ignore
@@ -151,14 +157,34 @@ class SidebarTreeView(QTreeView):
         self, changes: OpChanges, handler: object | None, focused: bool
     ) -> None:
         if changes.browser_sidebar and handler is not self:
-            self._refresh_needed = True
+            if stages := self._stages_affected_by(changes):
+                self._stale_stages.update(stages)
+            else:
+                self._refresh_needed = True
         if focused:
             self.refresh_if_needed()
 
     def refresh_if_needed(self) -> None:
         if self._refresh_needed:
             self.refresh()
-            self._refresh_needed = False
+        elif self._stale_stages:
+            self.refresh_stages(self._stale_stages)
+        self._refresh_needed = False
+        self._stale_stages = set()
+
+    @staticmethod
+    def _stages_affected_by(changes: OpChanges) -> set[SidebarStage]:
+        stages = set()
+        if changes.tag:
+            stages.add(SidebarStage.TAGS)
+        if changes.deck:
+            stages.add(SidebarStage.DECKS)
+        if changes.notetype:
+            stages.add(SidebarStage.NOTETYPES)
+        if changes.config:
+            # saved searches and the current deck are stored in the config
+            stages.update((SidebarStage.SAVED_SEARCHES, SidebarStage.DECKS))
+        return stages
 
     def refresh(self, new_current: SidebarItem | None = None) -> None:
         "Refresh list. No-op if sidebar is not visible."
@@ -168,10 +194,13 @@ class SidebarTreeView(QTreeView):
         if not new_current and self.model() and (idx := self.currentIndex()):
             new_current = self.model().item_for_index(idx)
 
-        def on_done(root: SidebarItem) -> None:
+        def on_done(
+            out: tuple[SidebarItem, dict[SidebarStage, list[SidebarItem]]],
+        ) -> None:
             # user may have closed browser
             if sip.isdeleted(self):
                 return
+            root, self._stage_items = out
 
             # block repainting during refreshing to avoid flickering
             self.setUpdatesEnabled(False)
@@ -196,9 +225,61 @@ class SidebarTreeView(QTreeView):
             )
 
         QueryOp(
-            parent=self.browser, op=lambda _: self._root_tree(), success=on_done
+            parent=self.browser, op=lambda _: self._build_root_tree(), success=on_done
         ).run_in_background()
 
+    def refresh_stages(
+        self, stages: Iterable[SidebarStage], new_current: SidebarItem | None = None
+    ) -> None:
+        """Rebuild the sections of the given stages, leaving the rest of the
+        tree as it is. No-op if sidebar is not visible."""
+        if not self.isVisible():
+            return
+        if not self.model():
+            self.refresh(new_current)
+            return
+
+        wanted = set(stages)
+        stages = [stage for stage in SidebarStage if stage in wanted]
+        if not new_current and (idx := self.currentIndex()):
+            new_current = self.model().item_for_index(idx)
+
+        def build(_col: Collection) -> dict[SidebarStage, list[SidebarItem]]:
+            return {stage: self._build_stage_items(stage) for stage in stages}
+
+        def on_done(sections: dict[SidebarStage, list[SidebarItem]]) -> None:
+            if sip.isdeleted(self):
+                return
+
+            self.setUpdatesEnabled(False)
+
+            model = self.model()
+            for stage, items in sections.items():
+                row = 0
+                for other in SidebarStage:
+                    if other is stage:
+                        break
+                    row += len(self._stage_items.get(other, []))
+                old_items = self._stage_items.get(stage, [])
+                model.replace_top_level_items(row, len(old_items), items)
+                self._stage_items[stage] = items
+
+            if self.current_search:
+                self.search_for(self.current_search)
+            else:
+                for items in sections.values():
+                    for item in items:
+                        idx = model.index_for_item(item)
+                        self._expand_where_necessary(model, idx)
+                        if item.show_expanded(False):
+                            self.setExpanded(idx, True)
+            if new_current:
+                self.restore_current(new_current)
+
+            self.setUpdatesEnabled(True)
+
+        QueryOp(parent=self.browser, op=build, success=on_done).run_in_background()
+
     def restore_current(self, current: SidebarItem) -> None:
         if current_item := self.find_item(current.has_same_id):
             index = self.model().index_for_item(current_item)
@@ -494,6 +575,8 @@ class SidebarTreeView(QTreeView):
             return
         if item := self.model().item_for_index(idx):
             item.expanded = True
+            if self.model().load_children(item):
+                self._expand_where_necessary(self.model(), idx)
 
     def _on_collapse(self, idx: QModelIndex) -> None:
         if self.current_search:
@@ -504,17 +587,30 @@ class SidebarTreeView(QTreeView):
     # Tree building
     ###########################
 
-    def _root_tree(self) -> SidebarItem:
+    def _build_root_tree(
+        self,
+    ) -> tuple[SidebarItem, dict[SidebarStage, list[SidebarItem]]]:
+        "The root item, and the top-level items added by each stage."
         root = SidebarItem("", "", item_type=SidebarItemType.ROOT)
+        stage_items = {}
 
         for stage in SidebarStage:
-            handled = gui_hooks.browser_will_build_tree(
-                False, root, stage, self.browser
-            )
-            if not handled:
-                self._build_stage(root, stage)
+            first = len(root.children)
+            self._run_stage(root, stage)
+            stage_items[stage] = root.children[first:]
+
+        return root, stage_items
+
+    def _build_stage_items(self, stage: SidebarStage) -> list[SidebarItem]:
+        "Build the top-level items of a single stage."
+        root = SidebarItem("", "", item_type=SidebarItemType.ROOT)
+        self._run_stage(root, stage)
+        return root.children
 
-        return root
+    def _run_stage(self, root: SidebarItem, stage: SidebarStage) -> None:
+        handled = gui_hooks.browser_will_build_tree(False, root, stage, self.browser)
+        if not handled:
+            self._build_stage(root, stage)
 
     def _build_stage(self, root: SidebarItem, stage: SidebarStage) -> None:
         if stage is SidebarStage.SAVED_SEARCHES:
@@ -769,7 +865,12 @@ class SidebarTreeView(QTreeView):
                 )
                 root.add_child(item)
                 newhead = f"{head + node.name}::"
-                render(item, node.children, newhead)
+                if item.expanded:
+                    render(item, node.children, newhead)
+                elif node.children:
+                    item.add_children_lazily(
+                        functools.partial(render, nodes=node.children, head=newhead)
+                    )
 
         tree = self.col.tags.tree()
         root = self._section_root(
@@ -787,7 +888,10 @@ class SidebarTreeView(QTreeView):
             search_node=SearchNode(negated=SearchNode(tag="_*")),
         )
 
-        render(root, tree.children)
+        if root.expanded:
+            render(root, tree.children)
+        else:
+            root.add_children_lazily(functools.partial(render, nodes=tree.children))
 
     # Tree: Decks
     ###########################
@@ -823,7 +927,12 @@ class SidebarTreeView(QTreeView):
                 )
                 root.add_child(item)
                 newhead = f"{head + node.name}::"
-                render(item, node.children, newhead)
+                if item.expanded:
+                    render(item, node.children, newhead)
+                elif node.children:
+                    item.add_children_lazily(
+                        functools.partial(render, nodes=node.children, head=newhead)
+                    )
 
         tree = self.col.decks.deck_tree()
         root = self._section_root(
@@ -842,7 +951,10 @@ class SidebarTreeView(QTreeView):
         )
         current.id = self.mw.col.decks.selected()
 
-        render(root, tree.children)
+        if root.expanded:
+            render(root, tree.children)
+        else:
+            root.add_children_lazily(functools.partial(render, nodes=tree.children))
 
     # Tree: Notetypes
     ###########################
@@ -861,15 +973,7 @@ class SidebarTreeView(QTreeView):
         )
         root.search_node = SearchNode(note="_*")
 
-        for nt in sorted(self.col.models.all(), key=lambda nt: nt["name"].lower()):
-            item = SidebarItem(
-                nt["name"],
-                notetype_icon,
-                search_node=SearchNode(note=nt["name"]),
-                item_type=SidebarItemType.NOTETYPE,
-                id=nt["id"],
-            )
-
+        def add_templates_and_fields(nt: NotetypeDict, item: SidebarItem) -> None:
             for c, tmpl in enumerate(nt["tmpls"]):
                 child = SidebarItem(
                     tmpl["name"],
@@ -894,6 +998,15 @@ class SidebarTreeView(QTreeView):
                 )
                 item.add_child(child)
 
+        for nt in sorted(self.col.models.all(), key=lambda nt: nt["name"].lower()):
+            item = SidebarItem(
+                nt["name"],
+                notetype_icon,
+                search_node=SearchNode(note=nt["name"]),
+                item_type=SidebarItemType.NOTETYPE,
+                id=nt["id"],
+            )
+            item.add_children_lazily(functools.partial(add_templates_and_fields, nt))
             root.add_child(item)
 
     # Context menu
@@ -1019,21 +1132,29 @@ class SidebarTreeView(QTreeView):
             return
 
         selected_items = self._selected_items()
-        if not any(item.children for item in selected_items):
+        if not any(item.has_children() for item in selected_items):
             return
+        # the children are listed below
+        for item in selected_items:
+            self.model().load_children(item)
 
-        if any(not item.expanded for item in selected_items if item.children):
+        if any(not item.expanded for item in selected_items if item.has_children()):
             menu.addAction(tr.browsing_sidebar_expand(), lambda: set_expanded(True))
-        if any(item.expanded for item in selected_items if item.children):
+        if any(item.expanded for item in selected_items if item.has_children()):
             menu.addAction(tr.browsing_sidebar_collapse(), lambda: set_expanded(False))
         if any(
-            not c.expanded for i in selected_items for c in i.children if c.children
+            not c.expanded
+            for i in selected_items
+            for c in i.children
+            if c.has_children()
         ):
             menu.addAction(
                 tr.browsing_sidebar_expand_children(),
                 lambda: set_children_expanded(True),
             )
-        if any(c.expanded for i in selected_items for c in i.children if c.children):
+        if any(
+            c.expanded for i in selected_items for c in i.children if c.has_children()
+        ):
             menu.addAction(
                 tr.browsing_sidebar_collapse_children(),
                 lambda: set_children_expanded(False),
@@ -1195,7 +1316,10 @@ class SidebarTreeView(QTreeView):
                 return
         conf[name] = search
         self._set_saved_searches(conf)
-        self.refresh(SidebarItem(name, "", item_type=SidebarItemType.SAVED_SEARCH))
+        self.refresh_stages(
+            [SidebarStage.SAVED_SEARCHES],
+            SidebarItem(name, "", item_type=SidebarItemType.SAVED_SEARCH),
+        )
 
     def remove_saved_searches(self, _item: SidebarItem) -> None:
         selected = self._selected_saved_searches()
@@ -1203,7 +1327,7 @@ class SidebarTreeView(QTreeView):
         for name in selected:
             del conf[name]
         self._set_saved_searches(conf)
-        self.refresh()
+        self.refresh_stages([SidebarStage.SAVED_SEARCHES])
 
     def rename_saved_search(self, item: SidebarItem, new_name: str) -> None:
         old_name = item.name
@@ -1220,7 +1344,7 @@ class SidebarTreeView(QTreeView):
         del conf[old_name]
         self._set_saved_searches(conf)
         item.name = new_name
-        self.refresh()
+        self.refresh_stages([SidebarStage.SAVED_SEARCHES])
 
     def save_current_search(self) -> None:
         if (search := self._get_current_search()) is None:
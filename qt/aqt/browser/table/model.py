@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import time
+from collections import OrderedDict
 from collections.abc import Callable, Sequence
 from typing import Any
 
@@ -17,22 +18,38 @@ from anki.notes import Note, NoteId
 from aqt import gui_hooks
 from aqt.browser.table import Cell, CellRow, Column, ItemId, SearchContext
 from aqt.browser.table.state import ItemState
+from aqt.operations import QueryOp
 from aqt.qt import *
 from aqt.utils import tr
 
+# the number of rows around the requested ones that are fetched in the same
+# batch, so scrolling a little further does not need another round trip
+PREFETCH_MARGIN = 50
+# requests spanning more rows than this only fetch the requested rows
+MAX_PREFETCH_ROWS = 1000
+# the maximum number of rows kept in the cache
+ROW_CACHE_SIZE = 5000
+
 
 class DataModel(QAbstractTableModel):
     """Data manager for the browser table.
 
     _items -- The card or note ids currently hold and corresponding to the
               table's rows.
-    _rows -- The cached data objects to render items to rows.
+    _rows -- The cached data objects to render items to rows, least recently
+             used first.
+    _pending -- The row numbers that have been requested but not fetched yet.
+    _item_rows -- The row of each item, built when first needed after _items
+                  changes.
     columns -- The data objects of all available columns, used to define the display
                of active columns and list all toggleable columns to the user.
     _block_updates -- If True, serve stale content to avoid hitting the DB.
     _stale_cutoff -- A threshold to decide whether a cached row has gone stale.
     """
 
+    # how many items search_in_background() finds before the rest
+    FIRST_ITEMS_LIMIT: int = 200
+
     def __init__(
         self,
         parent: QObject,
@@ -49,7 +66,20 @@ class DataModel(QAbstractTableModel):
         gui_hooks.browser_did_fetch_columns(self.columns)
         self._state: ItemState = state
         self._items: Sequence[ItemId] = []
-        self._rows: dict[int, CellRow] = {}
+        self._item_rows: dict[ItemId, int] | None = None
+        self._rows: OrderedDict[ItemId, CellRow] = OrderedDict()
+        self._pending: set[int] = set()
+        self._fetch_scheduled = False
+        self._fetching = False
+        # changes whenever _items or the active columns change, so that the
+        # results of a fetch that was started earlier can be discarded
+        self._generation = 0
+        # incremented by each search, so that a search that is still running
+        # in the background can tell it has been superseded
+        self._search_serial = 0
+        # the serial of the search whose query is running in the background
+        self._running_search: int | None = None
+        self._search_pending = False
         self._block_updates = False
         self._stale_cutoff = 0.0
         self._on_row_state_will_change = row_state_will_change_callback
@@ -66,18 +96,30 @@ class DataModel(QAbstractTableModel):
         return self.get_row(index).cells[index.column()]
 
     def get_row(self, index: QModelIndex) -> CellRow:
+        """Return the cached row. If it is missing or stale, it is fetched in
+        the background, and a placeholder or the stale row is returned until
+        it arrives."""
         item = self.get_item(index)
         if row := self._rows.get(item):
+            self._rows.move_to_end(item)
             if not self._block_updates and row.is_stale(self._stale_cutoff):
                 # need to refresh
-                return self._fetch_row_and_update_cache(index, item, row)
+                self._request_row(index.row())
             # return row, even if it's stale
             return row
-        if self._block_updates:
-            # blank row until we unblock
-            return CellRow.placeholder(self.len_columns())
-        # missing row, need to build
-        return self._fetch_row_and_update_cache(index, item, None)
+        if not self._block_updates:
+            # missing row, need to build
+            self._request_row(index.row())
+        # blank row until it has been fetched
+        return CellRow.placeholder(self.len_columns())
+
+    def fetch_row(self, index: QModelIndex) -> CellRow:
+        "Like get_row(), but fetches a missing or stale row immediately."
+        item = self.get_item(index)
+        row = self._rows.get(item)
+        if row and (self._block_updates or not row.is_stale(self._stale_cutoff)):
+            return row
+        return self._fetch_row_and_update_cache(index, item, row)
 
     def _fetch_row_and_update_cache(
         self, index: QModelIndex, item: ItemId, old_row: CellRow | None
@@ -85,7 +127,17 @@ class DataModel(QAbstractTableModel):
         """Fetch a row from the backend, add it to the cache and return it.
         Then fire callbacks if the row is being deleted or restored.
         """
-        new_row = self._fetch_row_from_backend(item)
+        return self._update_cache(
+            index, item, old_row, self._fetch_row_from_backend(item)
+        )
+
+    def _update_cache(
+        self,
+        index: QModelIndex,
+        item: ItemId,
+        old_row: CellRow | None,
+        new_row: CellRow,
+    ) -> CellRow:
         # row state has changed if existence of cached and fetched counterparts differ
         # if the row was previously uncached, it is assumed to have existed
         state_change = (
@@ -96,9 +148,12 @@ class DataModel(QAbstractTableModel):
         if state_change:
             self._on_row_state_will_change(index, not new_row.is_disabled)
         self._rows[item] = new_row
+        self._rows.move_to_end(item)
+        if len(self._rows) > ROW_CACHE_SIZE:
+            self._rows.popitem(last=False)
         if state_change:
             self._on_row_state_changed(index, not new_row.is_disabled)
-        return self._rows[item]
+        return new_row
 
     def _fetch_row_from_backend(self, item: ItemId) -> CellRow:
         try:
@@ -124,6 +179,121 @@ class DataModel(QAbstractTableModel):
         )
         return row
 
+    # Batched fetching
+
+    def _request_row(self, row: int) -> None:
+        "Queue a row to be fetched with the other rows requested in this cycle."
+        self._pending.add(row)
+        if not self._fetch_scheduled and not self._fetching:
+            self._fetch_scheduled = True
+            QTimer.singleShot(0, self._fetch_pending_rows)
+
+    def _rows_to_fetch(self) -> list[int]:
+        """The pending rows, plus a margin around them, that are missing or
+        stale."""
+        pending = [row for row in self._pending if row < self.len_rows()]
+        self._pending.clear()
+        if not pending:
+            return []
+        first = max(0, min(pending) - PREFETCH_MARGIN)
+        last = min(self.len_rows(), max(pending) + PREFETCH_MARGIN + 1)
+        rows = range(first, last) if last - first <= MAX_PREFETCH_ROWS else pending
+        return [
+            row
+            for row in sorted(rows)
+            if not (cached := self._rows.get(self._items[row]))
+            or cached.is_stale(self._stale_cutoff)
+        ]
+
+    def _fetch_pending_rows(self) -> None:
+        self._fetch_scheduled = False
+        if self._block_updates:
+            # the rows will be requested again when the table is redrawn
+            self._pending.clear()
+            return
+        if not (rows := self._rows_to_fetch()):
+            return
+        items = [self._items[row] for row in rows]
+        generation = self._generation
+        # rows are only as fresh as the moment the fetch started
+        started = time.time()
+        self._fetching = True
+        parent = self.parent()
+        assert isinstance(parent, QWidget)
+        QueryOp(
+            parent=parent,
+            op=lambda col: col.browser_rows_for_ids(items),
+            success=lambda fetched: self._on_rows_fetched(
+                generation, started, rows, items, fetched
+            ),
+        ).failure(
+            lambda exc: self._on_rows_fetch_failed(
+                generation, started, rows, items, exc
+            )
+        ).run_in_background()
+
+    def _on_rows_fetched(
+        self,
+        generation: int,
+        started: float,
+        rows: list[int],
+        items: list[ItemId],
+        fetched: list[Any],
+    ) -> None:
+        if generation != self._generation:
+            # the table has changed since the fetch started
+            self._store_fetched_rows(generation, started, rows, items, [])
+            return
+        new_rows = []
+        for item, out in zip(items, fetched):
+            if isinstance(out, str):
+                new_rows.append(CellRow.disabled(self.len_columns(), out))
+            else:
+                row = CellRow(*out)
+                gui_hooks.browser_did_fetch_row(
+                    item, self._state.is_notes_mode(), row, self._state.active_columns
+                )
+                new_rows.append(row)
+        self._store_fetched_rows(generation, started, rows, items, new_rows)
+
+    def _on_rows_fetch_failed(
+        self,
+        generation: int,
+        started: float,
+        rows: list[int],
+        items: list[ItemId],
+        exc: Exception,
+    ) -> None:
+        if isinstance(exc, BackendError):
+            text = str(exc)
+        else:
+            text = tr.errors_please_check_database()
+        new_rows = [CellRow.disabled(self.len_columns(), text) for _ in items]
+        self._store_fetched_rows(generation, started, rows, items, new_rows)
+
+    def _store_fetched_rows(
+        self,
+        generation: int,
+        started: float,
+        rows: list[int],
+        items: list[ItemId],
+        new_rows: list[CellRow],
+    ) -> None:
+        self._fetching = False
+        if generation == self._generation:
+            for row, item, new_row in zip(rows, items, new_rows):
+                new_row.refreshed_at = started
+                self._update_cache(
+                    self.index(row, 0), item, self._rows.get(item), new_row
+                )
+            self.dataChanged.emit(  # type: ignore
+                self.index(rows[0], 0),
+                self.index(rows[-1], self.len_columns() - 1),
+            )
+        if self._pending:
+            self._fetch_scheduled = True
+            QTimer.singleShot(0, self._fetch_pending_rows)
+
     def get_cached_row(self, index: QModelIndex) -> CellRow | None:
         """Get row if it is cached, regardless of staleness."""
         return self._rows.get(self.get_item(index))
@@ -140,6 +310,7 @@ class DataModel(QAbstractTableModel):
     def begin_reset(self) -> None:
         self.beginResetModel()
         self.mark_cache_stale()
+        self._pending.clear()
 
     def end_reset(self) -> None:
         self.endResetModel()
@@ -196,18 +367,18 @@ class DataModel(QAbstractTableModel):
 
     # Get row numbers from items
 
+    def _get_item_rows_index(self) -> dict[ItemId, int]:
+        if self._item_rows is None:
+            self._item_rows = {item: row for row, item in enumerate(self._items)}
+        return self._item_rows
+
     def get_item_row(self, item: ItemId) -> int | None:
-        for row, i in enumerate(self._items):
-            if i == item:
-                return row
-        return None
+        return self._get_item_rows_index().get(item)
 
     def get_item_rows(self, items: Sequence[ItemId]) -> list[int]:
-        rows = []
-        for row, i in enumerate(self._items):
-            if i in items:
-                rows.append(row)
-        return rows
+        "The rows of the items that are in the table, in ascending order."
+        index = self._get_item_rows_index()
+        return sorted({row for item in items if (row := index.get(item)) is not None})
 
     def get_card_row(self, card_id: CardId) -> int | None:
         return self.get_item_row(self._state.get_item_from_card_id(card_id))
@@ -261,7 +432,111 @@ class DataModel(QAbstractTableModel):
         finally:
             self.end_reset()
 
+    def search_in_background(
+        self,
+        context: SearchContext,
+        on_first_items: Callable[[Sequence[ItemId]], None],
+        on_done: Callable[[SearchContext], None],
+        on_failure: Callable[[Exception], None],
+    ) -> None:
+        """Find the items of a search without blocking the UI. The table is
+        left unchanged; once the ids have been found, on_done() is called with
+        the context, which can then be passed to apply_search().
+
+        The first FIRST_ITEMS_LIMIT ids are looked up before the rest. If there
+        are more, on_first_items() is called with them while the full search
+        runs, so that they can be passed to show_first_items().
+
+        If another search is started before this one completes, this one is
+        aborted, and none of the callbacks are called. Otherwise, on_failure()
+        is called if the search fails or is interrupted."""
+        serial = self._prepare_search(context)
+        if context.ids is not None:
+            # provided by an add-on
+            on_done(context)
+            return
+        self._search_pending = True
+        state = self._state
+        assert aqt.mw is not None
+        taskman = aqt.mw.taskman
+
+        def find_items(limit: int = 0) -> Sequence[ItemId] | None:
+            if serial != self._search_serial:
+                # superseded before it started
+                return None
+            self._running_search = serial
+            try:
+                return state.find_items(
+                    context.search, context.order, context.reverse, limit
+                )
+            finally:
+                self._running_search = None
+
+        def op(_col: Collection) -> Sequence[ItemId] | None:
+            first = find_items(self.FIRST_ITEMS_LIMIT)
+            if first is None or len(first) < self.FIRST_ITEMS_LIMIT:
+                return first
+            taskman.run_on_main(lambda: first_items(first))
+            return find_items()
+
+        def first_items(ids: Sequence[ItemId]) -> None:
+            if serial == self._search_serial and self._search_pending:
+                on_first_items(ids)
+
+        def success(ids: Sequence[ItemId] | None) -> None:
+            if ids is not None and serial == self._search_serial:
+                self._search_pending = False
+                context.ids = ids
+                on_done(context)
+
+        def failure(exc: Exception) -> None:
+            if serial == self._search_serial:
+                self._search_pending = False
+                on_failure(exc)
+
+        parent = self.parent()
+        assert isinstance(parent, QWidget)
+        QueryOp(parent=parent, op=op, success=success).failure(
+            failure
+        ).run_in_background()
+
+    def show_first_items(self, ids: Sequence[ItemId]) -> None:
+        """Show the first items found by search_in_background() until the search
+        completes."""
+        self.begin_reset()
+        try:
+            self._set_items(ids)
+        finally:
+            self.end_reset()
+
+    def apply_search(self, context: SearchContext) -> None:
+        "Show the items found by search_in_background()."
+        assert context.ids is not None
+        self.begin_reset()
+        try:
+            self._apply_search(context)
+        finally:
+            self.end_reset()
+
+    def is_searching(self) -> bool:
+        "True if a search started with search_in_background() has not completed."
+        return self._search_pending
+
     def _search_inner(self, context: SearchContext) -> None:
+        self._prepare_search(context)
+        if context.ids is None:
+            context.ids = self._state.find_items(
+                context.search, context.order, context.reverse
+            )
+        self._apply_search(context)
+
+    def _prepare_search(self, context: SearchContext) -> int:
+        """Supersede any search running in the background, and fill in the
+        context before the ids are found. Returns the serial of the search."""
+        self._search_serial += 1
+        self._search_pending = False
+        if self._running_search is not None:
+            self.col.set_wants_abort()
         if context.order is True:
             try:
                 context.order = self.columns[self._state.sort_column]
@@ -271,17 +546,25 @@ class DataModel(QAbstractTableModel):
             context.reverse = self._state.sort_backwards
         context.addon_metadata = {}
         gui_hooks.browser_will_search(context)
-        if context.ids is None:
-            context.ids = self._state.find_items(
-                context.search, context.order, context.reverse
-            )
+        return self._search_serial
+
+    def _apply_search(self, context: SearchContext) -> None:
+        assert context.ids is not None
         gui_hooks.browser_did_search(context)
-        self._items = context.ids
-        self._rows = {}
+        self._set_items(context.ids)
+
+    def _set_items(self, items: Sequence[ItemId]) -> None:
+        self._items = items
+        self._item_rows = None
+        self._rows.clear()
+        self._generation += 1
 
     def reverse(self) -> None:
         self.beginResetModel()
         self._items = list(reversed(self._items))
+        self._item_rows = None
+        self._pending.clear()
+        self._generation += 1
         self.endResetModel()
 
     # Columns
@@ -310,6 +593,9 @@ class DataModel(QAbstractTableModel):
     def toggle_column(self, column: str) -> None:
         self.begin_reset()
         self._state.toggle_active_column(column)
+        # cached rows have cells for the old columns
+        self._rows.clear()
+        self._generation += 1
         self.end_reset()
 
     # Model interface
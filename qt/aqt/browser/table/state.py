@@ -9,9 +9,9 @@ from typing import cast
 from anki.browser import BrowserConfig
 from anki.cards import Card, CardId
 from anki.collection import Collection
+from anki.dbproxy import BOUND_IDS, bind_ids
 from anki.errors import NotFoundError
 from anki.notes import Note, NoteId
-from anki.utils import ids2str
 from aqt.browser.table import Column, ItemId, ItemList
 
 
@@ -35,12 +35,14 @@ class ItemState(ABC):
     def note_ids_from_card_ids(self, items: Sequence[ItemId]) -> Sequence[NoteId]:
         assert self.col.db is not None
         return self.col.db.list(
-            f"select distinct nid from cards where id in {ids2str(items)}"
+            f"select distinct nid from cards where id in {BOUND_IDS}", bind_ids(items)
         )
 
     def card_ids_from_note_ids(self, items: Sequence[ItemId]) -> Sequence[CardId]:
         assert self.col.db is not None
-        return self.col.db.list(f"select id from cards where nid in {ids2str(items)}")
+        return self.col.db.list(
+            f"select id from cards where nid in {BOUND_IDS}", bind_ids(items)
+        )
 
     def column_key_at(self, index: int) -> str:
         return self._active_columns[index]
@@ -100,9 +102,10 @@ class ItemState(ABC):
 
     @abstractmethod
     def find_items(
-        self, search: str, order: bool | str | Column, reverse: bool
+        self, search: str, order: bool | str | Column, reverse: bool, limit: int = 0
     ) -> Sequence[ItemId]:
-        """Return the item ids fitting the given search and order."""
+        """Return the item ids fitting the given search and order. If limit is
+        non-zero, only the first `limit` ids are returned."""
 
     @abstractmethod
     def get_item_from_card_id(self, card: CardId) -> ItemId:
@@ -154,9 +157,9 @@ class CardState(ItemState):
         return self.get_card(item).note()
 
     def find_items(
-        self, search: str, order: bool | str | Column, reverse: bool
+        self, search: str, order: bool | str | Column, reverse: bool, limit: int = 0
     ) -> Sequence[ItemId]:
-        return self.col.find_cards(search, order, reverse)
+        return self.col.find_cards(search, order, reverse, limit)
 
     def get_item_from_card_id(self, card: CardId) -> ItemId:
         return card
@@ -203,9 +206,9 @@ class NoteState(ItemState):
         return self.col.get_note(NoteId(item))
 
     def find_items(
-        self, search: str, order: bool | str | Column, reverse: bool
+        self, search: str, order: bool | str | Column, reverse: bool, limit: int = 0
     ) -> Sequence[ItemId]:
-        return self.col.find_notes(search, order, reverse)
+        return self.col.find_notes(search, order, reverse, limit)
 
     def get_item_from_card_id(self, card: CardId) -> ItemId:
         return self.col.get_card(card).note().id
@@ -12,6 +12,7 @@ import aqt.forms
 from anki.cards import Card, CardId
 from anki.collection import Collection, Config, OpChanges
 from anki.consts import *
+from anki.errors import Interrupted
 from anki.notes import Note, NoteId
 from aqt import gui_hooks
 from aqt.browser.table import Columns, ItemId, SearchContext
@@ -25,6 +26,7 @@ from aqt.utils import (
     restoreHeader,
     saveHeader,
     showInfo,
+    showWarning,
     tr,
 )
 
@@ -54,6 +56,11 @@ class Table:
         # temporarily set for selection preservation
         self._current_item: ItemId | None = None
         self._selected_items: Sequence[ItemId] = []
+        # called once the search running in the background completes
+        self._after_search: list[Callable[[], None]] = []
+        # set while the first items of a running search are shown; the
+        # selection from before the search is kept saved until it completes
+        self._showing_first_items = False
 
     def set_view(self, view: QTableView) -> None:
         self._view = view
@@ -186,14 +193,59 @@ class Table:
     # Modify table
 
     def search(self, txt: str) -> None:
-        self._save_selection()
-        self._model.search(SearchContext(search=txt, browser=self.browser))
+        """Search in the background. The current rows are shown until the first
+        results are ready, and a search that is still running is aborted."""
+        self._model.search_in_background(
+            SearchContext(search=txt, browser=self.browser),
+            self._on_search_first_items,
+            self._on_search_done,
+            self._on_search_failed,
+        )
+
+    def after_search(self, callback: Callable[[], None]) -> None:
+        """Call callback once the current search has completed, or immediately
+        if none is running."""
+        if self._model.is_searching():
+            self._after_search.append(callback)
+        else:
+            callback()
+
+    def _on_search_first_items(self, ids: Sequence[ItemId]) -> None:
+        if not self._showing_first_items:
+            self._save_selection()
+            self._showing_first_items = True
+        self._model.show_first_items(ids)
+        self._reset_selection()
+        self.browser.on_all_or_selected_rows_changed()
+        self.browser.on_current_row_changed()
+
+    def _on_search_done(self, context: SearchContext) -> None:
+        if not self._showing_first_items:
+            self._save_selection()
+        self._showing_first_items = False
+        self._model.apply_search(context)
         self._restore_selection(self._intersected_selection)
+        self._run_after_search()
+
+    def _on_search_failed(self, exc: Exception) -> None:
+        if self._showing_first_items:
+            self._showing_first_items = False
+            self._selected_items = []
+            self._current_item = None
+        self._run_after_search()
+        if not isinstance(exc, Interrupted):
+            showWarning(str(exc))
+
+    def _run_after_search(self) -> None:
+        callbacks, self._after_search = self._after_search, []
+        for callback in callbacks:
+            callback()
 
     def toggle_state(self, is_notes_mode: bool, last_search: str) -> None:
         if is_notes_mode == self.is_notes_mode():
             return
         self._save_header()
+        self._showing_first_items = False
         self._save_selection()
         self._state = self._model.toggle_state(
             SearchContext(search=last_search, browser=self.browser)
@@ -204,6 +256,8 @@ class Table:
         )
         self._restore_header()
         self._restore_selection(self._toggled_selection)
+        # any search running in the background was superseded
+        self._run_after_search()
 
     # Move cursor
 
@@ -230,7 +284,7 @@ class Table:
         bottom = max(r.row() for r in self._selected()) + 1
         for row in range(bottom, self.len()):
             index = self._model.index(row, 0)
-            if self._model.get_row(index).is_disabled:
+            if self._model.fetch_row(index).is_disabled:
                 continue
             if self._model.get_note_id(index) in nids:
                 continue
@@ -240,7 +294,7 @@ class Table:
         top = min(r.row() for r in self._selected()) - 1
         for row in range(top, -1, -1):
             index = self._model.index(row, 0)
-            if self._model.get_row(index).is_disabled:
+            if self._model.fetch_row(index).is_disabled:
                 continue
             if self._model.get_note_id(index) in nids:
                 continue
@@ -289,11 +343,16 @@ class Table:
 
     def _select_rows(self, rows: list[int]) -> None:
         selection = QItemSelection()
-        for row in rows:
+        # select runs of consecutive rows as a single range
+        start = 0
+        for idx, row in enumerate(rows):
+            if idx + 1 < len(rows) and rows[idx + 1] == row + 1:
+                continue
             selection.select(
-                self._model.index(row, 0),
+                self._model.index(rows[start], 0),
                 self._model.index(row, self._model.len_columns() - 1),
             )
+            start = idx + 1
         self._selection_model().select(
             selection, QItemSelectionModel.SelectionFlag.SelectCurrent
         )
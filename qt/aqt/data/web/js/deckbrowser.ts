@@ -1,10 +1,23 @@
 /* Copyright: Ankitects Pty Ltd and contributors
  * License: GNU AGPL, version 3 or later; http://www.gnu.org/licenses/agpl.html */
 
+/* eslint
+@typescript-eslint/no-unused-vars: "off",
+*/
+
 $(init);
 
 function init() {
-    $("tr.deck").draggable({
+    // rows drawn by updateDeckTree() have already been set up
+    setupDeckRows($("tr.deck:not(.ui-draggable)"));
+    $("tr.top-level-drag-row").droppable({
+        drop: handleDropEvent,
+        hoverClass: "drag-hover",
+    });
+}
+
+function setupDeckRows(rows: JQuery) {
+    rows.draggable({
         scroll: false,
 
         // can't use "helper: 'clone'" because of a bug in jQuery 1.5
@@ -14,11 +27,7 @@ function init() {
         delay: 200,
         opacity: 0.7,
     });
-    $("tr.deck").droppable({
-        drop: handleDropEvent,
-        hoverClass: "drag-hover",
-    });
-    $("tr.top-level-drag-row").droppable({
+    rows.droppable({
         drop: handleDropEvent,
         hoverClass: "drag-hover",
     });
@@ -30,3 +39,133 @@ function handleDropEvent(event, ui) {
 
     pycmd("drag:" + draggedDeckId + "," + ontoDeckId);
 }
+
+// [deck id, name, level, collapsed (null if no children), filtered, current,
+// new count, learn count, review count]
+type DeckRow = [
+    number,
+    string,
+    number,
+    boolean | null,
+    boolean,
+    boolean,
+    number,
+    number,
+    number,
+];
+
+// Bring the deck rows and stats in line with the provided ones, only
+// replacing rows that have changed. This also draws the rows when the page is
+// first loaded. Returns false if the page does not have the expected layout,
+// in which case it needs to be reloaded.
+function updateDeckTree(rows: DeckRow[], stats: string): boolean {
+    const anchor = document.querySelector("tr.top-level-drag-row");
+    const statsContainer = document.getElementById("deckbrowser-stats");
+    if (!anchor || !statsContainer) {
+        return false;
+    }
+
+    const existing = new Map<string, HTMLTableRowElement>();
+    document.querySelectorAll<HTMLTableRowElement>("tr.deck").forEach((row) => {
+        existing.set(row.id, row);
+    });
+
+    let previous: Element = anchor;
+    const added: HTMLTableRowElement[] = [];
+    for (const deck of rows) {
+        const signature = JSON.stringify(deck);
+        let row = existing.get(String(deck[0]));
+        existing.delete(String(deck[0]));
+        if (!row || row.dataset.signature !== signature) {
+            const newRow = renderDeckRow(deck);
+            newRow.dataset.signature = signature;
+            if (row) {
+                row.replaceWith(newRow);
+            }
+            row = newRow;
+            added.push(row);
+        }
+        if (previous.nextElementSibling !== row) {
+            previous.after(row);
+        }
+        previous = row;
+    }
+    for (const row of existing.values()) {
+        row.remove();
+    }
+    setupDeckRows($(added));
+
+    if (statsContainer.innerHTML !== stats) {
+        statsContainer.innerHTML = stats;
+    }
+    return true;
+}
+
+function renderDeckRow(deck: DeckRow): HTMLTableRowElement {
+    const [
+        id,
+        name,
+        level,
+        collapsed,
+        filtered,
+        current,
+        newCount,
+        learnCount,
+        reviewCount,
+    ] = deck;
+
+    const row = document.createElement("tr");
+    row.className = current ? "deck current" : "deck";
+    row.id = String(id);
+    row.setAttribute("onclick", `if(event.shiftKey) return pycmd("select:${id}")`);
+
+    const nameCell = row.insertCell();
+    nameCell.className = "decktd";
+    nameCell.colSpan = 5;
+    nameCell.append("\u00a0".repeat(6 * (level - 1)));
+    if (collapsed === null) {
+        const spacer = document.createElement("span");
+        spacer.className = "collapse";
+        nameCell.append(spacer);
+    } else {
+        const toggle = document.createElement("a");
+        toggle.className = "collapse";
+        toggle.href = "#";
+        toggle.setAttribute("onclick", `return pycmd("collapse:${id}")`);
+        toggle.textContent = collapsed ? "+" : "−";
+        nameCell.append(toggle);
+    }
+    const link = document.createElement("a");
+    link.className = filtered ? "deck filtered" : "deck";
+    link.href = "#";
+    link.setAttribute("onclick", `return pycmd('open:${id}')`);
+    link.textContent = name;
+    nameCell.append(link);
+
+    const counts: [number, string][] = [
+        [newCount, "new-count"],
+        [learnCount, "learn-count"],
+        [reviewCount, "review-count"],
+    ];
+    for (const [count, klass] of counts) {
+        const cell = row.insertCell();
+        cell.align = "end";
+        const span = document.createElement("span");
+        span.className = count ? klass : "zero-count";
+        span.textContent = String(count);
+        cell.append(span);
+    }
+
+    const optsCell = row.insertCell();
+    optsCell.align = "center";
+    optsCell.className = "opts";
+    const opts = document.createElement("a");
+    opts.setAttribute("onclick", `return pycmd("opts:${id}");`);
+    const gears = document.createElement("img");
+    gears.src = "/_anki/imgs/gears.svg";
+    gears.className = "gears";
+    opts.append(gears);
+    optsCell.append(opts);
+
+    return row;
+}
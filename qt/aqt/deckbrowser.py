@@ -3,7 +3,7 @@
 
 from __future__ import annotations
 
-import html
+import json
 from copy import deepcopy
 from dataclasses import dataclass
 from typing import Any
@@ -58,11 +58,6 @@ class DeckBrowserContent:
     stats: str
 
 
-@dataclass
-class RenderDeckNodeContext:
-    current_deck_id: DeckId
-
-
 class DeckBrowser:
     _render_data: RenderData
 
@@ -72,9 +67,16 @@ class DeckBrowser:
         self.bottom = BottomBar(mw, mw.bottomWeb)
         self.scrollPos = QPoint(0, 0)
         self._refresh_needed = False
+        # whether the webview holds a page that can be updated in place, and
+        # whether it was drawn with the scheduler upgrade message
+        self._page_loaded = False
+        self._page_upgrade_required = False
+        gui_hooks.theme_did_change.append(self._on_theme_did_change)
 
     def show(self) -> None:
         av_player.stop_and_clear_queue()
+        # another screen may have replaced the page
+        self._page_loaded = False
         self.web.set_bridge_command(self._linkHandler, self)
         # redraw top bar for theme change
         self.mw.toolbar.redraw()
@@ -99,6 +101,11 @@ class DeckBrowser:
 
         return self._refresh_needed
 
+    def _on_theme_did_change(self) -> None:
+        self._page_loaded = False
+        if self.mw.state == "deckBrowser":
+            self.refresh()
+
     # Event handlers
     ##########################################################################
 
@@ -151,7 +158,7 @@ class DeckBrowser:
 </table>
 
 <br>
-%(stats)s
+<div id=deckbrowser-stats>%(stats)s</div>
 </center>
 """
 
@@ -175,19 +182,57 @@ class DeckBrowser:
                 op=get_data,
                 success=success,
             ).run_in_background()
+        elif self._page_loaded:
+            # updating in place keeps the scroll position
+            self.__renderPage(None)
         else:
             self.web.evalWithCallback("window.pageYOffset", self.__renderPage)
 
     def __renderPage(self, offset: int | None) -> None:
+        """Update the rows of the existing page if possible, and otherwise
+        (re)load the whole page."""
         data = self._render_data
-        content = DeckBrowserContent(
-            tree=self._renderDeckTree(data.tree),
-            stats=self._renderStats(),
+        update = (
+            self._page_loaded
+            and data.sched_upgrade_required == self._page_upgrade_required
         )
-        gui_hooks.deck_browser_will_render_content(self, content)
+        content = DeckBrowserContent(tree="", stats=self._renderStats())
+        if not update or gui_hooks.deck_browser_will_render_content.count():
+            content.tree = tree = self._renderDeckTree(data.tree)
+            gui_hooks.deck_browser_will_render_content(self, content)
+            # an add-on that changes the tree's HTML needs the page reloaded
+            update = update and content.tree == tree
+        if update:
+            self._update_page(content)
+        else:
+            self._load_page(content, offset)
+        gui_hooks.deck_browser_did_render(self)
+
+    def _update_page(self, content: DeckBrowserContent) -> None:
+        """Send the visible rows to the page, which only replaces rows that
+        have changed."""
+
+        def on_done(updated: bool) -> None:
+            if not updated:
+                # page has an unexpected layout
+                self._page_loaded = False
+                self.refresh()
+
+        self.web.evalWithCallback(self._update_deck_tree_js(content), on_done)
+
+    def _update_deck_tree_js(self, content: DeckBrowserContent) -> str:
+        rows = json.dumps(self._deck_rows(self._render_data.tree))
+        stats = json.dumps(content.stats)
+        # safe to embed in a <script> tag
+        return f"updateDeckTree({rows}, {stats})".replace("</", "<\\/")
+
+    def _load_page(self, content: DeckBrowserContent, offset: int | None) -> None:
+        data = self._render_data
         self.web.stdHtml(
             self._v1_upgrade_message(data.sched_upgrade_required)
-            + self._body % content.__dict__,
+            + self._body % content.__dict__
+            # the deck rows are drawn by the same code that updates them later
+            + f"<script>{self._update_deck_tree_js(content)};</script>",
             css=["css/deckbrowser.css"],
             js=[
                 "js/vendor/jquery.min.js",
@@ -196,10 +241,11 @@ class DeckBrowser:
             ],
             context=self,
         )
+        self._page_loaded = True
+        self._page_upgrade_required = data.sched_upgrade_required
         self._drawButtons()
         if offset is not None:
             self._scrollToOffset(offset)
-        gui_hooks.deck_browser_did_render(self)
 
     def _scrollToOffset(self, offset: int) -> None:
         self.web.eval("window.scrollTo(0, %d, 'instant');" % offset)
@@ -210,6 +256,7 @@ class DeckBrowser:
         )
 
     def _renderDeckTree(self, top: DeckTreeNode) -> str:
+        "The table header. The deck rows are drawn by updateDeckTree()."
         buf = """
 <tr><th colspan=5 align=start>{}</th>
 <th class=count>{}</th>
@@ -222,83 +269,35 @@ class DeckBrowser:
             tr.decks_review_header(),
         )
         buf += self._topLevelDragRow()
-
-        ctx = RenderDeckNodeContext(current_deck_id=self._render_data.current_deck_id)
-
-        for child in top.children:
-            buf += self._render_deck_node(child, ctx)
-
         return buf
 
-    def _render_deck_node(self, node: DeckTreeNode, ctx: RenderDeckNodeContext) -> str:
-        if node.collapsed:
-            prefix = "+"
-        else:
-            prefix = "−"
-
-        def indent() -> str:
-            return "&nbsp;" * 6 * (node.level - 1)
-
-        if node.deck_id == ctx.current_deck_id:
-            klass = "deck current"
-        else:
-            klass = "deck"
-
-        buf = (
-            "<tr class='%s' id='%d' onclick='if(event.shiftKey) return pycmd(\"select:%d\")'>"
-            % (
-                klass,
-                node.deck_id,
-                node.deck_id,
-            )
-        )
-        # deck link
-        if node.children:
-            collapse = (
-                "<a class=collapse href=# onclick='return pycmd(\"collapse:%d\")'>%s</a>"
-                % (node.deck_id, prefix)
+    def _deck_rows(self, top: DeckTreeNode) -> list[list[Any]]:
+        """The visible decks in display order, in the compact form
+        rendered by updateDeckTree() in deckbrowser.ts."""
+        current_deck_id = self._render_data.current_deck_id
+        rows: list[list[Any]] = []
+
+        def add(node: DeckTreeNode) -> None:
+            rows.append(
+                [
+                    node.deck_id,
+                    node.name,
+                    node.level,
+                    node.collapsed if node.children else None,
+                    node.filtered,
+                    node.deck_id == current_deck_id,
+                    node.new_count,
+                    node.learn_count,
+                    node.review_count,
+                ]
             )
-        else:
-            collapse = "<span class=collapse></span>"
-        if node.filtered:
-            extraclass = "filtered"
-        else:
-            extraclass = ""
-        buf += """
-
-        <td class=decktd colspan=5>%s%s<a class="deck %s"
-        href=# onclick="return pycmd('open:%d')">%s</a></td>""" % (
-            indent(),
-            collapse,
-            extraclass,
-            node.deck_id,
-            html.escape(node.name),
-        )
-
-        # due counts
-        def nonzeroColour(cnt: int, klass: str) -> str:
-            if not cnt:
-                klass = "zero-count"
-            return f'<span class="{klass}">{cnt}</span>'
-
-        review = nonzeroColour(node.review_count, "review-count")
-        learn = nonzeroColour(node.learn_count, "learn-count")
+            if not node.collapsed:
+                for child in node.children:
+                    add(child)
 
-        buf += ("<td align=end>%s</td>" * 3) % (
-            nonzeroColour(node.new_count, "new-count"),
-            learn,
-            review,
-        )
-        # options
-        buf += (
-            "<td align=center class=opts><a onclick='return pycmd(\"opts:%d\");'>"
-            "<img src='/_anki/imgs/gears.svg' class=gears></a></td></tr>" % node.deck_id
-        )
-        # children
-        if not node.collapsed:
-            for child in node.children:
-                buf += self._render_deck_node(child, ctx)
-        return buf
+        for child in top.children:
+            add(child)
+        return rows
 
     def _topLevelDragRow(self) -> str:
         return "<tr class='top-level-drag-row'><td colspan='6'>&nbsp;</td></tr>"
@@ -34,13 +34,13 @@ from anki.collection import (
     OpChanges,
     UndoStatus,
 )
+from anki.dbproxy import BOUND_IDS, bind_ids
 from anki.decks import DeckDict, DeckId
 from anki.hooks import runHook
 from anki.notes import NoteId
 from anki.sound import AVTag, SoundOrVideoTag
 from anki.utils import (
     dev_mode,
-    ids2str,
     int_time,
     int_version,
     is_lin,
@@ -869,8 +869,7 @@ class AnkiQt(QMainWindow):
         if changes.mtime:
             self.toolbar.update_sync_status()
 
-        if changes.notetype:
-            self.col.models._clear_cache()
+        self.col._invalidate_caches(changes)
 
     def on_focus_did_change(
         self, new_focus: QWidget | None, _old: QWidget | None
@@ -1108,7 +1107,7 @@ title="{}" {}>{}</button>""".format(
         "Caller should ensure auth available."
 
         def on_collection_sync_finished() -> None:
-            self.col.models._clear_cache()
+            self.col._clear_caches()
             gui_hooks.sync_did_finish()
             self.reset()
 
@@ -1675,7 +1674,8 @@ title="{}" {}>{}</button>""".format(
                 f.write(b"#notetype column:2\n")
                 f.write(b"#nid\tmid\tfields\n")
             for id, mid, flds in col.db.execute(
-                f"select id, mid, flds from notes where id in {ids2str(nids)}"
+                f"select id, mid, flds from notes where id in {BOUND_IDS}",
+                bind_ids(nids),
             ):
                 fields = split_fields(flds)
                 f.write(("\t".join([str(id), str(mid)] + fields)).encode("utf8"))
@@ -407,7 +407,7 @@ class Reviewer:
     def _auto_advance_to_answer_if_enabled(self) -> None:
         self._clear_auto_advance_timers()
         if self.auto_advance_enabled:
-            conf = self.mw.col.decks.config_dict_for_deck_id(
+            conf = self.mw.col.decks.config_immutable_for_deck_id(
                 self.card.current_deck_id()
             )
             if conf["secondsToShowQuestion"]:
@@ -421,7 +421,9 @@ class Reviewer:
     def _on_show_answer_timeout(self) -> None:
         if self.card is None:
             return
-        conf = self.mw.col.decks.config_dict_for_deck_id(self.card.current_deck_id())
+        conf = self.mw.col.decks.config_immutable_for_deck_id(
+            self.card.current_deck_id()
+        )
         if conf["waitForAudio"] and av_player.current_player:
             return
         if (
@@ -486,7 +488,7 @@ class Reviewer:
     def _auto_advance_to_question_if_enabled(self) -> None:
         self._clear_auto_advance_timers()
         if self.auto_advance_enabled:
-            conf = self.mw.col.decks.config_dict_for_deck_id(
+            conf = self.mw.col.decks.config_immutable_for_deck_id(
                 self.card.current_deck_id()
             )
             if conf["secondsToShowAnswer"]:
@@ -500,7 +502,9 @@ class Reviewer:
     def _on_show_question_timeout(self) -> None:
         if self.card is None:
             return
-        conf = self.mw.col.decks.config_dict_for_deck_id(self.card.current_deck_id())
+        conf = self.mw.col.decks.config_immutable_for_deck_id(
+            self.card.current_deck_id()
+        )
         if conf["waitForAudio"] and av_player.current_player:
             return
         if (
@@ -861,7 +865,9 @@ timerStopped = false;
             self.mw.progress.single_shot(50, self._showEaseButtons)
             return
         middle = self._answerButtons()
-        conf = self.mw.col.decks.config_dict_for_deck_id(self.card.current_deck_id())
+        conf = self.mw.col.decks.config_immutable_for_deck_id(
+            self.card.current_deck_id()
+        )
         self.bottom.web.eval(
             f"showAnswer({json.dumps(middle)}, {json.dumps(conf['stopTimerOnAnswer'])});"
         )
@@ -37,11 +37,13 @@ pub(crate) fn write_python_interface(services: &[BackendService]) -> Result<()>
 /// Generates text like the following:
 ///
 /// def get_field_names_raw(self, message: bytes) -> bytes:
-///     return self._run_command(7, 16, message)
+///     return self._run_command(7, 16, message, "get_field_names")
 ///
 /// def get_field_names(self, ntid: int) -> Sequence[str]:
 ///     message = anki.notetypes_pb2.NotetypeId(ntid=ntid)
-///     raw_bytes = self._run_command(7, 16, message.SerializeToString())
+///     raw_bytes = self._run_command(
+///         7, 16, message.SerializeToString(), "get_field_names"
+///     )
 ///     output = anki.generic_pb2.StringList()
 ///     output.ParseFromString(raw_bytes)
 ///     return output.vals
@@ -57,7 +59,7 @@ fn render_method(service: &BackendService, method: &Method, out: &mut impl Write
     write!(
         out,
         r#"    def {method_name}_raw(self, message: bytes) -> bytes:
-        {comments}return self._run_command({service_idx}, {method_idx}, message)
+        {comments}return self._run_command({service_idx}, {method_idx}, message, "{method_name}")
 
 "#
     )
@@ -71,7 +73,9 @@ fn render_method(service: &BackendService, method: &Method, out: &mut impl Write
         out,
         r#"    def {method_name}({input_params}) -> {output_type}:
         {comments}{input_assign}
-        raw_bytes = self._run_command({service_idx}, {method_idx}, message.SerializeToString())
+        raw_bytes = self._run_command(
+            {service_idx}, {method_idx}, message.SerializeToString(), "{method_name}"
+        )
         output = {output_constructor}()
         output.ParseFromString(raw_bytes)
         return {output_msg_or_single_field}
@@ -252,7 +256,7 @@ import anki.ankihub_pb2
 import anki.github_pb2
 
 class RustBackendGenerated:
-    def _run_command(self, service: int, method: int, input: Any) -> bytes:
+    def _run_command(self, service: int, method: int, input: Any, name: str) -> bytes:
         raise Exception("not implemented")
 
 "#,
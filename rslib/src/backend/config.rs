@@ -4,6 +4,7 @@
 use anki_proto::config::config_key::Bool as BoolKeyProto;
 use anki_proto::config::config_key::String as StringKeyProto;
 use anki_proto::generic;
+use serde_json::Map;
 use serde_json::Value;
 
 use crate::config::BoolKey;
@@ -80,6 +81,40 @@ impl crate::services::ConfigService for Collection {
         self.transact_no_undo(|col| col.set_config(input.key.as_str(), &val).map(|_| ()))
     }
 
+    fn get_configs_json(&mut self, input: generic::StringList) -> Result<generic::Json> {
+        let vals: Map<String, Value> = input
+            .vals
+            .into_iter()
+            .filter_map(|key| {
+                // not get_config_optional(), which would skip stored nulls
+                let val = self.storage.get_config_value::<Value>(&key);
+                val.ok().flatten().map(|val| (key, val))
+            })
+            .collect();
+        serde_json::to_vec(&vals)
+            .map_err(Into::into)
+            .map(Into::into)
+    }
+
+    fn set_configs_json(
+        &mut self,
+        input: anki_proto::config::SetConfigsJsonRequest,
+    ) -> Result<anki_proto::collection::OpChanges> {
+        let vals: Map<String, Value> = serde_json::from_slice(&input.values_json)?;
+        let op = if input.undoable {
+            Op::UpdateConfig
+        } else {
+            Op::SkipUndo
+        };
+        self.transact(op, |col| {
+            for (key, val) in &vals {
+                col.set_config(key.as_str(), val)?;
+            }
+            Ok(())
+        })
+        .map(Into::into)
+    }
+
     fn remove_config(
         &mut self,
         input: generic::String,
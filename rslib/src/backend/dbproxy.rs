@@ -1,6 +1,8 @@
 // Copyright: Ankitects Pty Ltd and contributors
 // License: GNU AGPL, version 3 or later; http://www.gnu.org/licenses/agpl.html
 
+use std::collections::HashMap;
+
 use anki_proto::ankidroid::sql_value::Data;
 use anki_proto::ankidroid::DbResponse;
 use anki_proto::ankidroid::DbResult as ProtoDbResult;
@@ -19,6 +21,7 @@ use crate::ankidroid::db::next_sequence_number;
 use crate::ankidroid::db::trim_and_cache_remaining;
 use crate::prelude::*;
 use crate::storage::SqliteStorage;
+use crate::storage::STATEMENT_CACHE_CAPACITY;
 
 #[derive(Deserialize)]
 #[serde(tag = "kind", rename_all = "lowercase")]
@@ -35,15 +38,211 @@ pub(super) enum DbRequest {
         sql: String,
         args: Vec<Vec<SqlValue>>,
     },
+    Open {
+        sql: String,
+        args: Vec<SqlValue>,
+    },
+    Fetch {
+        cursor: u32,
+        count: usize,
+    },
+    Close {
+        cursor: u32,
+    },
+    Prepare {
+        sql: String,
+    },
+    QueryPrepared {
+        statement: u32,
+        args: Vec<SqlValue>,
+        first_row_only: bool,
+    },
+    Finalize {
+        statement: u32,
+    },
+    /// Run multiple requests in one round trip, returning a list of their
+    /// results.
+    Batch {
+        requests: Vec<DbRequest>,
+    },
+}
+
+#[derive(Deserialize)]
+pub(super) struct DbColumnsRequest {
+    sql: String,
+    args: Vec<SqlValue>,
 }
 
 #[derive(Serialize)]
 #[serde(untagged)]
 pub(super) enum DbResult {
     Rows(Vec<Vec<SqlValue>>),
+    Id(u32),
+    Batch(Vec<DbResult>),
     None,
 }
 
+/// The most cursors that can be open at once. Opening another one closes the
+/// oldest, so cursors that are never closed by the frontend can't accumulate.
+const MAX_CURSORS: usize = 16;
+
+/// Cursors and prepared statements opened by the frontend.
+///
+/// A prepared statement is a handle to its SQL, which is run through the
+/// connection's statement cache. The cache is grown by one slot for every open
+/// handle and cursor, so that holding many of them doesn't cause statements to
+/// be evicted and re-parsed.
+#[derive(Debug, Default)]
+pub(crate) struct DbProxyState {
+    next_id: u32,
+    /// Oldest first.
+    cursors: Vec<(u32, DbCursor)>,
+    statements: HashMap<u32, String>,
+}
+
+/// A query whose rows are handed out in batches.
+///
+/// A rusqlite statement can't outlive a single request, so instead of holding
+/// one open, each fetch re-runs the query with a LIMIT and OFFSET, and only
+/// the requested rows are ever materialized. SQLite skips the preceding rows
+/// without building them, but still has to step over them, so a fetch costs
+/// time proportional to the cursor's position. Changes made to the collection
+/// between fetches are visible to later fetches, so modifying the rows being
+/// iterated may cause rows to be skipped or repeated.
+#[derive(Debug)]
+struct DbCursor {
+    sql: String,
+    args: Vec<SqlValue>,
+    offset: usize,
+    exhausted: bool,
+}
+
+impl DbCursor {
+    fn new(storage: &SqliteStorage, sql: &str, args: Vec<SqlValue>) -> Result<Self> {
+        let sql = format!(
+            "select * from ({}) limit ?{} offset ?{}",
+            sql.trim_end().trim_end_matches(';'),
+            args.len() + 1,
+            args.len() + 2
+        );
+        // report errors up front, and warm the statement cache
+        storage.db.prepare_cached(&sql)?;
+        Ok(Self {
+            sql,
+            args,
+            offset: 0,
+            exhausted: false,
+        })
+    }
+
+    fn fetch(&mut self, storage: &SqliteStorage, count: usize) -> Result<Vec<Vec<SqlValue>>> {
+        if self.exhausted {
+            return Ok(vec![]);
+        }
+        let limit = SqlValue::Int(count as i64);
+        let offset = SqlValue::Int(self.offset as i64);
+        let mut stmt = storage.db.prepare_cached(&self.sql)?;
+        let columns = stmt.column_count();
+        let rows = stmt
+            .query_map(
+                params_from_iter(self.args.iter().chain([&limit, &offset])),
+                |row| (0..columns).map(|i| row.get(i)).collect(),
+            )?
+            .collect::<std::result::Result<Vec<Vec<SqlValue>>, _>>()?;
+        self.offset += rows.len();
+        self.exhausted = rows.len() < count;
+        Ok(rows)
+    }
+}
+
+impl DbProxyState {
+    fn next_id(&mut self) -> u32 {
+        self.next_id = self.next_id.wrapping_add(1);
+        self.next_id
+    }
+
+    fn open_cursor(
+        &mut self,
+        storage: &SqliteStorage,
+        sql: &str,
+        args: Vec<SqlValue>,
+    ) -> Result<u32> {
+        self.reserve_statement(storage);
+        let cursor = DbCursor::new(storage, sql, args)?;
+        if self.cursors.len() >= MAX_CURSORS {
+            self.cursors.remove(0);
+        }
+        let id = self.next_id();
+        self.cursors.push((id, cursor));
+        self.release_statement(storage);
+        Ok(id)
+    }
+
+    fn fetch(
+        &mut self,
+        storage: &SqliteStorage,
+        cursor: u32,
+        count: usize,
+    ) -> Result<Vec<Vec<SqlValue>>> {
+        let idx = self
+            .cursors
+            .iter()
+            .position(|(id, _)| *id == cursor)
+            .or_invalid("unknown db cursor")?;
+        let batch = self.cursors[idx].1.fetch(storage, count.max(1))?;
+        if batch.is_empty() {
+            self.cursors.remove(idx);
+            self.release_statement(storage);
+        }
+        Ok(batch)
+    }
+
+    fn close_cursor(&mut self, storage: &SqliteStorage, cursor: u32) {
+        self.cursors.retain(|(id, _)| *id != cursor);
+        self.release_statement(storage);
+    }
+
+    fn prepare(&mut self, storage: &SqliteStorage, sql: String) -> Result<u32> {
+        self.reserve_statement(storage);
+        // report syntax errors up front, and warm the statement cache
+        storage.db.prepare_cached(&sql)?;
+        let id = self.next_id();
+        self.statements.insert(id, sql);
+        Ok(id)
+    }
+
+    fn statement_sql(&self, statement: u32) -> Result<String> {
+        self.statements
+            .get(&statement)
+            .cloned()
+            .or_invalid("unknown db statement")
+    }
+
+    fn finalize(&mut self, storage: &SqliteStorage, statement: u32) {
+        self.statements.remove(&statement);
+        self.release_statement(storage);
+    }
+
+    fn statement_cache_capacity(&self) -> usize {
+        STATEMENT_CACHE_CAPACITY + self.statements.len() + self.cursors.len()
+    }
+
+    /// Make room in the statement cache for a statement that is about to be
+    /// added, so it doesn't evict one that belongs to another handle.
+    fn reserve_statement(&self, storage: &SqliteStorage) {
+        storage
+            .db
+            .set_prepared_statement_cache_capacity(self.statement_cache_capacity() + 1);
+    }
+
+    /// Size the statement cache for the handles and cursors that are open.
+    fn release_statement(&self, storage: &SqliteStorage) {
+        storage
+            .db
+            .set_prepared_statement_cache_capacity(self.statement_cache_capacity());
+    }
+}
+
 #[derive(Serialize, Deserialize, Debug)]
 #[serde(untagged)]
 pub(crate) enum SqlValue {
@@ -121,19 +320,16 @@ pub(crate) fn db_command_bytes(col: &mut Collection, input: &[u8]) -> Result<Vec
 
 pub(super) fn db_command_bytes_inner(col: &mut Collection, input: &[u8]) -> Result<DbResult> {
     let req: DbRequest = serde_json::from_slice(input)?;
+    run_db_request(col, req)
+}
+
+fn run_db_request(col: &mut Collection, req: DbRequest) -> Result<DbResult> {
     let resp = match req {
         DbRequest::Query {
             sql,
             args,
             first_row_only,
-        } => {
-            update_state_after_modification(col, &sql);
-            if first_row_only {
-                db_query_row(&col.storage, &sql, &args)?
-            } else {
-                db_query(&col.storage, &sql, &args)?
-            }
-        }
+        } => run_query(col, &sql, &args, first_row_only)?,
         DbRequest::Begin => {
             col.storage.begin_trx()?;
             DbResult::None
@@ -155,10 +351,177 @@ pub(super) fn db_command_bytes_inner(col: &mut Collection, input: &[u8]) -> Resu
             update_state_after_modification(col, &sql);
             db_execute_many(&col.storage, &sql, &args)?
         }
+        DbRequest::Open { sql, args } => {
+            let id = col.state.db_proxy.open_cursor(&col.storage, &sql, args)?;
+            DbResult::Id(id)
+        }
+        DbRequest::Fetch { cursor, count } => {
+            DbResult::Rows(col.state.db_proxy.fetch(&col.storage, cursor, count)?)
+        }
+        DbRequest::Close { cursor } => {
+            col.state.db_proxy.close_cursor(&col.storage, cursor);
+            DbResult::None
+        }
+        DbRequest::Prepare { sql } => DbResult::Id(col.state.db_proxy.prepare(&col.storage, sql)?),
+        DbRequest::QueryPrepared {
+            statement,
+            args,
+            first_row_only,
+        } => {
+            let sql = col.state.db_proxy.statement_sql(statement)?;
+            run_query(col, &sql, &args, first_row_only)?
+        }
+        DbRequest::Finalize { statement } => {
+            col.state.db_proxy.finalize(&col.storage, statement);
+            DbResult::None
+        }
+        DbRequest::Batch { requests } => DbResult::Batch(
+            requests
+                .into_iter()
+                .map(|req| run_db_request(col, req))
+                .collect::<Result<_>>()?,
+        ),
     };
     Ok(resp)
 }
 
+fn run_query(
+    col: &mut Collection,
+    sql: &str,
+    args: &[SqlValue],
+    first_row_only: bool,
+) -> Result<DbResult> {
+    update_state_after_modification(col, sql);
+    if first_row_only {
+        db_query_row(&col.storage, sql, args)
+    } else {
+        db_query(&col.storage, sql, args)
+    }
+}
+
+/// Run a query, and return its result in a packed columnar format, so that
+/// numeric columns can be viewed as arrays by the frontend without creating
+/// an object for every value. All integers are little-endian, and every
+/// section starts on an 8 byte boundary:
+///
+/// - u64 column count, u64 row count
+/// - for each column, a u64 [ColumnKind], followed by:
+///   - Int: an i64 per row
+///   - Double: an f64 per row; NULLs are stored as NaN
+///   - Text/Blob: a u8 per row that is 1 if the value is NULL, then row count +
+///     1 u64 offsets into the data that follows
+pub(crate) fn db_columns_bytes(col: &mut Collection, input: &[u8]) -> Result<Vec<u8>> {
+    let req: DbColumnsRequest = serde_json::from_slice(input)?;
+    update_state_after_modification(col, &req.sql);
+    let mut stmt = col.storage.db.prepare_cached(&req.sql)?;
+    let mut columns: Vec<Vec<SqlValue>> = (0..stmt.column_count()).map(|_| vec![]).collect();
+    let mut rows = stmt.query(params_from_iter(&req.args))?;
+    while let Some(row) = rows.next()? {
+        for (idx, column) in columns.iter_mut().enumerate() {
+            column.push(row.get(idx)?);
+        }
+    }
+    Ok(pack_columns(&columns))
+}
+
+#[derive(Debug, Clone, Copy, PartialEq, Eq, PartialOrd, Ord)]
+enum ColumnKind {
+    Int = 0,
+    Double = 1,
+    Text = 2,
+    Blob = 3,
+}
+
+impl ColumnKind {
+    /// The narrowest kind that can represent every value in the column.
+    /// Integer columns with NULLs are widened to doubles, and numbers in
+    /// columns that also contain text are converted to strings.
+    fn for_values(values: &[SqlValue]) -> Self {
+        let mut kind = ColumnKind::Int;
+        let mut saw_null = false;
+        for value in values {
+            kind = kind.max(match value {
+                SqlValue::Null => {
+                    saw_null = true;
+                    continue;
+                }
+                SqlValue::Int(_) => ColumnKind::Int,
+                SqlValue::Double(_) => ColumnKind::Double,
+                SqlValue::String(_) => ColumnKind::Text,
+                SqlValue::Blob(_) => ColumnKind::Blob,
+            });
+        }
+        if kind == ColumnKind::Int && saw_null {
+            ColumnKind::Double
+        } else {
+            kind
+        }
+    }
+}
+
+fn pack_columns(columns: &[Vec<SqlValue>]) -> Vec<u8> {
+    let row_count = columns.first().map(Vec::len).unwrap_or_default();
+    let mut out = Vec::new();
+    out.extend_from_slice(&(columns.len() as u64).to_le_bytes());
+    out.extend_from_slice(&(row_count as u64).to_le_bytes());
+    for column in columns {
+        pack_column(column, &mut out);
+    }
+    out
+}
+
+fn pack_column(values: &[SqlValue], out: &mut Vec<u8>) {
+    let kind = ColumnKind::for_values(values);
+    out.extend_from_slice(&(kind as u64).to_le_bytes());
+    match kind {
+        ColumnKind::Int => {
+            for value in values {
+                let num = match value {
+                    SqlValue::Int(num) => *num,
+                    _ => 0,
+                };
+                out.extend_from_slice(&num.to_le_bytes());
+            }
+        }
+        ColumnKind::Double => {
+            for value in values {
+                let num = match value {
+                    SqlValue::Int(num) => *num as f64,
+                    SqlValue::Double(num) => *num,
+                    _ => f64::NAN,
+                };
+                out.extend_from_slice(&num.to_le_bytes());
+            }
+        }
+        ColumnKind::Text | ColumnKind::Blob => {
+            let mut offsets = Vec::with_capacity(values.len() + 1);
+            let mut data = Vec::new();
+            offsets.push(0u64);
+            for value in values {
+                out.push(matches!(value, SqlValue::Null) as u8);
+                match value {
+                    SqlValue::Null => {}
+                    SqlValue::String(text) => data.extend_from_slice(text.as_bytes()),
+                    SqlValue::Blob(blob) => data.extend_from_slice(blob),
+                    SqlValue::Int(num) => data.extend_from_slice(num.to_string().as_bytes()),
+                    SqlValue::Double(num) => data.extend_from_slice(num.to_string().as_bytes()),
+                }
+                offsets.push(data.len() as u64);
+            }
+            pad_to_word(out);
+            for offset in offsets {
+                out.extend_from_slice(&offset.to_le_bytes());
+            }
+            out.extend_from_slice(&data);
+            pad_to_word(out);
+        }
+    }
+}
+
+fn pad_to_word(out: &mut Vec<u8>) {
+    out.resize(out.len().next_multiple_of(8), 0);
+}
+
 fn update_state_after_modification(col: &mut Collection, sql: &str) {
     if !is_dql(sql) {
         // println!("clearing undo+study due to {}", sql);
@@ -180,7 +543,7 @@ fn is_dql(sql: &str) -> bool {
 pub(crate) fn db_command_proto(col: &mut Collection, input: &[u8]) -> Result<DbResponse> {
     let result = db_command_bytes_inner(col, input)?;
     let proto_resp = match result {
-        DbResult::None => ProtoDbResult { rows: Vec::new() },
+        DbResult::None | DbResult::Id(_) | DbResult::Batch(_) => ProtoDbResult { rows: Vec::new() },
         DbResult::Rows(rows) => rows_to_proto(&rows),
     };
     let trimmed = trim_and_cache_remaining(col, proto_resp, next_sequence_number());
@@ -242,3 +605,84 @@ pub(super) fn db_execute_many(
 
     Ok(DbResult::None)
 }
+
+#[cfg(test)]
+mod tests {
+    use serde_json::json;
+    use serde_json::Value;
+
+    use super::*;
+
+    fn command(col: &mut Collection, req: Value) -> Result<Value> {
+        let out = db_command_bytes(col, req.to_string().as_bytes())?;
+        Ok(serde_json::from_slice(&out)?)
+    }
+
+    #[test]
+    fn cursors_fetch_in_batches() -> Result<()> {
+        let mut col = Collection::new();
+        let sql = "select column1 from (values (1), (2), (3), (4), (5)) where column1 > ?";
+        let cursor = command(&mut col, json!({"kind": "open", "sql": sql, "args": [1]}))?;
+        let fetch = json!({"kind": "fetch", "cursor": cursor, "count": 3});
+        assert_eq!(command(&mut col, fetch.clone())?, json!([[2], [3], [4]]));
+        assert_eq!(command(&mut col, fetch.clone())?, json!([[5]]));
+        assert_eq!(command(&mut col, fetch.clone())?, json!([]));
+        // exhausted cursors are closed
+        assert!(command(&mut col, fetch).is_err());
+        Ok(())
+    }
+
+    #[test]
+    fn oldest_cursor_is_closed_when_too_many_are_open() -> Result<()> {
+        let mut col = Collection::new();
+        let open = json!({"kind": "open", "sql": "select 1", "args": []});
+        let first = command(&mut col, open.clone())?;
+        let mut last = first.clone();
+        for _ in 0..MAX_CURSORS {
+            last = command(&mut col, open.clone())?;
+        }
+        assert_eq!(col.state.db_proxy.cursors.len(), MAX_CURSORS);
+        let fetch = |cursor| json!({"kind": "fetch", "cursor": cursor, "count": 10});
+        assert!(command(&mut col, fetch(first)).is_err());
+        assert_eq!(command(&mut col, fetch(last))?, json!([[1]]));
+        Ok(())
+    }
+
+    #[test]
+    fn statements_stay_usable_when_many_are_prepared() -> Result<()> {
+        let mut col = Collection::new();
+        let prepare = |sql: String| json!({"kind": "prepare", "sql": sql});
+        let query = |statement: &Value| {
+            json!({
+                "kind": "queryprepared",
+                "statement": statement,
+                "args": [],
+                "first_row_only": false
+            })
+        };
+        let first = command(&mut col, prepare("select 0".into()))?;
+        let count = STATEMENT_CACHE_CAPACITY + 10;
+        let mut handles = vec![];
+        for i in 1..=count {
+            handles.push(command(&mut col, prepare(format!("select {i}")))?);
+            // unrelated queries go through the same cache
+            let sql = format!("select {i} + 1");
+            command(
+                &mut col,
+                json!({"kind": "query", "sql": sql, "args": [], "first_row_only": true}),
+            )?;
+        }
+        assert_eq!(command(&mut col, query(&first))?, json!([[0]]));
+        assert_eq!(
+            command(&mut col, query(&handles[count - 1]))?,
+            json!([[count]])
+        );
+        for handle in handles {
+            command(&mut col, json!({"kind": "finalize", "statement": handle}))?;
+        }
+        assert_eq!(command(&mut col, query(&first))?, json!([[0]]));
+        command(&mut col, json!({"kind": "finalize", "statement": first}))?;
+        assert!(command(&mut col, query(&first)).is_err());
+        Ok(())
+    }
+}
@@ -30,6 +30,7 @@ use reqwest::Client;
 use tokio::runtime;
 use tokio::runtime::Runtime;
 
+use crate::backend::dbproxy::db_columns_bytes;
 use crate::backend::dbproxy::db_command_bytes;
 use crate::backend::sync::SyncState;
 use crate::prelude::*;
@@ -103,12 +104,21 @@ impl Backend {
     }
 
     pub fn run_db_command_bytes(&self, input: &[u8]) -> result::Result<Vec<u8>, Vec<u8>> {
-        self.db_command(input).map_err(|err| {
-            let backend_err = err.into_protobuf(&self.tr);
-            let mut bytes = Vec::new();
-            backend_err.encode(&mut bytes).unwrap();
-            bytes
-        })
+        self.db_command(input).map_err(|err| self.encode_db_error(err))
+    }
+
+    /// Like [Backend::run_db_command_bytes], but the query result is returned
+    /// in the packed columnar format described in [db_columns_bytes].
+    pub fn run_db_columns_bytes(&self, input: &[u8]) -> result::Result<Vec<u8>, Vec<u8>> {
+        self.with_col(|col| db_columns_bytes(col, input))
+            .map_err(|err| self.encode_db_error(err))
+    }
+
+    fn encode_db_error(&self, err: AnkiError) -> Vec<u8> {
+        let backend_err = err.into_protobuf(&self.tr);
+        let mut bytes = Vec::new();
+        backend_err.encode(&mut bytes).unwrap();
+        bytes
     }
 
     /// If collection is open, run the provided closure while holding
@@ -284,6 +284,28 @@ impl Collection {
         RowContext::new(self, id, notes_mode, card_render_required(&columns))?.browser_row(&columns)
     }
 
+    /// Like [Collection::browser_row_for_id], but for multiple ids, returning
+    /// a result for each row. Fails only if the active columns are not set.
+    pub fn browser_rows_for_ids(
+        &mut self,
+        ids: &[i64],
+    ) -> Result<Vec<Result<anki_proto::search::BrowserRow>>> {
+        let notes_mode = self.get_config_bool(BoolKey::BrowserTableShowNotesMode);
+        let columns = Arc::clone(
+            self.state
+                .active_browser_columns
+                .as_ref()
+                .or_invalid("Active browser columns not set.")?,
+        );
+        let with_card_render = card_render_required(&columns);
+        Ok(ids
+            .iter()
+            .map(|&id| {
+                RowContext::new(self, id, notes_mode, with_card_render)?.browser_row(&columns)
+            })
+            .collect())
+    }
+
     fn get_note_maybe_with_fields(&self, id: NoteId, _with_fields: bool) -> Result<Note> {
         // todo: After note.sort_field has been modified so it can be displayed in the
         // browser, we can update note_field_str() and only load the note with
@@ -29,6 +29,16 @@ impl crate::services::CardsService for Collection {
             .map(Into::into)
     }
 
+    fn get_cards(
+        &mut self,
+        input: anki_proto::cards::CardIds,
+    ) -> error::Result<anki_proto::cards::Cards> {
+        let cards = self.all_cards_for_ids(&to_card_ids(input.cids), true)?;
+        Ok(anki_proto::cards::Cards {
+            cards: cards.into_iter().map(Into::into).collect(),
+        })
+    }
+
     fn update_cards(
         &mut self,
         input: anki_proto::cards::UpdateCardsRequest,
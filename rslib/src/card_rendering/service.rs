@@ -9,6 +9,7 @@ use crate::card_rendering::extract_av_tags;
 use crate::card_rendering::strip_av_tags;
 use crate::cloze::extract_cloze_for_typing;
 use crate::collection::Collection;
+use crate::error::AnkiError;
 use crate::error::OrInvalid;
 use crate::error::Result;
 use crate::latex::extract_latex;
@@ -41,6 +42,40 @@ impl crate::services::CardRenderingService for Collection {
         })
     }
 
+    fn extract_av_tags_from_texts(
+        &mut self,
+        input: anki_proto::card_rendering::ExtractAvTagsFromTextsRequest,
+    ) -> Result<anki_proto::card_rendering::ExtractAvTagsFromTextsResponse> {
+        let results = input
+            .texts
+            .into_iter()
+            .map(|text| {
+                let out = extract_av_tags(text, input.question_side, &self.tr);
+                anki_proto::card_rendering::ExtractAvTagsResponse {
+                    text: out.0,
+                    av_tags: out.1,
+                }
+            })
+            .collect();
+        Ok(anki_proto::card_rendering::ExtractAvTagsFromTextsResponse { results })
+    }
+
+    fn strip_html_texts(
+        &mut self,
+        input: anki_proto::card_rendering::StripHtmlTextsRequest,
+    ) -> Result<generic::StringList> {
+        let mode = input.mode;
+        let vals = input
+            .texts
+            .into_iter()
+            .map(|text| {
+                strip_html_proto(anki_proto::card_rendering::StripHtmlRequest { text, mode })
+                    .map(|stripped| stripped.val)
+            })
+            .collect::<Result<_>>()?;
+        Ok(generic::StringList { vals })
+    }
+
     fn extract_latex(
         &mut self,
         input: anki_proto::card_rendering::ExtractLatexRequest,
@@ -94,6 +129,38 @@ impl crate::services::CardRenderingService for Collection {
             .map(Into::into)
     }
 
+    fn render_existing_cards(
+        &mut self,
+        input: anki_proto::card_rendering::RenderExistingCardsRequest,
+    ) -> Result<anki_proto::card_rendering::RenderExistingCardsResponse> {
+        let mut cards = Vec::with_capacity(input.card_ids.len());
+        for card_id in input.card_ids {
+            // like get_notes(), skip ids that don't exist
+            let Some(card) = self.storage.get_card(CardId(card_id))? else {
+                continue;
+            };
+            let Some(note) = self.storage.get_note(card.note_id)? else {
+                continue;
+            };
+            let (rendered, error) =
+                match self.render_existing_card_of_note(&card, &note, input.browser, true) {
+                    Ok(output) => (Some(output.into()), String::new()),
+                    Err(err @ AnkiError::TemplateError { .. }) => (None, err.message(&self.tr)),
+                    Err(err) => return Err(err),
+                };
+            cards.push(
+                anki_proto::card_rendering::render_existing_cards_response::Card {
+                    card_id,
+                    note_id: note.id.0,
+                    notetype_id: note.notetype_id.0,
+                    rendered,
+                    error,
+                },
+            );
+        }
+        Ok(anki_proto::card_rendering::RenderExistingCardsResponse { cards })
+    }
+
     fn render_uncommitted_card(
         &mut self,
         input: anki_proto::card_rendering::RenderUncommittedCardRequest,
@@ -17,6 +17,7 @@ use std::sync::Mutex;
 use anki_i18n::I18n;
 use anki_io::create_dir_all;
 
+use crate::backend::dbproxy::DbProxyState;
 use crate::browser_table;
 use crate::decks::Deck;
 use crate::decks::DeckId;
@@ -134,6 +135,8 @@ pub struct CollectionState {
     /// True if legacy Python code has executed SQL that has modified the
     /// database, requiring modification time to be bumped.
     pub(crate) modified_by_dbproxy: bool,
+    /// Cursors and prepared statements opened by DBProxy.
+    pub(crate) db_proxy: DbProxyState,
     /// The modification time at the last backup, so we don't create multiple
     /// identical backups.
     pub(crate) last_backup_modified: Option<TimestampMillis>,
@@ -41,6 +41,12 @@ impl AnkiError {
 
 impl From<Error> for AnkiError {
     fn from(err: Error) -> Self {
+        if let Error::SqliteFailure(error, _) = &err {
+            // a progress handler asked for the statement to be stopped
+            if error.code == rusqlite::ErrorCode::OperationInterrupted {
+                return AnkiError::Interrupted;
+            }
+        }
         if let Error::SqliteFailure(error, Some(reason)) = &err {
             if error.code == rusqlite::ErrorCode::DatabaseBusy {
                 return AnkiError::DbError {
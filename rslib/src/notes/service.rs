@@ -1,5 +1,9 @@
 // Copyright: Ankitects Pty Ltd and contributors
 // License: GNU AGPL, version 3 or later; http://www.gnu.org/licenses/agpl.html
+use std::collections::HashMap;
+
+use itertools::Itertools;
+
 use crate::cloze::cloze_number_in_fields;
 use crate::collection::Collection;
 use crate::decks::DeckId;
@@ -97,6 +101,27 @@ impl crate::services::NotesService for Collection {
             .map(Into::into)
     }
 
+    fn get_notes(
+        &mut self,
+        input: anki_proto::notes::NoteIds,
+    ) -> error::Result<anki_proto::notes::Notes> {
+        let nids = input.note_ids.into_newtype(NoteId);
+        let unique_nids: Vec<_> = nids.iter().copied().unique().collect();
+        let notes: HashMap<NoteId, Note> = self
+            .storage
+            .with_ids_in_searched_notes_table(&unique_nids, || self.storage.all_searched_notes())?
+            .into_iter()
+            .map(|note| (note.id, note))
+            .collect();
+        Ok(anki_proto::notes::Notes {
+            notes: nids
+                .iter()
+                .filter_map(|nid| notes.get(nid).cloned())
+                .map(Into::into)
+                .collect(),
+        })
+    }
+
     fn remove_notes(
         &mut self,
         input: anki_proto::notes::RemoveNotesRequest,
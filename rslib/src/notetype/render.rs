@@ -54,6 +54,17 @@ impl Collection {
             .storage
             .get_note(card.note_id)?
             .or_invalid("no such note")?;
+        self.render_existing_card_of_note(&card, &note, browser, partial_render)
+    }
+
+    /// Render an existing card when its note has already been loaded.
+    pub(crate) fn render_existing_card_of_note(
+        &mut self,
+        card: &Card,
+        note: &Note,
+        browser: bool,
+        partial_render: bool,
+    ) -> Result<RenderCardOutput> {
         let nt = self
             .get_notetype(note.notetype_id)?
             .or_invalid("no such notetype")?;
@@ -63,7 +74,7 @@ impl Collection {
         }
         .or_invalid("missing template")?;
 
-        self.render_card(&note, &card, &nt, template, browser, partial_render)
+        self.render_card(note, card, &nt, template, browser, partial_render)
     }
 
     /// Render a card that may not yet have been added.
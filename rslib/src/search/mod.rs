@@ -31,6 +31,10 @@ use crate::card::CardType;
 use crate::prelude::*;
 use crate::scheduler::timing::SchedTimingToday;
 
+/// Number of SQLite VM instructions between checks of the abort flag while
+/// a search is running.
+const SEARCH_ABORT_CHECK_INTERVAL: i32 = 10_000;
+
 #[derive(Debug, PartialEq, Eq, Clone, Copy)]
 pub enum ReturnItemType {
     Cards,
@@ -175,10 +179,46 @@ impl Collection {
     {
         self.search(search, SortMode::NoOrder)
     }
+
+    /// Like [Collection::search_cards], but if `limit` is non-zero, only the
+    /// first `limit` cards are returned.
+    pub fn search_cards_limited<N>(
+        &mut self,
+        search: N,
+        mode: SortMode,
+        limit: u32,
+    ) -> Result<Vec<CardId>>
+    where
+        N: TryIntoSearch,
+    {
+        self.search_with_limit(search, mode, limit)
+    }
+
+    /// Like [Collection::search_notes], but if `limit` is non-zero, only the
+    /// first `limit` notes are returned.
+    pub fn search_notes_limited<N>(
+        &mut self,
+        search: N,
+        mode: SortMode,
+        limit: u32,
+    ) -> Result<Vec<NoteId>>
+    where
+        N: TryIntoSearch,
+    {
+        self.search_with_limit(search, mode, limit)
+    }
 }
 
 impl Collection {
     fn search<T, N>(&mut self, search: N, mode: SortMode) -> Result<Vec<T>>
+    where
+        N: TryIntoSearch,
+        T: FromSql + AsReturnItemType,
+    {
+        self.search_with_limit(search, mode, 0)
+    }
+
+    fn search_with_limit<T, N>(&mut self, search: N, mode: SortMode, limit: u32) -> Result<Vec<T>>
     where
         N: TryIntoSearch,
         T: FromSql + AsReturnItemType,
@@ -189,13 +229,34 @@ impl Collection {
 
         let (mut sql, args) = writer.build_query(&top_node, mode.required_table())?;
         self.add_order(&mut sql, item_type, mode)?;
+        if limit > 0 {
+            sql.push_str(&format!(" limit {limit}"));
+        }
 
-        let mut stmt = self.storage.db.prepare(&sql)?;
-        let ids: Vec<_> = stmt
-            .query_map(params_from_iter(args.iter()), |row| row.get(0))?
-            .collect::<std::result::Result<_, _>>()?;
+        self.query_ids_abortable(&sql, &args)
+    }
 
-        Ok(ids)
+    /// Run a search query, returning [AnkiError::Interrupted] if another
+    /// thread calls set_wants_abort() before it completes.
+    fn query_ids_abortable<T: FromSql>(&self, sql: &str, args: &[String]) -> Result<Vec<T>> {
+        let progress = self.state.progress.clone();
+        progress.lock().unwrap().want_abort = false;
+        let db = &self.storage.db;
+        db.progress_handler(
+            SEARCH_ABORT_CHECK_INTERVAL,
+            Some(move || progress.lock().unwrap().want_abort),
+        );
+        let ids = db.prepare(sql).and_then(|mut stmt| {
+            stmt.query_map(params_from_iter(args.iter()), |row| row.get(0))?
+                .collect::<std::result::Result<Vec<_>, _>>()
+        });
+        db.progress_handler(0, None::<fn() -> bool>);
+
+        let ids = ids.map_err(AnkiError::from);
+        if let Err(AnkiError::Interrupted) = ids {
+            self.state.progress.lock().unwrap().want_abort = false;
+        }
+        ids
     }
 
     fn add_order(
@@ -33,7 +33,7 @@ impl crate::services::SearchService for Collection {
         input: anki_proto::search::SearchRequest,
     ) -> Result<anki_proto::search::SearchResponse> {
         let order = input.order.unwrap_or_default().value.into();
-        let cids = self.search_cards(&input.search, order)?;
+        let cids = self.search_cards_limited(&input.search, order, input.limit)?;
         Ok(anki_proto::search::SearchResponse {
             ids: cids.into_iter().map(|v| v.0).collect(),
         })
@@ -44,7 +44,7 @@ impl crate::services::SearchService for Collection {
         input: anki_proto::search::SearchRequest,
     ) -> Result<anki_proto::search::SearchResponse> {
         let order = input.order.unwrap_or_default().value.into();
-        let nids = self.search_notes(&input.search, order)?;
+        let nids = self.search_notes_limited(&input.search, order, input.limit)?;
         Ok(anki_proto::search::SearchResponse {
             ids: nids.into_iter().map(|v| v.0).collect(),
         })
@@ -138,6 +138,27 @@ impl crate::services::SearchService for Collection {
     ) -> Result<anki_proto::search::BrowserRow> {
         self.browser_row_for_id(input.val)
     }
+
+    fn browser_rows_for_ids(
+        &mut self,
+        input: anki_proto::search::BrowserRowsForIdsRequest,
+    ) -> Result<anki_proto::search::BrowserRowsForIdsResponse> {
+        let rows = self
+            .browser_rows_for_ids(&input.ids)?
+            .into_iter()
+            .map(|row| match row {
+                Ok(row) => anki_proto::search::browser_rows_for_ids_response::Row {
+                    row: Some(row),
+                    error: String::new(),
+                },
+                Err(err) => anki_proto::search::browser_rows_for_ids_response::Row {
+                    row: None,
+                    error: err.message(&self.tr),
+                },
+            })
+            .collect();
+        Ok(anki_proto::search::BrowserRowsForIdsResponse { rows })
+    }
 }
 
 impl From<Option<SortOrderProto>> for SortMode {
@@ -205,6 +226,7 @@ mod tests {
         let input = anki_proto::search::SearchRequest {
             search: "".to_string(),
             order: None,
+            limit: 0,
         };
         let result = SearchService::search_cards(&mut col, input).unwrap();
         assert!(!result.ids.is_empty(), "expected at least one card id");
@@ -217,6 +239,7 @@ mod tests {
         let input = anki_proto::search::SearchRequest {
             search: "".to_string(),
             order: None,
+            limit: 0,
         };
         let result = SearchService::search_notes(&mut col, input).unwrap();
         assert!(!result.ids.is_empty(), "expected at least one note id");
@@ -316,6 +339,65 @@ mod tests {
         );
     }
 
+    #[test]
+    fn browser_rows_for_ids_reports_missing_rows_individually() {
+        let mut col = Collection::new();
+        let note = NoteAdder::basic(&mut col)
+            .fields(&["front value", "back value"])
+            .add(&mut col);
+        SearchService::set_active_browser_columns(
+            &mut col,
+            anki_proto::generic::StringList {
+                vals: vec!["noteFld".to_string()],
+            },
+        )
+        .unwrap();
+        let card_id = col.storage.card_ids_of_notes(&[note.id]).unwrap()[0];
+        let result = SearchService::browser_rows_for_ids(
+            &mut col,
+            anki_proto::search::BrowserRowsForIdsRequest {
+                ids: vec![card_id.0, 1, card_id.0],
+            },
+        )
+        .unwrap();
+
+        assert_eq!(result.rows.len(), 3);
+        assert_eq!(
+            result.rows[0].row.as_ref().unwrap().cells[0].text,
+            "front value"
+        );
+        assert!(result.rows[1].row.is_none());
+        assert!(!result.rows[1].error.is_empty());
+        assert_eq!(result.rows[2].row, result.rows[0].row);
+    }
+
+    #[test]
+    fn search_limit_caps_returned_ids() {
+        let mut col = Collection::new();
+        for front in ["a", "b", "c"] {
+            NoteAdder::basic(&mut col)
+                .fields(&[front, ""])
+                .add(&mut col);
+        }
+        let all: Vec<i64> = col
+            .search_cards("", SortMode::NoOrder)
+            .unwrap()
+            .into_iter()
+            .map(|cid| cid.0)
+            .collect();
+        let result = SearchService::search_cards(
+            &mut col,
+            anki_proto::search::SearchRequest {
+                search: "".to_string(),
+                order: None,
+                limit: 2,
+            },
+        )
+        .unwrap();
+        assert_eq!(result.ids.len(), 2);
+        assert!(result.ids.iter().all(|id| all.contains(id)));
+    }
+
     // --- Exact-match search integration tests ---
 
     #[test]
@@ -333,6 +415,7 @@ mod tests {
             anki_proto::search::SearchRequest {
                 search: "".to_string(),
                 order: None,
+                limit: 0,
             },
         )
         .unwrap();
@@ -359,6 +442,7 @@ mod tests {
             anki_proto::search::SearchRequest {
                 search: "note:Basic".to_string(),
                 order: None,
+                limit: 0,
             },
         )
         .unwrap();
@@ -392,6 +476,7 @@ mod tests {
             anki_proto::search::SearchRequest {
                 search: "deck:TargetDeck".to_string(),
                 order: None,
+                limit: 0,
             },
         )
         .unwrap();
@@ -426,6 +511,7 @@ mod tests {
             anki_proto::search::SearchRequest {
                 search: "tag:target".to_string(),
                 order: None,
+                limit: 0,
             },
         )
         .unwrap();
@@ -21,6 +21,7 @@ use std::fmt::Write;
 
 pub(crate) use sqlite::ProcessTextFlags;
 pub(crate) use sqlite::SqliteStorage;
+pub(crate) use sqlite::STATEMENT_CACHE_CAPACITY;
 
 #[derive(Debug, Clone, Copy, PartialEq, Eq)]
 pub enum SchemaVersion {
@@ -38,6 +38,10 @@ fn unicase_compare(s1: &str, s2: &str) -> Ordering {
     UniCase::new(s1).cmp(&UniCase::new(s2))
 }
 
+/// The number of statements the connection keeps prepared. dbproxy extends
+/// this by the number of statements the frontend holds handles to.
+pub(crate) const STATEMENT_CACHE_CAPACITY: usize = 50;
+
 // fixme: rollback savepoint when tags not changed
 // fixme: need to drop out of wal prior to vacuuming to fix page size of older
 // collections
@@ -70,7 +74,7 @@ fn open_or_create_collection_db(path: &Path) -> Result<Connection> {
     #[cfg(target_os = "android")]
     db.pragma_update(None, "temp_store", &"memory")?;
 
-    db.set_prepared_statement_cache_capacity(50);
+    db.set_prepared_statement_cache_capacity(STATEMENT_CACHE_CAPACITY);
 
     add_field_index_function(&db)?;
     add_regexp_function(&db)?;